@@ -0,0 +1,241 @@
+import argparse
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import talib
+from loguru import logger
+
+from .indicators import DEFAULT_PARAMS, StrategyParams, score_indicators
+
+# Matches execute_market_order(..., slippage=1), i.e. slippageBps=100 on every Jupiter swap.
+DEFAULT_SLIPPAGE_BPS = 100.0
+_SCORE_CHUNK = 1 << 20
+
+
+@dataclass
+class BacktestResult:
+    bars: int
+    trades: int
+    buys: int
+    sells: int
+    total_return: float
+    pnl: float
+    max_drawdown: float
+    fees_paid: float
+    slippage_paid: float
+    exposure: float
+    start: Optional[float] = None
+    end: Optional[float] = None
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class Backtester:
+    # Replays a whole price series through the generate_trading_signal scoring rules in one pass:
+    # indicators come from TA-Lib over the full array, scores from score_indicators, and the
+    # long/flat position path, trade costs and equity curve are all derived with array operations.
+    def __init__(
+        self,
+        slippage_bps: float = DEFAULT_SLIPPAGE_BPS,
+        fee_bps: float = 0.0,
+        initial_capital: float = 1.0,
+    ) -> None:
+        self.slippage_bps = slippage_bps
+        self.fee_bps = fee_bps
+        self.initial_capital = initial_capital
+
+    def indicators(
+        self, prices: np.ndarray, params: StrategyParams = DEFAULT_PARAMS, cache: Optional[Dict[tuple, Any]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # `cache` lets callers that backtest many parameter sets over one series (the sweep runner)
+        # reuse indicator arrays whose periods did not change.
+        cache = {} if cache is None else cache
+
+        def cached(key: tuple, compute):
+            value = cache.get(key)
+            if value is None:
+                value = cache[key] = compute()
+            return value
+
+        sma = cached(("sma", params.sma_period), lambda: talib.SMA(prices, timeperiod=params.sma_period))
+        rsi = cached(("rsi", params.rsi_period), lambda: talib.RSI(prices, timeperiod=params.rsi_period))
+        upper, lower = cached(
+            ("bbands", params.bb_period, params.bb_nbdev),
+            lambda: talib.BBANDS(
+                prices, timeperiod=params.bb_period, nbdevup=params.bb_nbdev, nbdevdn=params.bb_nbdev, matype=0
+            )[::2],
+        )
+        macd_hist = cached(
+            ("macd", params.macd_fast, params.macd_slow, params.macd_signal),
+            lambda: talib.MACD(
+                prices, fastperiod=params.macd_fast, slowperiod=params.macd_slow, signalperiod=params.macd_signal
+            )[2],
+        )
+        return sma, rsi, upper, lower, macd_hist
+
+    def signals(
+        self, prices: np.ndarray, params: StrategyParams = DEFAULT_PARAMS, cache: Optional[Dict[tuple, Any]] = None
+    ) -> np.ndarray:
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        sma, rsi, upper, lower, macd_hist = self.indicators(prices, params, cache)
+
+        # Score in chunks so the intermediate boolean arrays stay small on very long series.
+        signals = np.zeros(prices.size, dtype=np.int8)
+        for start in range(0, prices.size, _SCORE_CHUNK):
+            chunk = slice(start, start + _SCORE_CHUNK)
+            score = score_indicators(
+                prices[chunk], sma[chunk], rsi[chunk], upper[chunk], lower[chunk], macd_hist[chunk],
+                params.rsi_oversold, params.rsi_overbought,
+            )
+            signals[chunk] = (score >= params.buy_score).astype(np.int8) - (score <= params.sell_score)
+        # generate_trading_signal stays silent until it has `sma_period` prices.
+        signals[: params.sma_period - 1] = 0
+        return signals
+
+    def run(
+        self,
+        prices: np.ndarray,
+        timestamps: Optional[np.ndarray] = None,
+        params: StrategyParams = DEFAULT_PARAMS,
+        cache: Optional[Dict[tuple, Any]] = None,
+    ) -> BacktestResult:
+        started = time.perf_counter()
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        bars = prices.size
+        if bars < 2:
+            raise ValueError("backtest needs at least two prices")
+
+        signals = self.signals(prices, params, cache)
+
+        # BUY opens (or keeps) a long position, SELL closes it; carry the last signal forward.
+        last_signal = np.where(signals != 0, np.arange(bars), -1)
+        np.maximum.accumulate(last_signal, out=last_signal)
+        position = np.where(last_signal >= 0, signals[np.maximum(last_signal, 0)] > 0, False)
+        del last_signal
+
+        traded = np.empty(bars, dtype=bool)
+        traded[0] = position[0]
+        np.not_equal(position[1:], position[:-1], out=traded[1:])
+        buys = int(np.count_nonzero(traded & position))
+        sells = int(np.count_nonzero(traded & ~position))
+
+        # A position taken on bar t earns the move from t to t + 1.
+        growth = np.ones(bars, dtype=np.float64)
+        np.divide(prices[1:], prices[:-1], out=growth[1:])
+        growth[1:][~position[:-1]] = 1.0
+        cost_rate = (self.slippage_bps + self.fee_bps) / 10_000.0
+        growth[traded] *= 1.0 - cost_rate
+        equity = np.cumprod(growth)
+        equity *= self.initial_capital
+
+        # Costs are charged on the equity at the moment of each trade.
+        pre_trade = equity[traded] / (1.0 - cost_rate) if cost_rate < 1.0 else equity[traded]
+        cost_total = float(pre_trade.sum() * cost_rate)
+        total_bps = self.slippage_bps + self.fee_bps
+        slippage_paid = cost_total * (self.slippage_bps / total_bps) if total_bps else 0.0
+        fees_paid = cost_total - slippage_paid
+
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(np.max(1.0 - equity / peak))
+        final_equity = float(equity[-1])
+
+        result = BacktestResult(
+            bars=bars,
+            trades=buys + sells,
+            buys=buys,
+            sells=sells,
+            total_return=final_equity / self.initial_capital - 1.0,
+            pnl=final_equity - self.initial_capital,
+            max_drawdown=max_drawdown,
+            fees_paid=fees_paid,
+            slippage_paid=slippage_paid,
+            exposure=float(np.count_nonzero(position)) / bars,
+            start=float(timestamps[0]) if timestamps is not None and len(timestamps) else None,
+            end=float(timestamps[-1]) if timestamps is not None and len(timestamps) else None,
+            elapsed=time.perf_counter() - started,
+        )
+        logger.debug(
+            f"[Backtester] {bars} bars, {result.trades} trades, return {result.total_return:.2%}, "
+            f"max drawdown {result.max_drawdown:.2%}, costs {cost_total:.4f} in {result.elapsed:.2f}s"
+        )
+        return result
+
+    @staticmethod
+    def load_file(path: str, price_column: str = "price", timestamp_column: str = "timestamp") -> Tuple[np.ndarray, np.ndarray]:
+        file_path = Path(path)
+        if file_path.suffix.lower() in (".parquet", ".pq"):
+            frame = pd.read_parquet(file_path, columns=[timestamp_column, price_column])
+        else:
+            frame = pd.read_csv(file_path, usecols=[timestamp_column, price_column])
+        frame = frame.dropna(subset=[price_column]).sort_values(timestamp_column, kind="stable")
+        timestamps = frame[timestamp_column]
+        if not pd.api.types.is_numeric_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, utc=True).astype("int64") / 1e9
+        return frame[price_column].to_numpy(dtype=np.float64), timestamps.to_numpy(dtype=np.float64)
+
+    @staticmethod
+    async def load_market_data(
+        mint: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Imported here so file-based backtests do not need database credentials.
+        from .db import MarketData
+
+        query = (
+            MarketData.select(MarketData.timestamp, MarketData.price)
+            .where(MarketData.price.is_null(False))
+            .order_by(MarketData.timestamp)
+        )
+        if mint is not None:
+            query = query.where(MarketData.mint == mint)
+        if start is not None:
+            query = query.where(MarketData.timestamp >= start)
+        if end is not None:
+            query = query.where(MarketData.timestamp < end)
+        rows = await query.tuples().aio_execute()
+
+        timestamps = np.fromiter((row[0].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+        prices = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        logger.info(f"[Backtester] Loaded {len(prices)} priced rows from market_data.")
+        return prices, timestamps
+
+    @staticmethod
+    async def load_bars(
+        db_manager: Any,
+        mint: str,
+        timeframe: str = "1m",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Close prices of the bars CandleAggregator wrote to the candles table, stamped at bar close.
+        from .candle_aggregator import parse_timeframe
+
+        seconds = parse_timeframe(timeframe)
+        rows = await db_manager.fetch_bars(mint, seconds, start, end)
+        timestamps = np.fromiter((row[0].timestamp() + seconds for row in rows), dtype=np.float64, count=len(rows))
+        closes = np.fromiter((row[4] for row in rows), dtype=np.float64, count=len(rows))
+        logger.info(f"[Backtester] Loaded {len(closes)} {timeframe} bars for {mint}.")
+        return closes, timestamps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest the indicator strategy over a CSV or Parquet price file.")
+    parser.add_argument("path", help="CSV or Parquet file with timestamp and price columns")
+    parser.add_argument("--price-column", default="price")
+    parser.add_argument("--timestamp-column", default="timestamp")
+    parser.add_argument("--slippage-bps", type=float, default=DEFAULT_SLIPPAGE_BPS)
+    parser.add_argument("--fee-bps", type=float, default=0.0)
+    args = parser.parse_args()
+
+    prices, timestamps = Backtester.load_file(args.path, args.price_column, args.timestamp_column)
+    result = Backtester(slippage_bps=args.slippage_bps, fee_bps=args.fee_bps).run(prices, timestamps)
+    for key, value in result.to_dict().items():
+        print(f"{key}: {value}")
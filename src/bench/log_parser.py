@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from solders.keypair import Keypair
+from solders.rpc.responses import LogsNotification, parse_websocket_message
+
+from ..log_parser import MINT_MARKER, find_candidates, parse_coin_details
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+_ORDINARY_LOGS = (
+    [f"Program {TOKEN_PROGRAM_ID} invoke [1]", "Program log: Instruction: Transfer",
+     f"Program {TOKEN_PROGRAM_ID} consumed 4645 of 200000 compute units", f"Program {TOKEN_PROGRAM_ID} success"],
+    [f"Program {TOKEN_PROGRAM_ID} invoke [2]", "Program log: Instruction: TransferChecked",
+     f"Program {TOKEN_PROGRAM_ID} consumed 6200 of 185000 compute units", f"Program {TOKEN_PROGRAM_ID} success"],
+    [f"Program {TOKEN_PROGRAM_ID} invoke [1]", "Program log: Instruction: InitializeAccount3",
+     f"Program {TOKEN_PROGRAM_ID} consumed 3158 of 200000 compute units", f"Program {TOKEN_PROGRAM_ID} success"],
+)
+
+
+def synthetic_corpus(count: int, candidate_ratio: float = 0.001, seed: int = 7) -> List[str]:
+    # Raw logsNotification frames shaped like the Token Program stream: mostly transfers, with a
+    # sprinkling of TokenMinted lines for the scanner to find.
+    rng = random.Random(seed)
+    signer = Keypair()
+    frames = []
+    for i in range(count):
+        logs = list(rng.choice(_ORDINARY_LOGS))
+        if rng.random() < candidate_ratio:
+            mint = str(Keypair().pubkey())
+            logs.insert(2, f"Program log: {MINT_MARKER}|mint={mint}|symbol=MEME{i}|initial_supply={rng.randint(1, 100)}|trade_amount=500")
+        signature = str(signer.sign_message(i.to_bytes(8, "little")))
+        frames.append(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "logsNotification",
+            "params": {
+                "result": {"context": {"slot": 300_000_000 + i}, "value": {"signature": signature, "err": None, "logs": logs}},
+                "subscription": 1,
+            },
+        }))
+    return frames
+
+
+def load_corpus(path: str) -> List[str]:
+    # One raw WebSocket frame per line.
+    return [line for line in Path(path).read_text().splitlines() if line.strip()]
+
+
+def _legacy_parse(log_msg: str) -> Optional[Dict[str, Any]]:
+    # MemeCoinScanner.parse_log_for_coin_details before the fast path.
+    try:
+        parts = log_msg.split("|")
+        details: Dict[str, Any] = {}
+        for part in parts[1:]:
+            try:
+                key, value = part.split("=", 1)
+                details[key.strip()] = value.strip()
+            except Exception as inner_e:
+                logger.debug(f"[MemeCoinScanner] Skipping invalid log part: {part} ({inner_e})")
+        details["initial_supply"] = float(details.get("initial_supply", 0))
+        details["trade_amount"] = int(details.get("trade_amount", 1000))
+        logger.debug(f"[MemeCoinScanner] Parsed coin details: {details}")
+        return details
+    except Exception as e:
+        logger.error(f"[MemeCoinScanner] Error parsing log: {e}")
+        return None
+
+
+def legacy_path(frames: List[str]) -> int:
+    # Every frame is decoded and every log line goes through a debug f-string before the marker check.
+    found = 0
+    for raw in frames:
+        for data in parse_websocket_message(raw):
+            logger.debug(f"[MemeCoinScanner] Subscription response: id={data.subscription}, result={data.result.value}")
+            for log_msg in data.result.value.logs:
+                logger.debug(f"[MemeCoinScanner] Log message received: {log_msg}")
+                if MINT_MARKER in log_msg and _legacy_parse(log_msg) is not None:
+                    found += 1
+    return found
+
+
+def fast_path(frames: List[str]) -> int:
+    # SubscriptionHub prefilter on the raw frame, then decode and parse candidates only.
+    found = 0
+    for raw in frames:
+        if MINT_MARKER not in raw:
+            continue
+        for data in parse_websocket_message(raw):
+            if isinstance(data, LogsNotification):
+                for log_msg in find_candidates(data.result.value.logs):
+                    if parse_coin_details(log_msg) is not None:
+                        found += 1
+    return found
+
+
+def measure(name: str, run: Callable[[List[str]], int], frames: List[str], repeat: int) -> float:
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = run(frames)
+        best = min(best, time.perf_counter() - started)
+    rate = len(frames) / best
+    print(f"{name:>8}: {rate:>12,.0f} msg/s  ({best * 1000:.1f}ms for {len(frames)} frames, {found} candidates)")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Messages/second of the MemeCoinScanner log path, before and after the prefilter.")
+    parser.add_argument("--corpus", help="file with one raw logsNotification frame per line (default: synthetic)")
+    parser.add_argument("--count", type=int, default=50_000, help="synthetic corpus size")
+    parser.add_argument("--candidate-ratio", type=float, default=0.001)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--log-level", default="DEBUG", help="loguru level of the (discarded) sink, as in production")
+    args = parser.parse_args()
+
+    frames = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.count, args.candidate_ratio)
+    logger.remove()
+    logger.add(lambda message: None, level=args.log_level)
+
+    before = measure("before", legacy_path, frames, args.repeat)
+    after = measure("after", fast_path, frames, args.repeat)
+    print(f"speedup: {after / before:.1f}x")
+    print(
+        "The prefilter only skips frames while every Token Program consumer has one: in the bot that needs "
+        "MARKET_DATA_STORE_ALL_LOGS=false (the default, true, decodes every frame)."
+    )
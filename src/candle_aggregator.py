@@ -0,0 +1,194 @@
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from .db import DatabaseManager
+from .env import CANDLE_FLUSH_INTERVAL, CANDLE_HISTORY, CANDLE_TIMEFRAMES
+
+# Columns of every bar row; `start` is the bucket start in epoch seconds.
+BAR_FIELDS = ("start", "open", "high", "low", "close", "volume", "trades")
+START, OPEN, HIGH, LOW, CLOSE, VOLUME, TRADES = range(len(BAR_FIELDS))
+
+# listener(timeframe in seconds, mints, bars) where bars[i] is the closed bar of mints[i]
+BarListener = Callable[[int, List[str], np.ndarray], None]
+# (timeframe in seconds, mints, bars)
+BarBatch = Tuple[int, List[str], np.ndarray]
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_timeframe(value: Union[str, int]) -> int:
+    # "1s", "5s", "1m", "1h" or a number of seconds.
+    if isinstance(value, int):
+        seconds = value
+    else:
+        text = value.strip().lower()
+        seconds = int(text[:-1]) * _UNITS[text[-1]] if text[-1:] in _UNITS else int(text)
+    if seconds <= 0:
+        raise ValueError(f"timeframe must be positive: {value!r}")
+    return seconds
+
+
+class CandleAggregator:
+    # Streaming OHLCV bars per mint for several timeframes, built from the ticks the pool price feed
+    # pushes. State lives in float64 arrays indexed [timeframe, mint row]: the open bar of every pair
+    # and a ring of its last `history` closed bars. A tick in a later bucket closes the open bar, and
+    # run() closes every bar whose bucket has ended each `flush_interval` seconds, carrying the close
+    # into a flat zero-volume bar so a mint gets one bar per bucket even when it does not trade.
+    # Closed bars reach listeners and the database in one batch per timeframe.
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        timeframes: Sequence[Union[str, int]] = CANDLE_TIMEFRAMES,
+        history: int = CANDLE_HISTORY,
+        flush_interval: float = CANDLE_FLUSH_INTERVAL,
+        initial_mints: int = 16,
+    ) -> None:
+        if history <= 0:
+            raise ValueError("history must be positive")
+        self.db_manager = db_manager
+        self.timeframes = sorted({parse_timeframe(timeframe) for timeframe in timeframes})
+        self.history = history
+        self.flush_interval = flush_interval
+        self.ticks = 0
+        self.flushes = 0
+        self._frames = np.array(self.timeframes, dtype=np.float64)
+        self._index = {timeframe: i for i, timeframe in enumerate(self.timeframes)}
+        rows = max(1, initial_mints)
+        self._open = np.full((len(self.timeframes), rows, len(BAR_FIELDS)), np.nan)
+        self._bars = np.zeros((len(self.timeframes), rows, history, len(BAR_FIELDS)))
+        self._counts = np.zeros((len(self.timeframes), rows), dtype=np.int64)
+        self._rows: Dict[str, int] = {}
+        self._mints: List[str] = []
+        self._closed: List[List[Tuple[int, np.ndarray]]] = [[] for _ in self.timeframes]
+        self._listeners: List[Tuple[Optional[int], BarListener]] = []
+        self._run_aggregator = True
+
+    @property
+    def mints(self) -> List[str]:
+        return list(self._mints)
+
+    def add_listener(self, listener: BarListener, timeframe: Optional[Union[str, int]] = None) -> None:
+        # Without a timeframe the listener gets the batches of every timeframe.
+        seconds = None if timeframe is None else parse_timeframe(timeframe)
+        if seconds is not None and seconds not in self._index:
+            raise ValueError(f"timeframe {timeframe!r} is not aggregated (CANDLE_TIMEFRAMES={self.timeframes})")
+        self._listeners.append((seconds, listener))
+
+    def update(self, mint: str, price: float, volume: float = 0.0, timestamp: Optional[float] = None) -> None:
+        row = self._row_for(mint)
+        timestamp = time.time() if timestamp is None else timestamp
+        starts = np.floor(timestamp / self._frames) * self._frames
+        bars = self._open[:, row]
+        # A NaN start (no bar yet) compares False, so it rolls too. Late ticks fold into the open bar.
+        rolled = ~(starts <= bars[:, START])
+        if rolled.any():
+            for i in np.flatnonzero(rolled & ~np.isnan(bars[:, START])):
+                self._close(i, row)
+            bars[rolled, START] = starts[rolled]
+            bars[rolled, OPEN:CLOSE + 1] = price
+            bars[rolled, VOLUME:] = 0.0
+        np.maximum(bars[:, HIGH], price, out=bars[:, HIGH])
+        np.minimum(bars[:, LOW], price, out=bars[:, LOW])
+        bars[:, CLOSE] = price
+        bars[:, VOLUME] += volume
+        bars[:, TRADES] += 1
+        self.ticks += 1
+
+    def bars(self, mint: str, timeframe: Union[str, int], n: Optional[int] = None) -> np.ndarray:
+        # The last `n` (default: all retained) closed bars, oldest first.
+        i = self._index[parse_timeframe(timeframe)]
+        row = self._rows.get(mint)
+        if row is None:
+            return np.empty((0, len(BAR_FIELDS)))
+        count = int(self._counts[i, row])
+        k = min(count, self.history, self.history if n is None else n)
+        return self._bars[i, row, np.arange(count - k, count) % self.history]
+
+    def current(self, mint: str, timeframe: Union[str, int]) -> Optional[np.ndarray]:
+        row = self._rows.get(mint)
+        if row is None:
+            return None
+        bar = self._open[self._index[parse_timeframe(timeframe)], row]
+        return None if np.isnan(bar[START]) else bar.copy()
+
+    def flush(self, now: Optional[float] = None) -> List[BarBatch]:
+        # Closes every bar whose bucket ended before `now` and hands all bars closed since the last
+        # flush to the listeners, one batch per timeframe.
+        now = time.time() if now is None else now
+        count = len(self._mints)
+        batches = []
+        for i, timeframe in enumerate(self.timeframes):
+            bucket = math.floor(now / timeframe) * timeframe
+            open_bars = self._open[i, :count]
+            due = np.flatnonzero(open_bars[:, START] < bucket)
+            if len(due):
+                closed = open_bars[due]
+                self._bars[i, due, self._counts[i, due] % self.history] = closed
+                self._counts[i, due] += 1
+                self._closed[i].extend(zip(due.tolist(), closed))
+                open_bars[due, START] = bucket
+                open_bars[due, OPEN:CLOSE + 1] = closed[:, CLOSE:CLOSE + 1]
+                open_bars[due, VOLUME:] = 0.0
+            if not self._closed[i]:
+                continue
+            pending, self._closed[i] = self._closed[i], []
+            batch = ([self._mints[row] for row, _ in pending], np.stack([bar for _, bar in pending]))
+            batches.append((timeframe, *batch))
+            for wanted, listener in self._listeners:
+                if wanted is None or wanted == timeframe:
+                    try:
+                        listener(timeframe, *batch)
+                    except Exception as e:
+                        logger.exception(f"[CandleAggregator] {timeframe}s bar listener failed: {e}")
+        if batches:
+            self.flushes += 1
+        return batches
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mints": len(self._mints),
+            "ticks": self.ticks,
+            "flushes": self.flushes,
+            "bars": {f"{timeframe}s": int(self._counts[i].sum()) for i, timeframe in enumerate(self.timeframes)},
+        }
+
+    async def run(self) -> None:
+        while self._run_aggregator:
+            try:
+                await asyncio.sleep(self.flush_interval)
+            except asyncio.CancelledError:
+                break
+            for timeframe, mints, bars in self.flush():
+                if self.db_manager is not None:
+                    await self.db_manager.store_candles(timeframe, mints, bars)
+
+    def stop(self) -> None:
+        self._run_aggregator = False
+        logger.info(f"[CandleAggregator] Stopping. Stats: {self.stats()}")
+
+    def _close(self, i: int, row: int) -> None:
+        bar = self._open[i, row].copy()
+        self._bars[i, row, self._counts[i, row] % self.history] = bar
+        self._counts[i, row] += 1
+        self._closed[i].append((row, bar))
+
+    def _row_for(self, mint: str) -> int:
+        row = self._rows.get(mint)
+        if row is None:
+            row = len(self._mints)
+            if row == self._open.shape[1]:
+                self._grow()
+            self._rows[mint] = row
+            self._mints.append(mint)
+        return row
+
+    def _grow(self) -> None:
+        # Doubling keeps the amortized cost of adding a mint constant.
+        self._open = np.concatenate([self._open, np.full_like(self._open, np.nan)], axis=1)
+        self._bars = np.concatenate([self._bars, np.zeros_like(self._bars)], axis=1)
+        self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)], axis=1)
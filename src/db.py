@@ -1,14 +1,25 @@
-
+import asyncio
+import time
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
-from typing import  Dict, Any
+from typing import  Dict, Any, List, Optional, Type
 from loguru import logger
 
-from peewee import DateTimeField, AutoField
+from peewee import BigIntegerField, CharField, DateTimeField, DoubleField, IntegerField
 from playhouse.postgres_ext import JSONField
 from peewee_async import PooledPostgresqlDatabase, AioModel
 
-from .env import TIMESCALE_DB_CONN_STR
+from .metrics import METRICS
+from .env import (
+    CANDLE_COMPRESS_AFTER,
+    DB_FLUSH_BATCH_SIZE,
+    DB_FLUSH_INTERVAL,
+    DB_WRITE_QUEUE_SIZE,
+    MARKET_DATA_COMPRESS_AFTER,
+    MARKET_DATA_RETENTION,
+    TIMESCALE_DB_CONN_STR,
+    TRADE_LOG_COMPRESS_AFTER,
+)
 
 
 def parse_database_url(url: str) -> dict:
@@ -32,45 +43,344 @@ db_params = parse_database_url(TIMESCALE_DB_CONN_STR)
 database = PooledPostgresqlDatabase(**db_params)
 database.set_allow_sync(False)
 
+# Hypertables are partitioned on `timestamp`, and TimescaleDB requires every unique index to include
+# the partitioning column, so these tables have no surrogate primary key.
 class MarketData(AioModel):
-    id = AutoField()
-    timestamp = DateTimeField()
-    data = JSONField()
+    timestamp = DateTimeField(index=True)
+    mint = CharField(max_length=44, null=True)
+    price = DoubleField(null=True)
+    volume = DoubleField(null=True)
+    slot = BigIntegerField(null=True, index=True)
+    signature = CharField(max_length=88, null=True, index=True)
+    data = JSONField(null=True)
 
     class Meta:
         database = database
         table_name = "market_data"
+        primary_key = False
+        indexes = ((("mint", "timestamp"), False),)
 
 class TradeLog(AioModel):
-    id = AutoField()
-    timestamp = DateTimeField()
-    trade_details = JSONField()
+    timestamp = DateTimeField(index=True)
+    mint = CharField(max_length=44, null=True)
+    side = CharField(max_length=4, null=True)
+    price = DoubleField(null=True)
+    amount = DoubleField(null=True)
+    signature = CharField(max_length=88, null=True, index=True)
+    trade_details = JSONField(null=True)
 
     class Meta:
         database = database
         table_name = "trade_logs"
+        primary_key = False
+        indexes = ((("mint", "timestamp"), False),)
 
-class DatabaseManager:
-    async def connect(self) -> None:
-        logger.info("[DatabaseManager] Connecting to database and ensuring tables...")
-        with database.allow_sync():
-            database.create_tables([MarketData, TradeLog], safe=True)
-        logger.info("[DatabaseManager] Database connected and tables ensured.")
+# OHLCV bars closed by CandleAggregator; `timestamp` is the bar start and `timeframe` its length in seconds.
+class Candle(AioModel):
+    timestamp = DateTimeField(index=True)
+    mint = CharField(max_length=44)
+    timeframe = IntegerField()
+    open = DoubleField()
+    high = DoubleField()
+    low = DoubleField()
+    close = DoubleField()
+    volume = DoubleField()
+    trades = IntegerField()
+
+    class Meta:
+        database = database
+        table_name = "candles"
+        primary_key = False
+        indexes = ((("mint", "timeframe", "timestamp"), False),)
+
+def _drop_not_null(table: str, column: str) -> str:
+    # Only when the column still has the constraint, so reruns do not touch compressed hypertables.
+    return f"""
+        DO $$ BEGIN
+            IF EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = '{table}' AND column_name = '{column}' AND is_nullable = 'NO') THEN
+                ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL;
+            END IF;
+        END $$
+    """
+
+# Brings tables created by earlier versions (serial `id` primary key, JSON-only rows) to the current
+# models before create_tables() adds the indexes: typed columns are added, and the `id` column goes
+# with its primary key, which create_hypertable() would otherwise reject. Every step is idempotent.
+SCHEMA_MIGRATIONS = [
+    "ALTER TABLE IF EXISTS market_data "
+    "ADD COLUMN IF NOT EXISTS mint VARCHAR(44), ADD COLUMN IF NOT EXISTS price DOUBLE PRECISION, "
+    "ADD COLUMN IF NOT EXISTS volume DOUBLE PRECISION, ADD COLUMN IF NOT EXISTS slot BIGINT, "
+    "ADD COLUMN IF NOT EXISTS signature VARCHAR(88)",
+    "ALTER TABLE IF EXISTS market_data DROP CONSTRAINT IF EXISTS market_data_pkey, DROP COLUMN IF EXISTS id",
+    _drop_not_null("market_data", "data"),
+    "ALTER TABLE IF EXISTS trade_logs "
+    "ADD COLUMN IF NOT EXISTS mint VARCHAR(44), ADD COLUMN IF NOT EXISTS side VARCHAR(4), "
+    "ADD COLUMN IF NOT EXISTS price DOUBLE PRECISION, ADD COLUMN IF NOT EXISTS amount DOUBLE PRECISION, "
+    "ADD COLUMN IF NOT EXISTS signature VARCHAR(88)",
+    "ALTER TABLE IF EXISTS trade_logs DROP CONSTRAINT IF EXISTS trade_logs_pkey, DROP COLUMN IF EXISTS id",
+    _drop_not_null("trade_logs", "trade_details"),
+]
+
+# Compression settings cannot change once a hypertable has compressed chunks, so these are the only
+# setup steps allowed to fail.
+COMPRESSION_SETTINGS = [
+    "ALTER TABLE market_data SET (timescaledb.compress, timescaledb.compress_segmentby = 'mint', "
+    "timescaledb.compress_orderby = '\"timestamp\" DESC')",
+    "ALTER TABLE trade_logs SET (timescaledb.compress, timescaledb.compress_segmentby = 'mint', "
+    "timescaledb.compress_orderby = '\"timestamp\" DESC')",
+    "ALTER TABLE candles SET (timescaledb.compress, timescaledb.compress_segmentby = 'mint, timeframe', "
+    "timescaledb.compress_orderby = '\"timestamp\" DESC')",
+]
+
+TIMESCALE_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS timescaledb",
+    "SELECT create_hypertable('market_data', 'timestamp', chunk_time_interval => INTERVAL '1 day', "
+    "if_not_exists => TRUE, migrate_data => TRUE)",
+    "SELECT create_hypertable('trade_logs', 'timestamp', chunk_time_interval => INTERVAL '7 days', "
+    "if_not_exists => TRUE, migrate_data => TRUE)",
+    "SELECT create_hypertable('candles', 'timestamp', chunk_time_interval => INTERVAL '7 days', "
+    "if_not_exists => TRUE, migrate_data => TRUE)",
+    *COMPRESSION_SETTINGS,
+    f"SELECT add_compression_policy('market_data', INTERVAL '{MARKET_DATA_COMPRESS_AFTER}', if_not_exists => TRUE)",
+    f"SELECT add_compression_policy('trade_logs', INTERVAL '{TRADE_LOG_COMPRESS_AFTER}', if_not_exists => TRUE)",
+    f"SELECT add_compression_policy('candles', INTERVAL '{CANDLE_COMPRESS_AFTER}', if_not_exists => TRUE)",
+    f"SELECT add_retention_policy('market_data', INTERVAL '{MARKET_DATA_RETENTION}', if_not_exists => TRUE)",
+]
+
+class WriteBehindBuffer:
+    # Bounded queue of pending rows for one model, drained by a background task that writes them as
+    # multi-row INSERTs once `batch_size` rows are waiting or the oldest has waited `flush_interval`.
+    # A full queue makes producers wait (backpressure) instead of growing without bound.
+    def __init__(self, model: Type[AioModel], batch_size: int, flush_interval: float, max_queue: int) -> None:
+        self.model = model
+        self.name = model._meta.table_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+        self._flush_histogram = METRICS.histogram("db_flush_seconds", "Multi-row INSERT latency per table", table=self.name)
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self._batch: List[Dict[str, Any]] = []
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, row: Dict[str, Any]) -> None:
+        await self.queue.put(row)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+        # The partially collected batch and whatever is still queued go out before the pool closes.
+        rows, self._batch = self._batch, []
+        rows.extend(self._take(self.queue.qsize()))
+        for start in range(0, len(rows), self.batch_size):
+            await self._flush(rows[start:start + self.batch_size])
 
-    async def store_market_data(self, data: Dict[str, Any]) -> None:
-        logger.debug("[DatabaseManager] Attempting to store market data...")
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_latency * 1000,
+            "max_flush_ms": self.max_flush_latency * 1000,
+            "avg_flush_ms": self.total_flush_latency / self.flushes * 1000 if self.flushes else 0.0,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._batch
+            batch.append(await self.queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                batch.extend(self._take(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._batch = []
+            # Shielded so close() cannot cancel an INSERT halfway; it waits for it instead.
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < limit and not self.queue.empty():
+            rows.append(self.queue.get_nowait())
+        return rows
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        started = time.perf_counter()
         try:
-            await MarketData.aio_create(timestamp=datetime.utcnow(), data=data)
+            await self.model.insert_many(rows).aio_execute()
+            self.rows_written += len(rows)
         except Exception as e:
-            logger.exception(f"[DatabaseManager] Failed to store market data: {e}")
+            self.rows_failed += len(rows)
+            logger.error(f"[DatabaseManager] Failed to flush {len(rows)} rows into {self.name}: {e}")
+        latency = time.perf_counter() - started
+        self._flush_histogram.record(int(latency * 1e9))
+        self.flushes += 1
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self.total_flush_latency += latency
+        logger.debug("[DatabaseManager] Flushed {} rows into {} in {:.1f}ms.", len(rows), self.name, latency * 1000)
+
 
-    async def store_trade_log(self, trade_details: Dict[str, Any]) -> None:
+class DatabaseManager:
+    def __init__(
+        self,
+        batch_size: int = DB_FLUSH_BATCH_SIZE,
+        flush_interval: float = DB_FLUSH_INTERVAL,
+        max_queue: int = DB_WRITE_QUEUE_SIZE,
+    ) -> None:
+        self.market_data_buffer = WriteBehindBuffer(MarketData, batch_size, flush_interval, max_queue)
+        self.trade_log_buffer = WriteBehindBuffer(TradeLog, batch_size, flush_interval, max_queue)
+        self.candle_buffer = WriteBehindBuffer(Candle, batch_size, flush_interval, max_queue)
+
+    async def connect(self, ensure_schema: bool = True) -> None:
+        # The sharded runtime ensures the schema once in the supervisor, so its processes do not race
+        # each other creating the same tables.
+        logger.info("[DatabaseManager] Connecting to database...")
+        if ensure_schema:
+            self.ensure_schema()
+        self.market_data_buffer.start()
+        self.trade_log_buffer.start()
+        self.candle_buffer.start()
+        logger.info("[DatabaseManager] Database connected.")
+
+    def ensure_schema(self) -> None:
+        # Raises if the schema cannot be brought up to date: every later write would fail otherwise.
+        with database.allow_sync():
+            for statement in SCHEMA_MIGRATIONS:
+                self._execute_setup(statement)
+            database.create_tables([MarketData, TradeLog, Candle], safe=True)
+            self._ensure_timescale()
+        logger.info("[DatabaseManager] Tables ensured.")
+
+    def _ensure_timescale(self) -> None:
+        # Each statement is idempotent. Only COMPRESSION_SETTINGS may fail (logged); any other failed
+        # step, including a missing TimescaleDB extension, aborts the setup.
+        for statement in TIMESCALE_SETUP:
+            self._execute_setup(statement, required=statement not in COMPRESSION_SETTINGS)
+        logger.info("[DatabaseManager] Hypertables, compression/retention policies and candle aggregates ensured.")
+
+    def _execute_setup(self, statement: str, required: bool = True) -> None:
         try:
-            await TradeLog.aio_create(timestamp=datetime.utcnow(), trade_details=trade_details)
-            logger.debug("[DatabaseManager] Trade log stored.")
+            database.execute_sql(statement)
         except Exception as e:
-            logger.error(f"[DatabaseManager] Failed to store trade log: {e}")
+            if required:
+                logger.error(f"[DatabaseManager] Schema setup failed on {' '.join(statement.split())[:120]!r}: {e}")
+                raise
+            logger.warning(f"[DatabaseManager] Optional TimescaleDB setup step failed: {e}")
+
+    async def store_market_data(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        mint: Optional[str] = None,
+        price: Optional[float] = None,
+        volume: Optional[float] = None,
+        slot: Optional[int] = None,
+        signature: Optional[str] = None,
+    ) -> None:
+        await self.market_data_buffer.put({
+            "timestamp": datetime.utcnow(),
+            "mint": mint,
+            "price": price,
+            "volume": volume,
+            "slot": slot,
+            "signature": signature,
+            "data": data,
+        })
+
+    async def store_trade_log(
+        self,
+        trade_details: Dict[str, Any],
+        mint: Optional[str] = None,
+        side: Optional[str] = None,
+        price: Optional[float] = None,
+        amount: Optional[float] = None,
+        signature: Optional[str] = None,
+    ) -> None:
+        await self.trade_log_buffer.put({
+            "timestamp": datetime.utcnow(),
+            "mint": mint,
+            "side": side,
+            "price": price,
+            "amount": amount,
+            "signature": signature,
+            "trade_details": trade_details,
+        })
+        logger.debug("[DatabaseManager] Trade log queued.")
+
+    async def store_candles(self, timeframe: int, mints: List[str], bars: Any) -> None:
+        # One closed-bar batch from CandleAggregator; bars[i] is (start, open, high, low, close, volume, trades).
+        for mint, (start, open_, high, low, close, volume, trades) in zip(mints, bars.tolist()):
+            await self.candle_buffer.put({
+                "timestamp": datetime.utcfromtimestamp(start),
+                "mint": mint,
+                "timeframe": timeframe,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+                "trades": int(trades),
+            })
+
+    async def fetch_bars(
+        self,
+        mint: str,
+        timeframe: int = 60,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[tuple]:
+        # Rows of (start, open, high, low, close, volume, trades) written by CandleAggregator.
+        query = (
+            Candle.select(Candle.timestamp, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume, Candle.trades)
+            .where((Candle.mint == mint) & (Candle.timeframe == timeframe))
+            .order_by(Candle.timestamp)
+        )
+        if start is not None:
+            query = query.where(Candle.timestamp >= start)
+        if end is not None:
+            query = query.where(Candle.timestamp < end)
+        return list(await query.tuples().aio_execute())
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "market_data": self.market_data_buffer.metrics(),
+            "trade_logs": self.trade_log_buffer.metrics(),
+            "candles": self.candle_buffer.metrics(),
+        }
 
     async def close(self) -> None:
+        await self.market_data_buffer.close()
+        await self.trade_log_buffer.close()
+        await self.candle_buffer.close()
+        logger.info(f"[DatabaseManager] Write buffers flushed: {self.metrics()}")
         await database.aio_close()
-        logger.info("[DatabaseManager] Database connection closed.")
\ No newline at end of file
+        logger.info("[DatabaseManager] Database connection closed.")
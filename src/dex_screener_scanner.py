@@ -1,77 +1,195 @@
 import asyncio
-from datetime import datetime
-import random
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-import aiohttp
 from loguru import logger
 
-from .env import DEXSCREENER_POLL_INTERVAL, MEME_COIN_LIQUIDITY_THRESHOLD, ORDER_QUANTITY, TRENDING_API_ENDPOINT
+from .env import (
+    DEXSCREENER_MAX_POLL_INTERVAL,
+    DEXSCREENER_MIN_POLL_INTERVAL,
+    DEXSCREENER_POLL_INTERVAL,
+    DEXSCREENER_RATE_LIMIT,
+    MEME_COIN_LIQUIDITY_THRESHOLD,
+    ORDER_QUANTITY,
+    TRENDING_API_ENDPOINTS,
+)
 
+from .http_client import HttpClient
+from .order_dispatcher import OrderDispatcher, TokenBucket
+from .seen_tokens import SeenTokenIndex
 from .trade_executor import TradeExecutor
 
 from .db import DatabaseManager
 
+
+@dataclass
+class TrendingFeed:
+    # Conditional-request validators, the last payload digest and the last snapshot of one endpoint.
+    url: str
+    interval: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[bytes] = None
+    snapshot: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)
+    polls: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    errors: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "polls": self.polls,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "changed": self.changed,
+            "errors": self.errors,
+            "interval": self.interval,
+            "entries": len(self.snapshot),
+        }
+
+
 class DexScreenerScanner:
-    def __init__(self, trade_executor: TradeExecutor, db_manager: DatabaseManager) -> None:
+    def __init__(
+        self,
+        trade_executor: TradeExecutor,
+        db_manager: DatabaseManager,
+        http_client: HttpClient,
+        endpoints: Union[str, Sequence[str]] = TRENDING_API_ENDPOINTS,
+        poll_interval: float = DEXSCREENER_POLL_INTERVAL,
+        dispatcher: Optional[OrderDispatcher] = None,
+        seen_tokens: Optional[SeenTokenIndex] = None,
+        min_poll_interval: float = DEXSCREENER_MIN_POLL_INTERVAL,
+        max_poll_interval: float = DEXSCREENER_MAX_POLL_INTERVAL,
+        rate_limit: float = DEXSCREENER_RATE_LIMIT,
+    ) -> None:
         self.trade_executor = trade_executor
+        self.dispatcher = dispatcher or OrderDispatcher(trade_executor, db_manager)
+        self.http_client = http_client
         self.db_manager = db_manager
-        self.last_seen_tokens: set[str] = set()
+        self.seen_tokens = seen_tokens if seen_tokens is not None else SeenTokenIndex()
         self._run_scanner = True
-        self.endpoint = TRENDING_API_ENDPOINT
+        self.poll_interval = poll_interval
+        self.min_poll_interval = min(min_poll_interval, poll_interval)
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        urls = [endpoints] if isinstance(endpoints, str) else list(endpoints)
+        self.feeds = [TrendingFeed(url, poll_interval) for url in urls]
+        # One request budget shared by every endpoint (DexScreener limits per client, not per path).
+        self.rate_budget = TokenBucket(rate_limit, burst=len(self.feeds))
 
     async def scan_for_new_coins(self) -> None:
+        await asyncio.gather(*(self._poll_feed(feed) for feed in self.feeds))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {feed.url: feed.summary() for feed in self.feeds}
+
+    async def _poll_feed(self, feed: TrendingFeed) -> None:
         while self._run_scanner:
-            logger.debug("[DexScreenerScanner] Beginning new scan iteration.")
             try:
-                logger.debug("[DexScreenerScanner] Fetching trending token data...")
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(self.endpoint, timeout=10) as response:
-                        if response.status != 200:
-                            logger.error(f"[DexScreenerScanner] Trending API returned status {response.status}")
-                            await asyncio.sleep(DEXSCREENER_POLL_INTERVAL)
-                            continue
-                        data = await response.json()
-                        logger.debug(f"[DexScreenerScanner] Trending API response: {data}")
-                        # Expecting data to be a list per new schema
-                        tokens = data if isinstance(data, list) else []
-
-                if tokens:
-                    for token_info in tokens:
-                        token_mint = token_info.get("tokenAddress")
-                        if not token_mint or token_mint in self.last_seen_tokens:
-                            continue
-                        self.last_seen_tokens.add(token_mint)
-                        total_amount = int(token_info.get("totalAmount", 0))
-                        # Check if token qualifies based on totalAmount threshold
-                        if 0 < total_amount < MEME_COIN_LIQUIDITY_THRESHOLD:
-                            logger.success(
-                                f"[DexScreenerScanner] Candidate token found: {token_mint} with totalAmount {total_amount}"
-                            )
-                            trade_response = await self.trade_executor.execute_market_order(
-                                token_mint, "buy", ORDER_QUANTITY
-                            )
-                            if trade_response and trade_response.get("result"):
-                                logger.success(f"[DexScreenerScanner] Market order successful for token {token_mint}.")
-                            else:
-                                logger.error(f"[DexScreenerScanner] Market order failed for token {token_mint}.")
-                            await self.db_manager.store_trade_log({
-                                "event": "TrendingMarketOrder",
-                                "token_info": token_info,
-                                "trade_response": trade_response,
-                                "timestamp": datetime.utcnow().isoformat()
-                            })
-                        else:
-                            logger.debug(
-                                f"[DexScreenerScanner] Token {token_mint} does not meet liquidity threshold: {total_amount}"
-                            )
+                await self.rate_budget.acquire()
+                tokens = await self._fetch(feed)
+                if tokens is None:
+                    # 304, byte-identical payload or an error: back off.
+                    feed.interval = min(self.max_poll_interval, feed.interval * 1.5)
                 else:
-                    logger.warning("[DexScreenerScanner] No trending tokens found in response.")
-                logger.debug("[DexScreenerScanner] Finished scan iteration.")
-                await asyncio.sleep(DEXSCREENER_POLL_INTERVAL)
+                    changed = self._diff(feed, tokens)
+                    logger.debug("[DexScreenerScanner] {}: {} entries, {} new or changed.", feed.url, len(tokens), len(changed))
+                    if changed:
+                        feed.changed += 1
+                        feed.interval = max(self.min_poll_interval, feed.interval / 2)
+                        self._evaluate(changed)
+                    else:
+                        feed.unchanged += 1
+                        feed.interval = min(self.max_poll_interval, feed.interval * 1.5)
+                    if not tokens:
+                        logger.warning(f"[DexScreenerScanner] No trending tokens found in response from {feed.url}.")
             except Exception as e:
-                logger.exception(f"[DexScreenerScanner] Error scanning trending tokens: {e}")
-                await asyncio.sleep(DEXSCREENER_POLL_INTERVAL)
+                feed.errors += 1
+                logger.exception(f"[DexScreenerScanner] Error scanning trending tokens from {feed.url}: {e}")
+            await asyncio.sleep(feed.interval)
+
+    async def _fetch(self, feed: TrendingFeed) -> Optional[List[Dict[str, Any]]]:
+        # Returns the parsed entries, or None on an error or when the endpoint reports (or the payload
+        # hash shows) nothing has changed since the previous poll.
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+        feed.polls += 1
+        async with self.http_client.session.get(feed.url, headers=headers, timeout=10) as response:
+            if response.status == 304:
+                feed.not_modified += 1
+                return None
+            if response.status != 200:
+                feed.errors += 1
+                logger.error(f"[DexScreenerScanner] Trending API {feed.url} returned status {response.status}")
+                if response.status == 429:
+                    feed.interval = min(self.max_poll_interval, feed.interval * 2)
+                return None
+            feed.etag = response.headers.get("ETag", feed.etag)
+            feed.last_modified = response.headers.get("Last-Modified", feed.last_modified)
+            body = await response.read()
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == feed.digest:
+            feed.not_modified += 1
+            return None
+        feed.digest = digest
+        data = json.loads(body)
+        # Expecting data to be a list per new schema
+        return data if isinstance(data, list) else []
+
+    def _diff(self, feed: TrendingFeed, tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Entries whose mint is new to this endpoint's list or whose boost amounts moved.
+        snapshot: Dict[str, Tuple[Any, Any]] = {}
+        changed = []
+        for token_info in tokens:
+            token_mint = token_info.get("tokenAddress")
+            if not token_mint:
+                continue
+            fingerprint = (token_info.get("amount"), token_info.get("totalAmount"))
+            if feed.snapshot.get(token_mint) != fingerprint:
+                changed.append(token_info)
+            snapshot[token_mint] = fingerprint
+        feed.snapshot = snapshot
+        return changed
+
+    def _evaluate(self, tokens: List[Dict[str, Any]]) -> None:
+        candidates = []
+        for token_info in tokens:
+            token_mint = token_info["tokenAddress"]
+            if not self.seen_tokens.mark(token_mint):
+                continue
+            # Decimals are needed to size a later sell; fetch them while nothing is waiting on them.
+            self.trade_executor.mint_metadata.warm(token_mint)
+            total_amount = int(token_info.get("totalAmount", 0))
+            # Check if token qualifies based on totalAmount threshold
+            if 0 < total_amount < MEME_COIN_LIQUIDITY_THRESHOLD:
+                logger.success(
+                    f"[DexScreenerScanner] Candidate token found: {token_mint} with totalAmount {total_amount}"
+                )
+                # Start fetching every candidate's quote now so later orders in this batch skip it.
+                self.trade_executor.prefetch_market_order(token_mint, "buy", ORDER_QUANTITY)
+                candidates.append((token_mint, token_info))
+            else:
+                logger.debug("[DexScreenerScanner] Token {} does not meet liquidity threshold: {}", token_mint, total_amount)
+        # Orders run concurrently in the dispatcher; the next poll does not wait for them.
+        for token_mint, token_info in candidates:
+            order = self.dispatcher.submit(
+                token_mint,
+                "buy",
+                ORDER_QUANTITY,
+                source="DexScreenerScanner",
+                trade_details={"event": "TrendingMarketOrder", "token_info": token_info},
+            )
+            order.add_done_callback(
+                lambda _, mint=token_mint: self.trade_executor.cancel_prefetch_market_order(mint, "buy", ORDER_QUANTITY)
+            )
 
     def stop(self) -> None:
         self._run_scanner = False
-        logger.info("[DexScreenerScanner] Stopping scanner.")
\ No newline at end of file
+        self.seen_tokens.close()
+        logger.info(f"[DexScreenerScanner] Stopping scanner. Stats: {self.stats()}")
@@ -9,17 +9,114 @@ load_dotenv()
 
 WS_URL = os.environ.get("WS_URL", "wss://api.devnet.solana.com")
 SOLANA_RPC_URL = os.environ.get("SOLANA_RPC_URL", "https://api.devnet.solana.com")
+# Comma-separated RPC providers pooled by RpcEndpointPool; default to SOLANA_RPC_URL / WS_URL.
+# WS_URLS[i] pairs with SOLANA_RPC_URLS[i]; missing entries are derived from the HTTP URL.
+SOLANA_RPC_URLS = [u.strip() for u in os.environ.get("SOLANA_RPC_URLS", "").split(",") if u.strip()] or [SOLANA_RPC_URL]
+WS_URLS = [u.strip() for u in os.environ.get("WS_URLS", "").split(",") if u.strip()] or [WS_URL]
+RPC_PROBE_INTERVAL = float(os.environ.get("RPC_PROBE_INTERVAL", "5"))
+RPC_HEDGE_DELAY = float(os.environ.get("RPC_HEDGE_DELAY", "0.15"))
+RPC_BREAKER_FAILURES = int(os.environ.get("RPC_BREAKER_FAILURES", "3"))
+RPC_BREAKER_COOLDOWN = float(os.environ.get("RPC_BREAKER_COOLDOWN", "30"))
+RPC_MAX_SLOT_LAG = int(os.environ.get("RPC_MAX_SLOT_LAG", "20"))
+RPC_EWMA_ALPHA = float(os.environ.get("RPC_EWMA_ALPHA", "0.2"))
+RPC_REQUEST_TIMEOUT = float(os.environ.get("RPC_REQUEST_TIMEOUT", "10"))
+# Comma-separated endpoints every signed transaction is sent to in parallel; defaults to every healthy
+# endpoint of the RPC pool.
+SEND_RPC_URLS = [u.strip() for u in os.environ.get("SEND_RPC_URLS", "").split(",") if u.strip()]
+# CPU work of a swap (decode, sign, serialize) runs on SIGNING_WORKERS threads ("thread") or
+# processes ("process"); 0 workers signs inline on the event loop.
+SIGNING_EXECUTOR = os.environ.get("SIGNING_EXECUTOR", "thread").lower()
+SIGNING_WORKERS = int(os.environ.get("SIGNING_WORKERS", "2"))
+SIGNING_BATCH_WINDOW = float(os.environ.get("SIGNING_BATCH_WINDOW", "0"))
+SIGNING_MAX_BATCH = int(os.environ.get("SIGNING_MAX_BATCH", "16"))
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0.05"))
+LOOP_LAG_WARN = float(os.environ.get("LOOP_LAG_WARN", "0.1"))
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.environ.get("LOG_FILE", "trading_bot.log")
+LOG_FILE_ROTATION = os.environ.get("LOG_FILE_ROTATION", "1 MB")
+LOG_ENQUEUE = os.environ.get("LOG_ENQUEUE", "true").lower() in ("1", "true", "yes")
+# Recent hot-path events kept in the binary ring and appended to LOG_RING_DUMP_PATH on an error; 0 disables it.
+LOG_RING_SIZE = int(os.environ.get("LOG_RING_SIZE", "4096"))
+LOG_RING_DUMP_PATH = os.environ.get("LOG_RING_DUMP_PATH", "hotpath_events.log")
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+# Prometheus scrape endpoint (/metrics); 0 disables it.
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))
+# Preflight simulation catches a failing swap before it lands (and pays fees); set true to skip it for latency.
+SEND_SKIP_PREFLIGHT = os.environ.get("SEND_SKIP_PREFLIGHT", "false").lower() in ("1", "true", "yes")
+SEND_REBROADCAST_INTERVAL = float(os.environ.get("SEND_REBROADCAST_INTERVAL", "2"))
+SEND_CONFIRM_TIMEOUT = float(os.environ.get("SEND_CONFIRM_TIMEOUT", "90"))
+SEND_CONFIRM_POLL_INTERVAL = float(os.environ.get("SEND_CONFIRM_POLL_INTERVAL", "2"))
+BLOCKHASH_REFRESH_INTERVAL = float(os.environ.get("BLOCKHASH_REFRESH_INTERVAL", "2"))
+PRIORITY_FEE_REFRESH_INTERVAL = float(os.environ.get("PRIORITY_FEE_REFRESH_INTERVAL", "10"))
+PRIORITY_FEE_PERCENTILE = float(os.environ.get("PRIORITY_FEE_PERCENTILE", "75"))
+PRIORITY_FEE_MAX = int(os.environ.get("PRIORITY_FEE_MAX", "1000000"))
 TIMESCALE_DB_CONN_STR = os.environ.get("TIMESCALE_DB_CONN_STR")
 TRENDING_API_ENDPOINT = os.environ.get("TRENDING_API_ENDPOINT", "https://api.dexscreener.com/token-boosts/top/v1")
+# Comma-separated DexScreener endpoints polled side by side; defaults to TRENDING_API_ENDPOINT.
+TRENDING_API_ENDPOINTS = [u.strip() for u in os.environ.get("TRENDING_API_ENDPOINTS", "").split(",") if u.strip()] or [TRENDING_API_ENDPOINT]
 MEME_COIN_LIQUIDITY_THRESHOLD = float(os.environ.get("MEME_COIN_LIQUIDITY_THRESHOLD", "20000"))
 RECONNECT_DELAY = float(os.environ.get("RECONNECT_DELAY", "5"))
+WS_QUEUE_SIZE = int(os.environ.get("WS_QUEUE_SIZE", "1000"))
+WS_MAX_RECONNECT_DELAY = float(os.environ.get("WS_MAX_RECONNECT_DELAY", "60"))
+WS_PING_INTERVAL = float(os.environ.get("WS_PING_INTERVAL", "15"))
+WS_PING_TIMEOUT = float(os.environ.get("WS_PING_TIMEOUT", "10"))
+WS_BACKFILL_LIMIT = int(os.environ.get("WS_BACKFILL_LIMIT", "200"))
 STRATEGY_LOOP_INTERVAL = float(os.environ.get("STRATEGY_LOOP_INTERVAL", "5"))
 DEXSCREENER_POLL_INTERVAL = float(os.environ.get("DEXSCREENER_POLL_INTERVAL", "30"))
+DEXSCREENER_MIN_POLL_INTERVAL = float(os.environ.get("DEXSCREENER_MIN_POLL_INTERVAL", "5"))
+DEXSCREENER_MAX_POLL_INTERVAL = float(os.environ.get("DEXSCREENER_MAX_POLL_INTERVAL", "120"))
+DEXSCREENER_RATE_LIMIT = float(os.environ.get("DEXSCREENER_RATE_LIMIT", "1"))
+SEEN_TOKENS_PATH = os.environ.get("SEEN_TOKENS_PATH", "seen_tokens.bin")
+SEEN_TOKENS_CAPACITY = int(os.environ.get("SEEN_TOKENS_CAPACITY", "100000"))
+SEEN_TOKENS_TTL = float(os.environ.get("SEEN_TOKENS_TTL", str(7 * 24 * 3600)))
 SECRET_KEY_B58 = os.environ.get("SECRET_KEY_B58")
-ORDER_QUANTITY = float(os.environ.get("ORDER_QUANTITY", "100"))
+# Order sizes in whole units of the input mint: SOL spent per buy, tokens sold per strategy sell.
+ORDER_QUANTITY = float(os.environ.get("ORDER_QUANTITY", "0.1"))
+ORDER_SELL_QUANTITY = float(os.environ.get("ORDER_SELL_QUANTITY", "100"))
+ORDER_MAX_IN_FLIGHT = int(os.environ.get("ORDER_MAX_IN_FLIGHT", "8"))
+ORDER_RATE_LIMIT = float(os.environ.get("ORDER_RATE_LIMIT", "5"))
+ORDER_RATE_BURST = int(os.environ.get("ORDER_RATE_BURST", "10"))
 SOL_MINT = os.environ.get("SOL_MINT", "So11111111111111111111111111111111111111112")
-DEFAULT_MEME_MINT = os.environ.get("DEFAULT_MEME_MINT", "")
 JUPITER_API_KEY = os.environ.get("JUPITER_API_KEY", "")
+JUPITER_API_URL = os.environ.get("JUPITER_API_URL", "https://api.jup.ag/swap/v1")
+DB_FLUSH_BATCH_SIZE = int(os.environ.get("DB_FLUSH_BATCH_SIZE", "500"))
+DB_FLUSH_INTERVAL = float(os.environ.get("DB_FLUSH_INTERVAL", "0.5"))
+DB_WRITE_QUEUE_SIZE = int(os.environ.get("DB_WRITE_QUEUE_SIZE", "10000"))
+MARKET_DATA_COMPRESS_AFTER = os.environ.get("MARKET_DATA_COMPRESS_AFTER", "1 day")
+MARKET_DATA_RETENTION = os.environ.get("MARKET_DATA_RETENTION", "30 days")
+# Store every Token Program log (the default). False keeps only mint candidates, which lets the hub drop
+# the other frames before decoding them.
+MARKET_DATA_STORE_ALL_LOGS = os.environ.get("MARKET_DATA_STORE_ALL_LOGS", "true").lower() in ("1", "true", "yes")
+TRADE_LOG_COMPRESS_AFTER = os.environ.get("TRADE_LOG_COMPRESS_AFTER", "7 days")
+HTTP_CONNECTION_LIMIT = int(os.environ.get("HTTP_CONNECTION_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.environ.get("HTTP_LIMIT_PER_HOST", "20"))
+HTTP_DNS_CACHE_TTL = int(os.environ.get("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "60"))
+MINT_METADATA_TTL = float(os.environ.get("MINT_METADATA_TTL", "3600"))
+MINT_METADATA_PATH = os.environ.get("MINT_METADATA_PATH", "mint_metadata.json")
+MINT_METADATA_BATCH_INTERVAL = float(os.environ.get("MINT_METADATA_BATCH_INTERVAL", "0.05"))
+QUOTE_TTL = float(os.environ.get("QUOTE_TTL", "3"))
+QUOTE_REFRESH_AHEAD = float(os.environ.get("QUOTE_REFRESH_AHEAD", "1"))
+QUOTE_PREFETCH_MAX = int(os.environ.get("QUOTE_PREFETCH_MAX", "32"))
+QUOTE_PREBUILD_SWAP = os.environ.get("QUOTE_PREBUILD_SWAP", "false").lower() in ("1", "true", "yes")
+# Comma-separated AMM pools priced from their token vaults, as MINT:BASE_VAULT:QUOTE_VAULT[:QUOTE_MINT]
+# (the quote mint defaults to SOL_MINT).
+POOL_PRICE_FEEDS = [p.strip() for p in os.environ.get("POOL_PRICE_FEEDS", "").split(",") if p.strip()]
+POOL_PRICE_SETTLE = float(os.environ.get("POOL_PRICE_SETTLE", "0.05"))
+POOL_PRICE_COMMITMENT = os.environ.get("POOL_PRICE_COMMITMENT", "processed")
+# Comma-separated bar timeframes ("1s", "5s", "1m", ...) aggregated from pool price ticks.
+CANDLE_TIMEFRAMES = [t.strip() for t in os.environ.get("CANDLE_TIMEFRAMES", "1s,5s,1m").split(",") if t.strip()]
+CANDLE_HISTORY = int(os.environ.get("CANDLE_HISTORY", "1000"))
+CANDLE_FLUSH_INTERVAL = float(os.environ.get("CANDLE_FLUSH_INTERVAL", "0.1"))
+CANDLE_STRATEGY_TIMEFRAME = os.environ.get("CANDLE_STRATEGY_TIMEFRAME", "1s")
+CANDLE_COMPRESS_AFTER = os.environ.get("CANDLE_COMPRESS_AFTER", "7 days")
+# Shard workers of the multi-process runtime; 0 runs the whole bot on one event loop in one process.
+SHARD_WORKERS = int(os.environ.get("SHARD_WORKERS", "0"))
+# Bytes of each shared-memory queue between the ingest, worker and executor processes.
+SHARD_QUEUE_BYTES = int(os.environ.get("SHARD_QUEUE_BYTES", str(4 << 20)))
+# Longest an idle queue reader sleeps between polls (seconds).
+SHARD_POLL_INTERVAL = float(os.environ.get("SHARD_POLL_INTERVAL", "0.001"))
+SHARD_MAX_RESTARTS = int(os.environ.get("SHARD_MAX_RESTARTS", "3"))
 
 if not SECRET_KEY_B58:
     logger.error("SECRET_KEY_B58 environment variable must be provided.")
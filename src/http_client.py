@@ -0,0 +1,158 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Optional
+
+import aiohttp
+from loguru import logger
+
+from .env import HTTP_CONNECTION_LIMIT, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT, HTTP_LIMIT_PER_HOST
+from .log_config import LOG
+
+
+@dataclass
+class RequestTiming:
+    method: str
+    host: str
+    status: int = 0
+    total: float = 0.0
+    dns: float = 0.0
+    connect: float = 0.0
+    reused_connection: bool = False
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    reused_connections: int = 0
+    new_connections: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    connect_time: float = 0.0
+    dns_time: float = 0.0
+    last: Optional[RequestTiming] = field(default=None, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        requests = max(self.requests, 1)
+        new_connections = max(self.new_connections, 1)
+        return {
+            "requests": self.requests,
+            "reused_connections": self.reused_connections,
+            "new_connections": self.new_connections,
+            "errors": self.errors,
+            "avg_total_ms": self.total_time / requests * 1000,
+            "avg_connect_ms": self.connect_time / new_connections * 1000,
+            "avg_dns_ms": self.dns_time / new_connections * 1000,
+        }
+
+
+class HttpClient:
+    # One long-lived, connection-pooled aiohttp session shared by the executor and scanners, so the
+    # TCP/TLS handshake and DNS lookup are paid once per host rather than once per request.
+    def __init__(
+        self,
+        limit: int = HTTP_CONNECTION_LIMIT,
+        limit_per_host: int = HTTP_LIMIT_PER_HOST,
+        dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+        keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+        history: int = 256,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.hosts: Dict[str, HostStats] = {}
+        self.timings: Deque[RequestTiming] = deque(maxlen=history)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily because aiohttp sessions must be built inside the running event loop.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+            logger.info(
+                f"[HttpClient] Session created (limit={self.limit}, limit_per_host={self.limit_per_host}, "
+                f"dns_ttl={self.dns_cache_ttl}s, keepalive={self.keepalive_timeout}s)."
+            )
+        return self._session
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {host: host_stats.summary() for host, host_stats in self.hosts.items()}
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        logger.info(f"[HttpClient] Session closed. Stats: {self.stats()}")
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_connection_create_start.append(self._on_connection_start)
+        trace_config.on_connection_create_end.append(self._on_connection_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        return trace_config
+
+    async def _on_request_start(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.started = time.perf_counter()
+        ctx.timing = RequestTiming(method=params.method, host=params.url.host or "")
+
+    async def _on_dns_start(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.dns_started = time.perf_counter()
+
+    async def _on_dns_end(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.timing.dns = time.perf_counter() - ctx.dns_started
+
+    async def _on_connection_start(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.connect_started = time.perf_counter()
+
+    async def _on_connection_end(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.timing.connect = time.perf_counter() - ctx.connect_started
+
+    async def _on_connection_reused(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.timing.reused_connection = True
+
+    async def _on_request_end(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        timing = ctx.timing
+        timing.status = params.response.status
+        timing.total = time.perf_counter() - ctx.started
+        self._record(timing, error=False)
+
+    async def _on_request_exception(self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        timing = ctx.timing
+        timing.total = time.perf_counter() - ctx.started
+        self._record(timing, error=True)
+
+    def _record(self, timing: RequestTiming, error: bool) -> None:
+        host_stats = self.hosts.get(timing.host)
+        if host_stats is None:
+            host_stats = self.hosts[timing.host] = HostStats()
+        host_stats.requests += 1
+        host_stats.total_time += timing.total
+        if error:
+            host_stats.errors += 1
+        if timing.reused_connection:
+            host_stats.reused_connections += 1
+        else:
+            host_stats.new_connections += 1
+            host_stats.connect_time += timing.connect
+            host_stats.dns_time += timing.dns
+        host_stats.last = timing
+        self.timings.append(timing)
+        if LOG.debug:
+            logger.debug(
+                "[HttpClient] {} {} -> {} in {:.1f}ms (connect {:.1f}ms, dns {:.1f}ms, reused={})",
+                timing.method, timing.host, timing.status, timing.total * 1000,
+                timing.connect * 1000, timing.dns * 1000, timing.reused_connection,
+            )
@@ -0,0 +1,473 @@
+import math
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+import numpy as np
+
+NAN = float("nan")
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    sma_period: int = 30
+    rsi_period: int = 14
+    rsi_oversold: float = 30.0
+    rsi_overbought: float = 70.0
+    bb_period: int = 20
+    bb_nbdev: float = 2.0
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    buy_score: int = 2
+    sell_score: int = -2
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        return {
+            "sma_period": self.sma_period,
+            "rsi_period": self.rsi_period,
+            "bb_period": self.bb_period,
+            "bb_nbdev": self.bb_nbdev,
+            "macd_fast": self.macd_fast,
+            "macd_slow": self.macd_slow,
+            "macd_signal": self.macd_signal,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+DEFAULT_PARAMS = StrategyParams()
+
+
+def score_indicators(price, sma, rsi, upper, lower, macd_hist, rsi_oversold=30.0, rsi_overbought=70.0):
+    # Works on scalars and on NumPy arrays alike; NaN (not yet warmed up) indicators contribute 0.
+    return (
+        ((price < lower) + 0) - (price > upper)
+        + (rsi < rsi_oversold) - (rsi > rsi_overbought)
+        + (macd_hist > 0) - (macd_hist < 0)
+        + (price > sma) - (price < sma)
+    )
+
+
+class RollingSMA:
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.value = NAN
+        self._window: deque[float] = deque()
+        self._sum = 0.0
+        self._updates = 0
+
+    def update(self, price: float) -> float:
+        window = self._window
+        if len(window) == self.period:
+            self._sum += price - window.popleft()
+        else:
+            self._sum += price
+        window.append(price)
+        self._updates += 1
+        # Re-sum once per period so floating point drift cannot accumulate (amortized O(1)).
+        if self._updates % self.period == 0:
+            self._sum = math.fsum(window)
+        if len(window) == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+
+class WilderRSI:
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.value = NAN
+        self._prev_price: float | None = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._changes = 0
+
+    def update(self, price: float) -> float:
+        prev_price = self._prev_price
+        self._prev_price = price
+        if prev_price is None:
+            return self.value
+
+        change = price - prev_price
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self._changes += 1
+        period = self.period
+
+        if self._changes < period:
+            self._avg_gain += gain
+            self._avg_loss += loss
+            return self.value
+        if self._changes == period:
+            # Seed with the simple average of the first `period` changes, as TA-Lib does.
+            self._avg_gain = (self._avg_gain + gain) / period
+            self._avg_loss = (self._avg_loss + loss) / period
+        else:
+            self._avg_gain = (self._avg_gain * (period - 1) + gain) / period
+            self._avg_loss = (self._avg_loss * (period - 1) + loss) / period
+
+        total = self._avg_gain + self._avg_loss
+        self.value = 100.0 * (self._avg_gain / total) if total > 0.0 else 0.0
+        return self.value
+
+
+class RollingBollinger:
+    def __init__(self, period: int, nbdevup: float = 2.0, nbdevdn: float = 2.0) -> None:
+        self.period = period
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+        self.upper = NAN
+        self.middle = NAN
+        self.lower = NAN
+        self._window: deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    def update(self, price: float) -> None:
+        window = self._window
+        n = len(window)
+        if n == self.period:
+            # Welford update for a fixed-size sliding window: swap the oldest sample for the new one.
+            old = window.popleft()
+            old_mean = self._mean
+            self._mean += (price - old) / n
+            self._m2 += (price - old) * (price - self._mean + old - old_mean)
+        else:
+            delta = price - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (price - self._mean)
+        window.append(price)
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._resync()
+
+        if len(window) == self.period:
+            variance = self._m2 / self.period
+            stddev = math.sqrt(variance) if variance > 0.0 else 0.0
+            self.middle = self._mean
+            self.upper = self._mean + self.nbdevup * stddev
+            self.lower = self._mean - self.nbdevdn * stddev
+
+    def _resync(self) -> None:
+        window = self._window
+        mean = math.fsum(window) / len(window)
+        self._mean = mean
+        self._m2 = math.fsum((x - mean) * (x - mean) for x in window)
+
+
+class StreamingMACD:
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> None:
+        if fast_period > slow_period:
+            fast_period, slow_period = slow_period, fast_period
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.macd = NAN
+        self.signal = NAN
+        self.hist = NAN
+        self._fast_k = 2.0 / (fast_period + 1)
+        self._slow_k = 2.0 / (slow_period + 1)
+        self._signal_k = 2.0 / (signal_period + 1)
+        # Both EMAs are seeded on the same bar with the SMA of their trailing window,
+        # and the signal line with the SMA of its first `signal_period` MACD values.
+        self._fast_seed = RollingSMA(fast_period)
+        self._slow_seed = RollingSMA(slow_period)
+        self._fast_ema = NAN
+        self._slow_ema = NAN
+        self._signal_ema = NAN
+        self._signal_seed_sum = 0.0
+        self._count = 0
+
+    def update(self, price: float) -> None:
+        self._count += 1
+        count = self._count
+        if count < self.slow_period:
+            self._fast_seed.update(price)
+            self._slow_seed.update(price)
+            return
+        if count == self.slow_period:
+            self._fast_ema = self._fast_seed.update(price)
+            self._slow_ema = self._slow_seed.update(price)
+        else:
+            self._fast_ema += (price - self._fast_ema) * self._fast_k
+            self._slow_ema += (price - self._slow_ema) * self._slow_k
+
+        macd = self._fast_ema - self._slow_ema
+        seen = count - self.slow_period + 1
+        if seen < self.signal_period:
+            self._signal_seed_sum += macd
+            return
+        if seen == self.signal_period:
+            self._signal_ema = (self._signal_seed_sum + macd) / self.signal_period
+        else:
+            self._signal_ema += (macd - self._signal_ema) * self._signal_k
+        self.macd = macd
+        self.signal = self._signal_ema
+        self.hist = macd - self._signal_ema
+
+
+class IndicatorEngine:
+    def __init__(
+        self,
+        sma_period: int = 30,
+        rsi_period: int = 14,
+        bb_period: int = 20,
+        bb_nbdev: float = 2.0,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9,
+    ) -> None:
+        self.count = 0
+        self.price = NAN
+        self._sma = RollingSMA(sma_period)
+        self._rsi = WilderRSI(rsi_period)
+        self._bbands = RollingBollinger(bb_period, bb_nbdev, bb_nbdev)
+        self._macd = StreamingMACD(macd_fast, macd_slow, macd_signal)
+
+    def update(self, price: float) -> None:
+        self.count += 1
+        self.price = price
+        self._sma.update(price)
+        self._rsi.update(price)
+        self._bbands.update(price)
+        self._macd.update(price)
+
+    @property
+    def sma(self) -> float:
+        return self._sma.value
+
+    @property
+    def rsi(self) -> float:
+        return self._rsi.value
+
+    @property
+    def upper_band(self) -> float:
+        return self._bbands.upper
+
+    @property
+    def middle_band(self) -> float:
+        return self._bbands.middle
+
+    @property
+    def lower_band(self) -> float:
+        return self._bbands.lower
+
+    @property
+    def macd(self) -> float:
+        return self._macd.macd
+
+    @property
+    def macd_signal(self) -> float:
+        return self._macd.signal
+
+    @property
+    def macd_hist(self) -> float:
+        return self._macd.hist
+
+
+class BatchIndicatorEngine:
+    # Vectorized counterpart of IndicatorEngine: one row of state per symbol, and every update
+    # advances any subset of rows with a fixed number of NumPy operations. The per-row recurrences
+    # (running sums, Welford variance, Wilder smoothing, EMA seeding) are the same as above.
+    def __init__(
+        self,
+        rows: int = 64,
+        sma_period: int = 30,
+        rsi_period: int = 14,
+        bb_period: int = 20,
+        bb_nbdev: float = 2.0,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9,
+    ) -> None:
+        if macd_fast > macd_slow:
+            macd_fast, macd_slow = macd_slow, macd_fast
+        self.sma_period = sma_period
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_nbdev = bb_nbdev
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal_period = macd_signal
+        self._fast_k = 2.0 / (macd_fast + 1)
+        self._slow_k = 2.0 / (macd_slow + 1)
+        self._signal_k = 2.0 / (macd_signal + 1)
+        self._window = max(sma_period, bb_period, macd_fast, 1)
+        self._updates = 0
+        self._allocate(max(1, rows))
+
+    @property
+    def rows(self) -> int:
+        return self.count.shape[0]
+
+    def ensure_rows(self, rows: int) -> None:
+        if rows <= self.rows:
+            return
+        old = {name: getattr(self, name) for name in self._state_names()}
+        self._allocate(max(rows, self.rows * 2))
+        for name, values in old.items():
+            getattr(self, name)[: values.shape[0]] = values
+
+    def reset(self, rows: np.ndarray) -> None:
+        rows = np.asarray(rows, dtype=np.int64)
+        for name in self._state_names():
+            array = getattr(self, name)
+            array[rows] = np.nan if name in self._NAN_STATE else 0
+
+    def update(self, rows: np.ndarray, prices: np.ndarray) -> None:
+        # `rows` must be unique; each listed row receives exactly one new price.
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size == 0:
+            return
+        prices = np.asarray(prices, dtype=np.float64)
+        width = self._window
+        head = self._heads[rows]
+        count = self.count[rows] + 1
+        ring = self._ring
+
+        def ago(k: int) -> np.ndarray:
+            return ring[rows, (head - k) % width]
+
+        self._update_rsi(rows, prices, count, ago(1))
+        self._update_sma(rows, prices, count, ago(self.sma_period))
+        self._update_bbands(rows, prices, count, ago(self.bb_period))
+        self._update_macd(rows, prices, count, head)
+
+        ring[rows, head] = prices
+        self._heads[rows] = (head + 1) % width
+        self.count[rows] = count
+        self.price[rows] = prices
+
+        self._updates += rows.size
+        if self._updates >= 1000 * self.rows:
+            self._updates = 0
+            self._resync()
+
+    def _update_sma(self, rows: np.ndarray, prices: np.ndarray, count: np.ndarray, old: np.ndarray) -> None:
+        period = self.sma_period
+        total = self._sma_sum[rows] + prices - np.where(count > period, old, 0.0)
+        self._sma_sum[rows] = total
+        self.sma[rows] = np.where(count >= period, total / period, np.nan)
+
+    def _update_rsi(self, rows: np.ndarray, prices: np.ndarray, count: np.ndarray, prev: np.ndarray) -> None:
+        period = self.rsi_period
+        changes = count - 1
+        delta = np.where(changes > 0, prices - prev, 0.0)
+        gain = np.maximum(delta, 0.0)
+        loss = np.maximum(-delta, 0.0)
+        avg_gain = self._avg_gain[rows]
+        avg_loss = self._avg_loss[rows]
+        smoothed = changes > period
+        avg_gain = np.where(smoothed, (avg_gain * (period - 1) + gain) / period, avg_gain + gain)
+        avg_loss = np.where(smoothed, (avg_loss * (period - 1) + loss) / period, avg_loss + loss)
+        seeded = changes == period
+        avg_gain = np.where(seeded, avg_gain / period, avg_gain)
+        avg_loss = np.where(seeded, avg_loss / period, avg_loss)
+        self._avg_gain[rows] = avg_gain
+        self._avg_loss[rows] = avg_loss
+        total = avg_gain + avg_loss
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(total > 0.0, 100.0 * avg_gain / total, 0.0)
+        self.rsi[rows] = np.where(changes >= period, rsi, np.nan)
+
+    def _update_bbands(self, rows: np.ndarray, prices: np.ndarray, count: np.ndarray, old: np.ndarray) -> None:
+        period = self.bb_period
+        full = count > period
+        mean = self._bb_mean[rows]
+        m2 = self._bb_m2[rows]
+        n = np.minimum(count, period)
+        removed = np.where(full, old, 0.0)
+        delta = np.where(full, prices - removed, prices - mean)
+        new_mean = mean + delta / n
+        m2 = m2 + np.where(
+            full,
+            delta * (prices - new_mean + removed - mean),
+            delta * (prices - new_mean),
+        )
+        self._bb_mean[rows] = new_mean
+        self._bb_m2[rows] = m2
+        variance = m2 / period
+        stddev = np.sqrt(np.maximum(variance, 0.0))
+        ready = count >= period
+        self.middle_band[rows] = np.where(ready, new_mean, np.nan)
+        self.upper_band[rows] = np.where(ready, new_mean + self.bb_nbdev * stddev, np.nan)
+        self.lower_band[rows] = np.where(ready, new_mean - self.bb_nbdev * stddev, np.nan)
+
+    def _update_macd(self, rows: np.ndarray, prices: np.ndarray, count: np.ndarray, head: np.ndarray) -> None:
+        slow = self.macd_slow
+        self._slow_sum[rows] += np.where(count <= slow, prices, 0.0)
+
+        fast_ema = self._fast_ema[rows]
+        slow_ema = self._slow_ema[rows]
+        fast_ema = fast_ema + (prices - fast_ema) * self._fast_k
+        slow_ema = slow_ema + (prices - slow_ema) * self._slow_k
+
+        seeding = count == slow
+        if seeding.any():
+            seed_rows = rows[seeding]
+            lags = np.arange(1, self.macd_fast)
+            trailing = self._ring[seed_rows[:, None], (head[seeding][:, None] - lags) % self._window]
+            fast_ema[seeding] = (trailing.sum(axis=1) + prices[seeding]) / self.macd_fast
+            slow_ema[seeding] = self._slow_sum[seed_rows] / slow
+
+        ready = count >= slow
+        fast_ema = np.where(ready, fast_ema, np.nan)
+        slow_ema = np.where(ready, slow_ema, np.nan)
+        self._fast_ema[rows] = fast_ema
+        self._slow_ema[rows] = slow_ema
+        macd = fast_ema - slow_ema
+
+        signal_period = self.macd_signal_period
+        seen = count - slow + 1
+        signal_sum = self._signal_sum[rows] + np.where((seen >= 1) & (seen <= signal_period), macd, 0.0)
+        self._signal_sum[rows] = signal_sum
+        signal = self._signal_ema[rows]
+        signal = np.where(
+            seen == signal_period,
+            signal_sum / signal_period,
+            signal + (macd - signal) * self._signal_k,
+        )
+        signal_ready = seen >= signal_period
+        self._signal_ema[rows] = np.where(signal_ready, signal, np.nan)
+        self.macd[rows] = np.where(signal_ready, macd, np.nan)
+        self.macd_signal[rows] = self._signal_ema[rows]
+        self.macd_hist[rows] = np.where(signal_ready, macd - signal, np.nan)
+
+    def _resync(self) -> None:
+        # Recompute the running window sums from the ring so floating point drift stays bounded.
+        width = self._window
+        lags = np.arange(1, width + 1)
+        ordered = self._ring[np.arange(self.rows)[:, None], (self._heads[:, None] - lags) % width]
+        sma_full = self.count >= self.sma_period
+        sma_sum = ordered[:, : self.sma_period].sum(axis=1)
+        self._sma_sum = np.where(sma_full, sma_sum, self._sma_sum)
+        bb_full = self.count >= self.bb_period
+        bb_window = ordered[:, : self.bb_period]
+        bb_mean = bb_window.mean(axis=1)
+        bb_m2 = ((bb_window - bb_mean[:, None]) ** 2).sum(axis=1)
+        self._bb_mean = np.where(bb_full, bb_mean, self._bb_mean)
+        self._bb_m2 = np.where(bb_full, bb_m2, self._bb_m2)
+
+    _NAN_STATE = frozenset(
+        {
+            "price", "sma", "rsi", "upper_band", "middle_band", "lower_band",
+            "macd", "macd_signal", "macd_hist", "_fast_ema", "_slow_ema", "_signal_ema",
+        }
+    )
+
+    def _state_names(self) -> list[str]:
+        return [
+            "count", "_heads", "_ring", "price", "sma", "rsi", "upper_band", "middle_band", "lower_band",
+            "macd", "macd_signal", "macd_hist", "_sma_sum", "_avg_gain", "_avg_loss", "_bb_mean", "_bb_m2",
+            "_slow_sum", "_fast_ema", "_slow_ema", "_signal_sum", "_signal_ema",
+        ]
+
+    def _allocate(self, rows: int) -> None:
+        self.count = np.zeros(rows, dtype=np.int64)
+        self._heads = np.zeros(rows, dtype=np.int64)
+        self._ring = np.zeros((rows, self._window), dtype=np.float64)
+        for name in self._state_names()[3:]:
+            fill = np.nan if name in self._NAN_STATE else 0.0
+            setattr(self, name, np.full(rows, fill, dtype=np.float64))
@@ -0,0 +1,195 @@
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from loguru import logger
+
+from .env import LOG_ENQUEUE, LOG_FILE, LOG_FILE_ROTATION, LOG_LEVEL, LOG_RING_DUMP_PATH, LOG_RING_SIZE
+
+# (wall clock ns, event code, two int64 arguments); 32 bytes per record.
+_RECORD = struct.Struct("<qH6xqq")
+_SIZE_UNITS = {"b": 1, "kb": 1 << 10, "mb": 1 << 20, "gb": 1 << 30}
+
+
+def parse_size(value: str) -> int:
+    # "500 KB", "1 MB", "1.5GB" or a number of bytes.
+    text = value.strip().lower().replace(" ", "")
+    unit = next((unit for unit in ("kb", "mb", "gb", "b") if text.endswith(unit)), "")
+    return int(float(text[: len(text) - len(unit)]) * _SIZE_UNITS.get(unit, 1))
+
+
+class LogLevels:
+    # Whether TRACE/DEBUG records can reach any sink, set by configure_logging(). Hot loops test these
+    # before building a message, so a filtered-out call costs one attribute read instead of an
+    # f-string and a loguru call. Everything is enabled until logging is configured.
+    __slots__ = ("trace", "debug")
+
+    def __init__(self) -> None:
+        self.trace = True
+        self.debug = True
+
+    def update(self, level: str) -> None:
+        threshold = logger.level(level).no
+        self.trace = threshold <= logger.level("TRACE").no
+        self.debug = threshold <= logger.level("DEBUG").no
+
+
+class EventRing:
+    # Binary ring buffer of the most recent hot-path events: each is packed into a preallocated
+    # bytearray with struct.pack_into, so recording allocates nothing and formats nothing. The ring
+    # is decoded only when dumped, which configure_logging() wires to every ERROR record (at most
+    # once per `dump_interval`). Size 0 disables recording.
+    def __init__(self, size: int = LOG_RING_SIZE, dump_path: str = LOG_RING_DUMP_PATH, dump_interval: float = 10.0) -> None:
+        self.size = max(size, 0)
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.recorded = 0
+        self.dumps = 0
+        self._buffer = bytearray(self.size * _RECORD.size) if self.size else None
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._last_dump = 0.0
+
+    def event(self, name: str) -> int:
+        # Code for an event name; call once at import and pass the code to record().
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    def record(self, code: int, a: int = 0, b: int = 0) -> None:
+        if self._buffer is None:
+            return
+        _RECORD.pack_into(self._buffer, (self.recorded % self.size) * _RECORD.size, time.time_ns(), code, a, b)
+        self.recorded += 1
+
+    def events(self) -> List[Tuple[int, str, int, int]]:
+        # (wall clock ns, event name, a, b), oldest first.
+        if self._buffer is None:
+            return []
+        count = min(self.recorded, self.size)
+        first = self.recorded - count
+        records = []
+        for index in range(first, self.recorded):
+            timestamp, code, a, b = _RECORD.unpack_from(self._buffer, (index % self.size) * _RECORD.size)
+            records.append((timestamp, self._names[code] if code < len(self._names) else str(code), a, b))
+        return records
+
+    def dump(self, reason: str = "") -> Optional[str]:
+        # Appends the decoded ring to `dump_path`; returns the path, or None if nothing was written.
+        now = time.monotonic()
+        if self._buffer is None or not self.dump_path or now - self._last_dump < self.dump_interval:
+            return None
+        self._last_dump = now
+        lines = [f"=== {datetime.now().isoformat()} last {min(self.recorded, self.size)} events: {reason.strip()}"]
+        for timestamp, name, a, b in self.events():
+            lines.append(f"{datetime.fromtimestamp(timestamp / 1e9).isoformat()} {name} {a} {b}")
+        try:
+            with open(self.dump_path, "a") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError as e:
+            # Not through loguru: this runs inside a sink.
+            print(f"[EventRing] Could not write {self.dump_path}: {e}", file=sys.stderr)
+            return None
+        self.dumps += 1
+        return self.dump_path
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": self.size, "recorded": self.recorded, "dumps": self.dumps}
+
+
+class QueuedFileSink:
+    # File sink whose write() only puts the formatted line on a SimpleQueue; a daemon thread writes
+    # whatever has queued up in one call and rotates the file (renamed with a timestamp, like
+    # loguru's own rotation) once it grows past `max_bytes`. loguru's enqueue=True pickles every
+    # record on the calling thread, which costs the event loop more than the write it avoids.
+    def __init__(self, path: str, max_bytes: int = 0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.rotations = 0
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        self._queue.put(message)
+
+    def stop(self) -> None:
+        # Called by loguru when the sink is removed; returns once everything queued is on disk.
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        file = open(self.path, "a", encoding="utf-8")
+        size = file.tell()
+        running = True
+        while running:
+            lines = [self._queue.get()]
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in lines:
+                running = False
+                lines = lines[: lines.index(None)]
+            if not lines:
+                continue
+            chunk = "".join(lines)
+            try:
+                file.write(chunk)
+                file.flush()
+            except OSError as e:
+                print(f"[QueuedFileSink] Could not write {self.path}: {e}", file=sys.stderr)
+                continue
+            size += len(chunk)
+            self.written += len(lines)
+            if self.max_bytes and size >= self.max_bytes:
+                file.close()
+                root, extension = os.path.splitext(self.path)
+                os.replace(self.path, f"{root}.{datetime.now().strftime('%Y-%m-%d_%H-%M-%S_%f')}{extension}")
+                file = open(self.path, "a", encoding="utf-8")
+                size = 0
+                self.rotations += 1
+        file.close()
+
+
+LOG = LogLevels()
+RING = EventRing()
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    file: str = LOG_FILE,
+    rotation: str = LOG_FILE_ROTATION,
+    enqueue: bool = LOG_ENQUEUE,
+    ring: EventRing = RING,
+    console: Optional[TextIO] = sys.stdout,
+) -> None:
+    # Console and file sinks at `level`. With `enqueue`, the file is written by a QueuedFileSink
+    # thread, so a slow disk or a rotation never blocks the event loop; otherwise loguru writes it
+    # synchronously.
+    logger.remove()
+    if console is not None:
+        logger.add(console, level=level)
+    if file and enqueue:
+        logger.add(QueuedFileSink(file, parse_size(rotation)), level=level, colorize=False)
+    elif file:
+        logger.add(file, rotation=rotation, level=level)
+    if ring.size:
+        logger.add(lambda message: ring.dump(message.record["message"]), level="ERROR", format="{message}")
+    LOG.update(level)
+    logger.info(f"[log_config] Logging at {level}{' (enqueued)' if enqueue else ''}; hot-path ring holds {ring.size} events.")
+
+
+def shutdown_logging() -> None:
+    # Removing the sinks stops the QueuedFileSink thread once the queued lines are written.
+    logger.remove()
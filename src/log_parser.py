@@ -0,0 +1,69 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+MINT_MARKER = "TokenMinted"
+
+# "TokenMinted|mint=<address>|symbol=MEME|initial_supply=1000|trade_amount=500"
+_FIELD_RE = re.compile(r"\|\s*([^|=]+?)\s*=\s*([^|]*?)\s*(?=\||$)")
+_MINT_RE = re.compile(r"\|\s*mint\s*=\s*([^|]*?)\s*(?=\||$)")
+_KNOWN_FIELDS = frozenset(("mint", "symbol", "initial_supply", "trade_amount"))
+DEFAULT_TRADE_AMOUNT = 1000
+# SOL bought per unit of a log's trade_amount: the original sizing read it as 10^6 lamports.
+TRADE_AMOUNT_SOL = 1e-3
+
+
+class CoinDetails:
+    __slots__ = ("mint", "symbol", "initial_supply", "trade_amount", "extra")
+
+    def __init__(
+        self,
+        mint: str = "",
+        symbol: str = "",
+        initial_supply: float = 0.0,
+        trade_amount: int = DEFAULT_TRADE_AMOUNT,
+        extra: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.mint = mint
+        self.symbol = symbol
+        self.initial_supply = initial_supply
+        self.trade_amount = trade_amount
+        self.extra = extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        details: Dict[str, Any] = dict(self.extra or {})
+        details.update(
+            mint=self.mint, symbol=self.symbol, initial_supply=self.initial_supply, trade_amount=self.trade_amount
+        )
+        return details
+
+    def __repr__(self) -> str:
+        return (
+            f"CoinDetails(mint={self.mint!r}, symbol={self.symbol!r}, "
+            f"initial_supply={self.initial_supply}, trade_amount={self.trade_amount})"
+        )
+
+
+def is_candidate(log: str) -> bool:
+    return MINT_MARKER in log
+
+
+def find_candidates(logs: Iterable[str]) -> Iterator[str]:
+    return (log for log in logs if MINT_MARKER in log)
+
+
+def candidate_mint(log: str) -> str:
+    # Just the mint field of a candidate line ("" if absent), for routing it before it is parsed.
+    match = _MINT_RE.search(log)
+    return match.group(1) if match else ""
+
+
+def parse_coin_details(log: str) -> Optional[CoinDetails]:
+    # Only called for lines that passed is_candidate; returns None for malformed numeric fields.
+    fields = dict(_FIELD_RE.findall(log))
+    try:
+        initial_supply = float(fields.get("initial_supply", 0))
+        trade_amount = int(fields.get("trade_amount", DEFAULT_TRADE_AMOUNT))
+    except ValueError:
+        return None
+    extra = {key: value for key, value in fields.items() if key not in _KNOWN_FIELDS} or None
+    return CoinDetails(fields.get("mint", ""), fields.get("symbol", ""), initial_supply, trade_amount, extra)
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+import numpy as np
+from loguru import logger
+
+from .env import LOOP_LAG_INTERVAL, LOOP_LAG_WARN
+from .metrics import METRICS
+
+
+class LoopLagMonitor:
+    # Measures how late the event loop wakes a coroutine that sleeps `interval` seconds. Anything
+    # hogging the loop (decoding, signing, a blocking call) shows up as lag; a wake-up more than
+    # `warn` seconds late is logged.
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, warn: float = LOOP_LAG_WARN, history: int = 4096) -> None:
+        self.interval = interval
+        self.warn = warn
+        self.samples: Deque[float] = deque(maxlen=history)
+        self.max_lag = 0.0
+        self.late = 0
+        self._histogram = METRICS.histogram("event_loop_lag_seconds", "How late the event loop wakes a sleeping coroutine")
+        self._run_monitor = True
+
+    async def run(self) -> None:
+        while self._run_monitor:
+            expected = time.perf_counter() + self.interval
+            try:
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            lag = max(time.perf_counter() - expected, 0.0)
+            self.samples.append(lag)
+            self._histogram.record(int(lag * 1e9))
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.warn:
+                self.late += 1
+                logger.warning(f"[LoopLagMonitor] Event loop blocked for {lag * 1000:.1f}ms.")
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"samples": 0}
+        p50, p99 = np.percentile(np.fromiter(self.samples, dtype=float), [50, 99])
+        return {
+            "samples": len(self.samples),
+            "p50_ms": p50 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": self.max_lag * 1000,
+            "late": self.late,
+        }
+
+    def stop(self) -> None:
+        self._run_monitor = False
+        logger.info(f"[LoopLagMonitor] Stopping. Stats: {self.stats()}")
@@ -2,37 +2,63 @@ import os
 import sys
 import signal
 import asyncio
-import random
-from datetime import datetime
+from typing import Callable, List, Optional
+import numpy as np
 from loguru import logger
+from .candle_aggregator import CLOSE, START, CandleAggregator
 from .db import DatabaseManager
 from .dex_screener_scanner import DexScreenerScanner
+from .http_client import HttpClient
+from .log_config import RING, configure_logging, shutdown_logging
+from .loop_monitor import LoopLagMonitor
 from .market_data_streamer import MarketDataStreamer
 from .memcoin_scanner import MemeCoinScanner
-from .strategy_manager import StrategyManager
+from .metrics import METRICS, MetricsServer
+from .order_dispatcher import OrderDispatcher
+from .pool_price_feed import PoolPriceFeed
+from .rpc_pool import RpcEndpointPool
+from .strategy_manager import PortfolioStrategyManager
+from .subscription_hub import SubscriptionHub
 from .trade_executor import TradeExecutor
 
-from .env import DEFAULT_MEME_MINT, ORDER_QUANTITY, SOL_MINT, STRATEGY_LOOP_INTERVAL
+from .env import CANDLE_STRATEGY_TIMEFRAME, ORDER_QUANTITY, ORDER_SELL_QUANTITY, SHARD_WORKERS, STRATEGY_LOOP_INTERVAL
 
-async def strategy_loop(strategy_manager: StrategyManager, executor: TradeExecutor, db_manager: DatabaseManager) -> None:
+def connect_strategy(candles: CandleAggregator, strategy_manager: PortfolioStrategyManager) -> None:
+    # Indicators advance once per closed bar, so their periods are counted in CANDLE_STRATEGY_TIMEFRAME bars.
+    # A batch can hold several bars of one mint (ticks closed some before the flush); they are fed one
+    # bucket at a time, oldest first, so none is skipped.
+    def on_bars(timeframe: int, mints: List[str], bars: np.ndarray) -> None:
+        starts = bars[:, START]
+        order = np.argsort(starts, kind="stable")
+        bounds = np.flatnonzero(np.diff(starts[order])) + 1
+        for group in np.split(order, bounds):
+            strategy_manager.update_prices(
+                {mints[i]: float(bars[i, CLOSE]) for i in group.tolist()}, float(starts[group[0]]) + timeframe
+            )
+
+    candles.add_listener(on_bars, timeframe=CANDLE_STRATEGY_TIMEFRAME)
+
+async def strategy_loop(
+    strategy_manager: PortfolioStrategyManager, dispatcher: OrderDispatcher, price_of: Callable[[str], Optional[float]]
+) -> None:
+    # Closed bars reach the strategy as the candle aggregator flushes them; this loop only scores them.
     while True:
         try:
-            price = random.uniform(0, 100)
-            strategy_manager.update_price(price)
-            signal = strategy_manager.generate_trading_signal()
-            if signal:
-                logger.info(f"[strategy_loop] Trading signal: {signal} at price {price:.2f}")
-                target_mint = DEFAULT_MEME_MINT if DEFAULT_MEME_MINT else SOL_MINT
-                response = await executor.execute_market_order(target_mint, signal.lower(), ORDER_QUANTITY)
-                trade_details = {
-                    "signal": signal,
-                    "price": price,
-                    "response": response,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                await db_manager.store_trade_log(trade_details)
-                if response and response.get("result"):
-                    logger.success("[strategy_loop] Profitable trade executed successfully.")
+            for target_mint, signal, score in strategy_manager.generate_trading_signals():
+                price = price_of(target_mint)
+                if price is None:
+                    # No pool price yet (not seeded, or not known to this shard): nothing to size the order with.
+                    logger.warning(f"[strategy_loop] Skipping {signal} signal for {target_mint}: no price yet.")
+                    continue
+                logger.info(f"[strategy_loop] Trading signal: {signal} (score {score}) for {target_mint} at price {price:.9g}")
+                dispatcher.submit(
+                    target_mint,
+                    signal.lower(),
+                    ORDER_QUANTITY if signal == "BUY" else ORDER_SELL_QUANTITY,
+                    source="strategy_loop",
+                    trade_details={"signal": signal, "mint": target_mint, "score": score, "price": price},
+                    price=price,
+                )
             await asyncio.sleep(STRATEGY_LOOP_INTERVAL)
         except asyncio.CancelledError:
             logger.info("[strategy_loop] Task cancelled.")
@@ -47,25 +73,58 @@ def shutdown_handler(loop: asyncio.AbstractEventLoop) -> None:
     logger.info("[shutdown_handler] All tasks cancelled.")
 
 async def main() -> None:
-    logger.remove()
-    logger.add(sys.stdout, level="DEBUG")
-    logger.add("trading_bot.log", rotation="1 MB", level="DEBUG")
+    configure_logging()
     logger.info("[main] Starting Meme Coin Trading Bot...")
 
     db_manager = DatabaseManager()
     await db_manager.connect()
 
-    trade_executor = TradeExecutor()
-    strategy_manager = StrategyManager()
+    http_client = HttpClient()
+    rpc_pool = RpcEndpointPool(http_client)
+    subscription_hub = SubscriptionHub(rpc_pool=rpc_pool)
+    trade_executor = TradeExecutor(http_client, hub=subscription_hub, rpc_pool=rpc_pool)
+    order_dispatcher = OrderDispatcher(trade_executor, db_manager)
+    strategy_manager = PortfolioStrategyManager()
+    loop_monitor = LoopLagMonitor()
+
+    price_feed = PoolPriceFeed(subscription_hub, trade_executor.mint_metadata, rpc_pool)
+    candles = CandleAggregator(db_manager)
+    price_feed.add_listener(lambda mint, price, volume, slot, timestamp: candles.update(mint, price, volume, timestamp))
+    connect_strategy(candles, strategy_manager)
+    market_streamer = MarketDataStreamer(db_manager, subscription_hub)
+    dex_scanner = DexScreenerScanner(trade_executor, db_manager, http_client, dispatcher=order_dispatcher)
+    meme_scanner = MemeCoinScanner(trade_executor, db_manager, subscription_hub, dispatcher=order_dispatcher)
 
-    market_streamer = MarketDataStreamer(db_manager)
-    dex_scanner = DexScreenerScanner(trade_executor, db_manager)
-    meme_scanner = MemeCoinScanner(trade_executor, db_manager)
+    # Component stats are read at scrape time and exported next to the hot-path histograms.
+    METRICS.register_collector("loop_lag", loop_monitor.stats)
+    METRICS.register_collector("orders", order_dispatcher.metrics)
+    METRICS.register_collector("db", db_manager.metrics)
+    METRICS.register_collector("rpc", rpc_pool.stats)
+    METRICS.register_collector("ws", subscription_hub.metrics)
+    METRICS.register_collector("transactions", trade_executor.submitter.stats)
+    METRICS.register_collector("signing", trade_executor.signer.stats)
+    METRICS.register_collector("candles", candles.stats)
+    METRICS.register_collector("log_ring", RING.stats)
+    metrics_server = MetricsServer()
+    await metrics_server.start()
 
+    # Priced mints are traded repeatedly in both directions by the strategy, so keep their quotes warm.
+    for mint in price_feed.pools:
+        trade_executor.prefetch_market_order(mint, "buy", ORDER_QUANTITY)
+        trade_executor.prefetch_market_order(mint, "sell", ORDER_SELL_QUANTITY)
+
+    loop_monitor_task = asyncio.create_task(loop_monitor.run())
+    rpc_pool_task = asyncio.create_task(rpc_pool.run())
+    quote_cache_task = asyncio.create_task(trade_executor.quote_cache.run())
+    mint_metadata_task = asyncio.create_task(trade_executor.mint_metadata.run())
+    submitter_task = asyncio.create_task(trade_executor.submitter.run())
+    subscription_hub_task = asyncio.create_task(subscription_hub.run())
     market_streamer_task = asyncio.create_task(market_streamer.stream_data())
     dex_scanner_task = asyncio.create_task(dex_scanner.scan_for_new_coins())
     meme_scanner_task = asyncio.create_task(meme_scanner.scan_and_trade())
-    strategy_task = asyncio.create_task(strategy_loop(strategy_manager, trade_executor, db_manager))
+    price_feed_task = asyncio.create_task(price_feed.run())
+    candles_task = asyncio.create_task(candles.run())
+    strategy_task = asyncio.create_task(strategy_loop(strategy_manager, order_dispatcher, price_feed.price))
 
     loop = asyncio.get_running_loop()
     if os.name != 'nt':  
@@ -77,7 +136,15 @@ async def main() -> None:
             market_streamer_task,
             dex_scanner_task,
             meme_scanner_task,
-            strategy_task
+            strategy_task,
+            price_feed_task,
+            candles_task,
+            quote_cache_task,
+            mint_metadata_task,
+            submitter_task,
+            subscription_hub_task,
+            rpc_pool_task,
+            loop_monitor_task
         )
     except asyncio.CancelledError:
         logger.info("[main] Cancellation signal received.")
@@ -88,8 +155,18 @@ async def main() -> None:
         market_streamer.stop()
         dex_scanner.stop()
         meme_scanner.stop()
+        price_feed.stop()
+        candles.stop()
+        subscription_hub.stop()
+        loop_monitor.stop()
+        await order_dispatcher.close()
         await trade_executor.close()
+        rpc_pool.stop()
+        await rpc_pool.close()
+        await http_client.close()
         await db_manager.close()
+        await metrics_server.close()
+        logger.info(f"[main] Stage latencies: {METRICS.stats()}")
         logger.info("[main] Meme Coin Trading Bot shut down.")
         
 def run_bot():
@@ -97,6 +174,13 @@ def run_bot():
         # optimize_system()
         if sys.platform == "win32":
             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        asyncio.run(main())
+        if SHARD_WORKERS > 0:
+            # Imported here: the sharded runtime's processes import this module for strategy_loop.
+            from .sharded_runtime import ShardSupervisor
+            ShardSupervisor().run()
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("[__main__] KeyboardInterrupt - shutting down.")
+    finally:
+        shutdown_logging()
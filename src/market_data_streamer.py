@@ -1,71 +1,56 @@
 import asyncio
-import json
 from loguru import logger
-from solana.rpc.websocket_api import connect as solana_ws_connect
 
 # Use solders for transaction and keypair functionality
 from solders.rpc.responses import LogsNotification, RpcLogsResponse
 from .db import DatabaseManager
-from .env import WS_URL
+from .env import MARKET_DATA_STORE_ALL_LOGS
+from .log_config import LOG, RING
+from .log_parser import MINT_MARKER
+from .subscription_hub import TOKEN_PROGRAM_ID, SubscriptionHub
+
+_STORED = RING.event("market_data_stored")
 
 class MarketDataStreamer:
-    def __init__(self, db_manager: DatabaseManager) -> None:
+    def __init__(self, db_manager: DatabaseManager, hub: SubscriptionHub, store_all_logs: bool = MARKET_DATA_STORE_ALL_LOGS) -> None:
         self.db_manager = db_manager
-        self.ws_url = WS_URL
+        self.hub = hub
+        self.store_all_logs = store_all_logs
         self._run_stream = True
-        self.subscriptions = {}  # Track active subscriptions by id
 
     async def stream_data(self) -> None:
-        async with solana_ws_connect(self.ws_url) as websocket:
-            logger.info("[MarketDataStreamer] Connected to Solana WebSocket.")
-
-            # Send a subscription request
-            subscription_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "logsSubscribe",
-                "params": {
-                    "mentions": "mint",
-                    "filters": ["programId", "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"]
-                }
-            }
-
-            # Track the subscription ID
-            self.subscriptions[1] = websocket  # Map the ID to the WebSocket connection
-
-            await websocket.send(json.dumps(subscription_request))
-            logger.info("[MarketDataStreamer] Sent subscription request to WebSocket.")
-
+        # Shares the Token Program logs subscription with MemeCoinScanner through the hub. The hub only
+        # skips a frame before decoding when every consumer of the channel has a prefilter, so storing
+        # every log (the default) means every frame is decoded.
+        prefilter = None if self.store_all_logs else MINT_MARKER
+        subscription = self.hub.subscribe_logs(TOKEN_PROGRAM_ID, name="MarketDataStreamer", prefilter=prefilter)
+        logger.info(f"[MarketDataStreamer] Subscribed to Token Program logs ({'all' if prefilter is None else 'mint candidates only'}).")
+        try:
             while self._run_stream:
                 try:
-                    msg = await websocket.recv()
-                    if not msg:
-                        continue
-                    logger.trace(f"[MarketDataStreamer] Received WebSocket message: {msg}")
-
-                    # Process the response
-                    for response_data in msg:
-                        # Handle the result based on the subscription id
-                        subscription_id = response_data.id
-                        if subscription_id and subscription_id in self.subscriptions:
-                            logger.debug(f"[MarketDataStreamer] Subscription response: id={subscription_id}, result={response_data.result}")
-                        else:
-                            logger.warning(f"[MarketDataStreamer] Received response for an unrecognized subscription ID: {subscription_id}")
-
-                        # Process logs from the 'result' field if available
-                        if isinstance(response_data, LogsNotification) and response_data.result:
-                            log_info = response_data.result.value
-                            log_msg = log_info.get("msg", "")
-                            logger.debug(f"[MarketDataStreamer] Log message: {log_msg}")
-                            await self.db_manager.store_market_data({"log": log_msg})
-                            logger.debug(f"[MarketDataStreamer] Stored log: {log_msg}")
+                    response_data = await subscription.get()
+                    if LOG.trace:
+                        logger.trace("[MarketDataStreamer] Received notification: {}", response_data)
+
+                    # Process logs from the 'result' field if available
+                    if isinstance(response_data, LogsNotification) and response_data.result:
+                        log_info = response_data.result.value
+                        log_msg = "\n".join(log_info.logs)
+                        slot = response_data.result.context.slot
+                        signature = str(log_info.signature)
+                        await self.db_manager.store_market_data({"log": log_msg}, slot=slot, signature=signature)
+                        RING.record(_STORED, slot, len(log_msg))
+                        if LOG.debug:
+                            logger.debug("[MarketDataStreamer] Stored {} log lines for {}.", len(log_info.logs), signature)
 
                 except KeyError as e:
-                    logger.error(f"[MarketDataStreamer] KeyError occurred while processing WebSocket message: {e}")
+                    logger.error(f"[MarketDataStreamer] KeyError occurred while processing notification: {e}")
+                except asyncio.CancelledError:
+                    raise
                 except Exception as e:
-                    logger.exception(f"[MarketDataStreamer] Error processing WebSocket message: {e}")
-
-                await asyncio.sleep(0)
+                    logger.exception(f"[MarketDataStreamer] Error processing notification: {e}")
+        finally:
+            await subscription.close()
 
     def stop(self) -> None:
         self._run_stream = False
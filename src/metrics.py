@@ -0,0 +1,265 @@
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from loguru import logger
+
+from .env import METRICS_HOST, METRICS_PORT
+
+# Log-linear buckets over integer nanoseconds, HdrHistogram style: values below 2**_SUB_BITS get a
+# bucket each, above that every power of two is split into 2**(_SUB_BITS - 1) equal buckets, so any
+# recorded value is off by at most 1/2**(_SUB_BITS - 1) (6.25%) of itself. 40 bits cover ~18 minutes.
+_SUB_BITS = 5
+_HALF_BITS = _SUB_BITS - 1
+_MAX_BITS = 40
+_BUCKETS = ((_MAX_BITS - _SUB_BITS + 1) << _HALF_BITS) + (1 << _SUB_BITS)
+_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Bucket of a value with bit_length() b is _BUCKET_BASE[b] + (value >> _BUCKET_SHIFT[b]); tabulated for
+# every 64-bit length so record() needs no branches. Lengths past _MAX_BITS shift everything out and
+# land in the last bucket.
+_BUCKET_SHIFT = [max(bits - _SUB_BITS, 0) if bits <= _MAX_BITS else bits for bits in range(65)]
+_BUCKET_BASE = [
+    max(bits - _SUB_BITS, 0) << _HALF_BITS if bits <= _MAX_BITS else _BUCKETS - 1 for bits in range(65)
+]
+
+
+def _bucket_floor(index: int) -> int:
+    if index < 1 << _SUB_BITS:
+        return index
+    shift = (index >> _HALF_BITS) - 1
+    return (index - (shift << _HALF_BITS)) << shift
+
+
+class LatencyHistogram:
+    # Fixed-size latency histogram in nanoseconds. record() is a bit_length, two table lookups, a
+    # shift and two integer adds on plain lists; the count is summed from the buckets when read. A
+    # span (two perf_counter_ns() calls and since()) stays under a microsecond: `bench-metrics`.
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.total = 0
+        self.max = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record(self, value: int, _base: List[int] = _BUCKET_BASE, _shift: List[int] = _BUCKET_SHIFT) -> None:
+        if value < 0:
+            return
+        bits = value.bit_length()
+        self.counts[_base[bits] + (value >> _shift[bits])] += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def since(
+        self, start: int, _now: Callable[[], int] = time.perf_counter_ns, _base: List[int] = _BUCKET_BASE,
+        _shift: List[int] = _BUCKET_SHIFT,
+    ) -> None:
+        # Records the time elapsed since `start`, a time.perf_counter_ns() reading. record() inlined.
+        value = _now() - start
+        if value < 0:
+            return
+        bits = value.bit_length()
+        self.counts[_base[bits] + (value >> _shift[bits])] += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> int:
+        # Upper edge of the bucket holding the q-th value, capped at the largest value seen.
+        count = self.count
+        if not count:
+            return 0
+        rank = max(1, int(q * count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(_bucket_floor(index + 1) - 1, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        count = self.count
+        return {
+            "count": count,
+            "avg_us": self.total / count / 1000 if count else 0.0,
+            "p50_us": self.quantile(0.5) / 1000,
+            "p99_us": self.quantile(0.99) / 1000,
+            "max_us": self.max / 1000,
+        }
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class MetricsRegistry:
+    # Process-wide latency histograms and counters, keyed by metric name and labels, plus collectors:
+    # callbacks returning a component's existing stats() dict, exported as gauges at scrape time.
+    # Metrics are created once (usually at import) and the hot path only touches the returned object.
+    def __init__(self, namespace: str = "solana_bot") -> None:
+        self.namespace = namespace
+        self._histograms: Dict[str, Dict[Labels, LatencyHistogram]] = {}
+        self._counters: Dict[str, Dict[Labels, Counter]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def histogram(self, name: str, help: str = "", **labels: str) -> LatencyHistogram:
+        return self._metric(self._histograms, LatencyHistogram, name, help, labels)
+
+    def counter(self, name: str, help: str = "", **labels: str) -> Counter:
+        return self._metric(self._counters, Counter, name, help, labels)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        self._collectors[name] = collect
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def reset(self) -> None:
+        # Zeroes every histogram and counter in place, so references held by instrumented code stay valid.
+        for family in self._histograms.values():
+            for histogram in family.values():
+                histogram.__init__()
+        for family in self._counters.values():
+            for counter in family.values():
+                counter.value = 0
+
+    def stats(self) -> Dict[str, Any]:
+        # Histogram summaries for logs and benchmark reports, e.g. {"stage_seconds{stage=quote}": {...}}.
+        return {
+            self._key(name, labels): histogram.summary()
+            for name, family in self._histograms.items()
+            for labels, histogram in family.items()
+            if histogram.count
+        }
+
+    def render(self) -> str:
+        # Prometheus text exposition format (0.0.4). Histograms are exported as summaries in seconds.
+        lines: List[str] = []
+        for name, family in self._histograms.items():
+            full = f"{self.namespace}_{name}"
+            self._header(lines, full, name, "summary")
+            for labels, histogram in family.items():
+                for q in _QUANTILES:
+                    lines.append(f"{full}{self._labels(labels + (('quantile', str(q)),))} {histogram.quantile(q) / 1e9:.9f}")
+                lines.append(f"{full}_sum{self._labels(labels)} {histogram.total / 1e9:.9f}")
+                lines.append(f"{full}_count{self._labels(labels)} {histogram.count}")
+        for name, family in self._counters.items():
+            full = f"{self.namespace}_{name}"
+            self._header(lines, full, name, "counter")
+            for labels, counter in family.items():
+                lines.append(f"{full}{self._labels(labels)} {counter.value}")
+        for collector, collect in list(self._collectors.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                logger.error(f"[MetricsRegistry] Collector {collector} failed: {e}")
+                continue
+            gauges: Dict[str, List[str]] = {}
+            for name, labels, value in self._flatten(collector, values, ()):
+                gauges.setdefault(name, []).append(f"{self.namespace}_{name}{self._labels(labels)} {float(value):g}")
+            for name, samples in gauges.items():
+                lines.append(f"# TYPE {self.namespace}_{name} gauge")
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def _metric(self, families: Dict[str, Dict[Labels, Any]], factory: Callable[[], Any], name: str, help: str, labels: Dict[str, str]) -> Any:
+        family = families.setdefault(name, {})
+        if help:
+            self._help[name] = help
+        key = tuple(sorted(labels.items()))
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = factory()
+        return metric
+
+    def _header(self, lines: List[str], full: str, name: str, kind: str) -> None:
+        if name in self._help:
+            lines.append(f"# HELP {full} {self._help[name]}")
+        lines.append(f"# TYPE {full} {kind}")
+
+    def _flatten(self, prefix: str, values: Dict[str, Any], labels: Labels) -> List[Tuple[str, Labels, Any]]:
+        # Identifier keys extend the metric name; others (URLs, mints, "1s") become a `key` label.
+        samples = []
+        for key, value in values.items():
+            key = str(key)
+            if _NAME.match(key):
+                name, child_labels = f"{prefix}_{key}", labels
+            else:
+                name, child_labels = prefix, labels + (("key", key),)
+            if isinstance(value, dict):
+                samples.extend(self._flatten(name, value, child_labels))
+            elif isinstance(value, (int, float)):
+                samples.append((name, child_labels, value))
+        return samples
+
+    @staticmethod
+    def _labels(labels: Labels) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+    @staticmethod
+    def _key(name: str, labels: Labels) -> str:
+        return name + ("{" + ",".join(f"{key}={value}" for key, value in labels) + "}" if labels else "")
+
+
+METRICS = MetricsRegistry()
+
+
+def stage(name: str) -> LatencyHistogram:
+    # Latency of one hot-path stage, exported as solana_bot_stage_seconds{stage="<name>"}.
+    return METRICS.histogram("stage_seconds", "Latency of each hot-path stage", stage=name)
+
+
+class MetricsServer:
+    # Serves the registry at http://METRICS_HOST:METRICS_PORT/metrics for Prometheus to scrape.
+    # Port 0 disables it.
+    def __init__(self, registry: MetricsRegistry = METRICS, host: str = METRICS_HOST, port: int = METRICS_PORT) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.scrapes = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        if not self.port:
+            logger.info("[MetricsServer] METRICS_PORT is 0; metrics endpoint disabled.")
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"[MetricsServer] Serving metrics on http://{self.host}:{self.port}/metrics.")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        logger.info(f"[MetricsServer] Closed after {self.scrapes} scrape(s).")
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        self.scrapes += 1
+        return web.Response(body=self.registry.render().encode("utf-8"), headers={"Content-Type": _CONTENT_TYPE})
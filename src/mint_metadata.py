@@ -0,0 +1,230 @@
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+from solders.pubkey import Pubkey
+
+from .env import MINT_METADATA_BATCH_INTERVAL, MINT_METADATA_PATH, MINT_METADATA_TTL, SOL_MINT
+from .rpc_pool import RpcEndpointPool
+from .subscription_hub import TOKEN_PROGRAM_ID
+
+TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PeKaJ8L6mSPEHxB"
+# SPL Token Mint: COption<Pubkey> mint_authority, u64 supply, u8 decimals, bool is_initialized,
+# COption<Pubkey> freeze_authority. Token-2022 mints share this prefix and append extensions.
+_MINT_LAYOUT = struct.Struct("<I32sQBBI32s")
+MINT_SIZE = _MINT_LAYOUT.size
+MAX_ACCOUNTS_PER_REQUEST = 100
+
+
+class MintMetadata:
+    __slots__ = ("mint", "decimals", "supply", "mint_authority", "freeze_authority", "fetched_at")
+
+    def __init__(
+        self,
+        mint: str,
+        decimals: int,
+        supply: int = 0,
+        mint_authority: Optional[str] = None,
+        freeze_authority: Optional[str] = None,
+        fetched_at: float = 0.0,
+    ) -> None:
+        self.mint = mint
+        self.decimals = decimals
+        self.supply = supply
+        self.mint_authority = mint_authority
+        self.freeze_authority = freeze_authority
+        self.fetched_at = fetched_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "decimals": self.decimals,
+            "supply": self.supply,
+            "mint_authority": self.mint_authority,
+            "freeze_authority": self.freeze_authority,
+            "fetched_at": self.fetched_at,
+        }
+
+    def __repr__(self) -> str:
+        return f"MintMetadata(mint={self.mint!r}, decimals={self.decimals}, supply={self.supply})"
+
+
+def parse_mint_account(mint: str, data: bytes, fetched_at: float = 0.0) -> Optional[MintMetadata]:
+    if len(data) < MINT_SIZE:
+        return None
+    mint_auth_tag, mint_auth, supply, decimals, initialized, freeze_auth_tag, freeze_auth = _MINT_LAYOUT.unpack_from(data)
+    if not initialized:
+        return None
+    return MintMetadata(
+        mint,
+        decimals,
+        supply,
+        str(Pubkey.from_bytes(mint_auth)) if mint_auth_tag else None,
+        str(Pubkey.from_bytes(freeze_auth)) if freeze_auth_tag else None,
+        fetched_at,
+    )
+
+
+class MintMetadataCache:
+    # Decimals, supply and authorities of SPL mints. Mints are queued with warm() as soon as a scanner
+    # sees them and fetched by run() in batches of up to 100 per hedged getMultipleAccounts call, so
+    # sizing an order is a dictionary lookup. Decimals never change, so a stale entry keeps answering decimals()
+    # while it is refreshed. Entries are saved to `path` (JSON) on stop and reloaded at startup.
+    def __init__(
+        self,
+        rpc_pool: RpcEndpointPool,
+        ttl: float = MINT_METADATA_TTL,
+        path: Optional[str] = MINT_METADATA_PATH,
+        batch_interval: float = MINT_METADATA_BATCH_INTERVAL,
+    ) -> None:
+        self.rpc_pool = rpc_pool
+        self.ttl = ttl
+        self.path = path
+        self.batch_interval = batch_interval
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        # Wrapped SOL is the quote side of every order.
+        self._entries: Dict[str, MintMetadata] = {SOL_MINT: MintMetadata(SOL_MINT, 9, fetched_at=float("inf"))}
+        self._queued: Set[str] = set()
+        # Addresses that are not SPL mints are never queried again.
+        self._rejected: Set[str] = set()
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+        self._run_fetcher = True
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, mint: str) -> Optional[MintMetadata]:
+        return self._entries.get(mint)
+
+    def decimals(self, mint: str) -> Optional[int]:
+        entry = self._entries.get(mint)
+        if entry is None:
+            self.misses += 1
+            self.warm(mint)
+            return None
+        self.hits += 1
+        if time.time() - entry.fetched_at > self.ttl:
+            self.warm(mint)
+        return entry.decimals
+
+    def warm(self, mint: str) -> None:
+        if mint in self._queued or mint in self._rejected:
+            return
+        self._queued.add(mint)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def get(self, mint: str) -> Optional[MintMetadata]:
+        entry = self._entries.get(mint)
+        if entry is not None and time.time() - entry.fetched_at <= self.ttl:
+            return entry
+        if mint in self._rejected:
+            return None
+        if not self._running:
+            await self._fetch([mint])
+            return self._entries.get(mint)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(mint, []).append(waiter)
+        self.warm(mint)
+        await waiter
+        return self._entries.get(mint)
+
+    async def run(self) -> None:
+        self._running = True
+        self._wakeup = asyncio.Event()
+        while self._run_fetcher:
+            try:
+                if not self._queued:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                # Give the other mints of the same scan a moment to join this batch.
+                await asyncio.sleep(self.batch_interval)
+                batch = list(self._queued)[:MAX_ACCOUNTS_PER_REQUEST]
+                self._queued.difference_update(batch)
+                await self._fetch(batch)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[MintMetadataCache] Fetcher error: {e}")
+        self._running = False
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+        self._waiters.clear()
+
+    def stop(self) -> None:
+        self._run_fetcher = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+        self._save()
+        logger.info(
+            f"[MintMetadataCache] Stopping ({len(self._entries)} mints, hits={self.hits}, misses={self.misses}, requests={self.requests})."
+        )
+
+    async def _fetch(self, mints: List[str]) -> None:
+        started = time.monotonic()
+        valid: Dict[str, Pubkey] = {}
+        for mint in mints:
+            try:
+                valid[mint] = Pubkey.from_string(mint)
+            except ValueError:
+                self._rejected.add(mint)
+                logger.warning(f"[MintMetadataCache] Ignoring invalid mint address {mint!r}.")
+        try:
+            if valid:
+                self.requests += 1
+                response = await self.rpc_pool.request(
+                    "getMultipleAccounts", [list(valid), {"encoding": "base64", "commitment": "confirmed"}], hedge=True
+                )
+                now = time.time()
+                for mint, account in zip(valid, response["value"]):
+                    owner = account["owner"] if account is not None else None
+                    if owner not in (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID):
+                        self._rejected.add(mint)
+                        logger.warning(f"[MintMetadataCache] {mint} is not an SPL token mint (owner {owner}).")
+                        continue
+                    entry = parse_mint_account(mint, base64.b64decode(account["data"][0]), now)
+                    if entry is not None:
+                        self._entries[mint] = entry
+                logger.debug(
+                    f"[MintMetadataCache] Fetched {len(valid)} mint(s) in {(time.monotonic() - started) * 1000:.1f}ms."
+                )
+        except Exception as e:
+            logger.error(f"[MintMetadataCache] getMultipleAccounts failed for {len(mints)} mint(s): {e}")
+        finally:
+            for mint in mints:
+                for waiter in self._waiters.pop(mint, []):
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as file:
+                saved = json.load(file)
+            for mint, fields in saved.items():
+                self._entries.setdefault(mint, MintMetadata(mint, **fields))
+            logger.info(f"[MintMetadataCache] Loaded {len(saved)} mints from {self.path}.")
+        except Exception as e:
+            logger.warning(f"[MintMetadataCache] Could not load {self.path}: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        entries = {mint: entry.to_dict() for mint, entry in self._entries.items() if mint != SOL_MINT}
+        try:
+            with open(self.path, "w") as file:
+                json.dump(entries, file)
+        except Exception as e:
+            logger.warning(f"[MintMetadataCache] Could not save {self.path}: {e}")
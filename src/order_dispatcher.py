@@ -0,0 +1,171 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .env import ORDER_MAX_IN_FLIGHT, ORDER_RATE_BURST, ORDER_RATE_LIMIT
+from .log_config import RING
+from .metrics import METRICS, stage
+from .trade_executor import TradeExecutor
+
+_WAIT = stage("order_wait")
+_EXECUTE = stage("order_execute")
+_DB_WRITE = stage("db_write")
+_WIRE_TO_SEND = METRICS.histogram(
+    "wire_to_send_seconds", "From the triggering notification leaving the socket to the swap being accepted by an RPC node"
+)
+_ORDER_START = RING.event("order_start")
+_ORDER_DONE = RING.event("order_done")
+_ORDERS = {
+    outcome: METRICS.counter("orders_total", "Market orders by outcome", outcome=outcome)
+    for outcome in ("succeeded", "failed", "deduplicated")
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # A rate of 0 disables the limit.
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OrderDispatcher:
+    # Runs market orders as background tasks so scanners never wait on a quote/swap/send round-trip.
+    # At most `max_in_flight` orders execute at once, the wallet is held to `rate` orders per second
+    # (bursts of `burst`), and an order for a (mint, side) that is already in flight returns the
+    # existing future instead of buying twice.
+    def __init__(
+        self,
+        trade_executor: TradeExecutor,
+        db_manager: Any = None,
+        max_in_flight: int = ORDER_MAX_IN_FLIGHT,
+        rate: float = ORDER_RATE_LIMIT,
+        burst: int = ORDER_RATE_BURST,
+    ) -> None:
+        self.trade_executor = trade_executor
+        self.db_manager = db_manager
+        self.max_in_flight = max_in_flight
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.wallet_limiter = TokenBucket(rate, burst)
+        self.submitted = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.max_wait = 0.0
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def submit(
+        self,
+        mint: str,
+        side: str,
+        amount: float,
+        source: str = "OrderDispatcher",
+        trade_details: Optional[Dict[str, Any]] = None,
+        price: Optional[float] = None,
+        received_ns: Optional[int] = None,
+    ) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        # `received_ns` is the perf_counter_ns() at which the triggering notification was read, if any.
+        key = (mint, side.lower())
+        existing = self._in_flight.get(key)
+        if existing is not None:
+            self.deduplicated += 1
+            _ORDERS["deduplicated"].inc()
+            logger.info(f"[OrderDispatcher] {side.upper()} {mint} already in flight; joining it ({source}).")
+            return existing
+        self.submitted += 1
+        task = asyncio.get_running_loop().create_task(self._run(key, amount, source, trade_details, price, received_ns))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "in_flight": len(self._in_flight),
+            "max_wait": self.max_wait,
+        }
+
+    async def close(self, timeout: float = 10.0) -> None:
+        pending = list(self._in_flight.values())
+        if pending:
+            logger.info(f"[OrderDispatcher] Waiting for {len(pending)} in-flight order(s).")
+            _, still_pending = await asyncio.wait(pending, timeout=timeout)
+            for task in still_pending:
+                task.cancel()
+        logger.info(f"[OrderDispatcher] Closed. Metrics: {self.metrics()}")
+
+    async def _run(
+        self,
+        key: Tuple[str, str],
+        amount: float,
+        source: str,
+        trade_details: Optional[Dict[str, Any]],
+        price: Optional[float],
+        received_ns: Optional[int],
+    ) -> Optional[Dict[str, Any]]:
+        mint, side = key
+        queued = time.perf_counter_ns()
+        async with self.semaphore:
+            await self.wallet_limiter.acquire()
+            started = time.perf_counter_ns()
+            RING.record(_ORDER_START, self.submitted, started - queued)
+            _WAIT.record(started - queued)
+            self.max_wait = max(self.max_wait, (started - queued) / 1e9)
+            try:
+                trade_response = await self.trade_executor.execute_market_order(mint, side, amount)
+            except Exception as e:
+                logger.error(f"[{source}] Market order raised for {mint}: {e}")
+                trade_response = None
+            _EXECUTE.since(started)
+            RING.record(_ORDER_DONE, bool(trade_response and trade_response.get("result")), time.perf_counter_ns() - started)
+
+        if trade_response and trade_response.get("result"):
+            self.succeeded += 1
+            _ORDERS["succeeded"].inc()
+            if received_ns is not None:
+                _WIRE_TO_SEND.since(received_ns)
+            logger.success(f"[{source}] Market order successful for {mint}.")
+        else:
+            self.failed += 1
+            _ORDERS["failed"].inc()
+            logger.error(f"[{source}] Market order failed for {mint}.")
+
+        if self.db_manager is not None and trade_details is not None:
+            started = time.perf_counter_ns()
+            try:
+                await self.db_manager.store_trade_log(
+                    {**trade_details, "trade_response": trade_response, "timestamp": datetime.utcnow().isoformat()},
+                    mint=mint,
+                    side=side,
+                    price=price,
+                    amount=amount,
+                    signature=trade_response.get("result") if trade_response else None,
+                )
+            except Exception as e:
+                logger.error(f"[{source}] Failed to store trade log for {mint}: {e}")
+            _DB_WRITE.since(started)
+        return trade_response
@@ -0,0 +1,180 @@
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import astuple, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .backtester import DEFAULT_SLIPPAGE_BPS, Backtester
+from .indicators import StrategyParams
+
+DEFAULT_GRID: Dict[str, Sequence[Any]] = {
+    "sma_period": (20, 30, 50),
+    "rsi_period": (7, 14, 21),
+    "rsi_oversold": (25.0, 30.0),
+    "rsi_overbought": (70.0, 75.0),
+    "bb_period": (20,),
+    "bb_nbdev": (2.0, 2.5),
+    "macd_fast": (12,),
+    "macd_slow": (26,),
+    "macd_signal": (9,),
+    "buy_score": (2, 3),
+    "sell_score": (-2, -3),
+}
+
+_PARAM_NAMES = tuple(f.name for f in fields(StrategyParams))
+_METRIC_NAMES = ("total_return", "pnl", "max_drawdown", "trades", "fees_paid", "slippage_paid", "exposure")
+# Indicator arrays kept per worker; each one is a float64 copy of the series length.
+_WORKER_CACHE_LIMIT = 32
+
+_worker_prices: Optional[np.ndarray] = None
+_worker_backtester: Optional[Backtester] = None
+_worker_cache: Dict[tuple, Any] = {}
+
+
+def _is_valid(params: StrategyParams) -> bool:
+    return params.macd_fast < params.macd_slow and params.rsi_oversold < params.rsi_overbought
+
+
+def grid_search(grid: Dict[str, Sequence[Any]] = DEFAULT_GRID) -> List[StrategyParams]:
+    keys = list(grid)
+    candidates = (StrategyParams(**dict(zip(keys, values))) for values in itertools.product(*(grid[k] for k in keys)))
+    return [params for params in candidates if _is_valid(params)]
+
+
+def random_search(samples: int, grid: Dict[str, Sequence[Any]] = DEFAULT_GRID, seed: Optional[int] = None) -> List[StrategyParams]:
+    rng = random.Random(seed)
+    total = 1
+    for values in grid.values():
+        total *= len(values)
+    chosen: Dict[StrategyParams, None] = {}
+    attempts = 0
+    while len(chosen) < samples and attempts < samples * 20 and len(chosen) < total:
+        attempts += 1
+        params = StrategyParams(**{key: rng.choice(list(values)) for key, values in grid.items()})
+        if _is_valid(params):
+            chosen[params] = None
+    return list(chosen)
+
+
+def _init_worker(prices_path: str, slippage_bps: float, fee_bps: float) -> None:
+    global _worker_prices, _worker_backtester
+    # Every worker maps the same file read-only instead of receiving a pickled copy of the series.
+    _worker_prices = np.load(prices_path, mmap_mode="r")
+    _worker_backtester = Backtester(slippage_bps=slippage_bps, fee_bps=fee_bps)
+    _worker_cache.clear()
+
+
+def _run_batch(batch: List[Tuple[int, tuple]]) -> List[tuple]:
+    rows = []
+    for index, values in batch:
+        params = StrategyParams(*values)
+        result = _worker_backtester.run(_worker_prices, params=params, cache=_worker_cache)
+        rows.append((index, *(getattr(result, name) for name in _METRIC_NAMES)))
+        while len(_worker_cache) > _WORKER_CACHE_LIMIT:
+            _worker_cache.pop(next(iter(_worker_cache)))
+    return rows
+
+
+class ParameterSweep:
+    def __init__(
+        self,
+        prices: np.ndarray,
+        workers: Optional[int] = None,
+        slippage_bps: float = DEFAULT_SLIPPAGE_BPS,
+        fee_bps: float = 0.0,
+        batch_size: int = 16,
+    ) -> None:
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.workers = workers or os.cpu_count() or 1
+        self.slippage_bps = slippage_bps
+        self.fee_bps = fee_bps
+        self.batch_size = batch_size
+
+    def run(self, param_sets: Sequence[StrategyParams]) -> pd.DataFrame:
+        if not param_sets:
+            raise ValueError("no parameter sets to evaluate")
+        started = time.perf_counter()
+
+        # Consecutive sets that share indicator periods land in the same batch and reuse the
+        # worker's cached TA-Lib arrays.
+        order = sorted(range(len(param_sets)), key=lambda i: astuple(param_sets[i]))
+        batches = [
+            [(i, astuple(param_sets[i])) for i in order[start:start + self.batch_size]]
+            for start in range(0, len(order), self.batch_size)
+        ]
+
+        metrics = np.zeros((len(param_sets), len(_METRIC_NAMES)), dtype=np.float64)
+        with tempfile.TemporaryDirectory(prefix="sweep-") as tmp_dir:
+            prices_path = os.path.join(tmp_dir, "prices.npy")
+            np.save(prices_path, self.prices)
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(prices_path, self.slippage_bps, self.fee_bps),
+            ) as pool:
+                futures = [pool.submit(_run_batch, batch) for batch in batches]
+                for future in as_completed(futures):
+                    for index, *values in future.result():
+                        metrics[index] = values
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"[ParameterSweep] Evaluated {len(param_sets)} parameter sets over {self.prices.size} bars "
+            f"on {self.workers} workers in {elapsed:.2f}s ({len(param_sets) / elapsed * 60:.0f}/min)."
+        )
+        return self._results_table(param_sets, metrics)
+
+    @staticmethod
+    def _results_table(param_sets: Sequence[StrategyParams], metrics: np.ndarray) -> pd.DataFrame:
+        table = pd.DataFrame([astuple(p) for p in param_sets], columns=_PARAM_NAMES)
+        for column in table.columns:
+            kind = np.int16 if pd.api.types.is_integer_dtype(table[column]) else np.float32
+            table[column] = table[column].astype(kind)
+        for position, name in enumerate(_METRIC_NAMES):
+            table[name] = metrics[:, position].astype(np.int32 if name == "trades" else np.float32)
+        return table.sort_values("total_return", ascending=False, ignore_index=True)
+
+    @staticmethod
+    def save(table: pd.DataFrame, path: str) -> str:
+        # Parquet needs pyarrow or fastparquet, which are not dependencies; without either the results
+        # go to a CSV next to the requested path rather than being lost after the sweep.
+        if Path(path).suffix.lower() in (".parquet", ".pq"):
+            try:
+                table.to_parquet(path, index=False)
+            except ImportError as e:
+                csv_path = str(Path(path).with_suffix(".csv"))
+                logger.warning(f"[ParameterSweep] No Parquet engine ({e}); writing CSV to {csv_path} instead.")
+                path = csv_path
+                table.to_csv(path, index=False)
+        else:
+            table.to_csv(path, index=False)
+        logger.info(f"[ParameterSweep] Results written to {path}.")
+        return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over a CSV or Parquet price file.")
+    parser.add_argument("path", help="CSV or Parquet file with timestamp and price columns")
+    parser.add_argument("--random", type=int, default=0, help="sample this many parameter sets instead of the full grid")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--slippage-bps", type=float, default=DEFAULT_SLIPPAGE_BPS)
+    parser.add_argument("--fee-bps", type=float, default=0.0)
+    parser.add_argument("--output", default="sweep_results.csv", help="CSV, or Parquet when pyarrow/fastparquet is installed")
+    args = parser.parse_args()
+
+    prices, _ = Backtester.load_file(args.path)
+    param_sets = random_search(args.random, seed=args.seed) if args.random else grid_search()
+    sweep = ParameterSweep(prices, workers=args.workers, slippage_bps=args.slippage_bps, fee_bps=args.fee_bps)
+    table = sweep.run(param_sets)
+    ParameterSweep.save(table, args.output)
+    print(table.head(20).to_string(index=False))
@@ -0,0 +1,234 @@
+import asyncio
+import base64
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+from solders.pubkey import Pubkey
+
+from .env import POOL_PRICE_COMMITMENT, POOL_PRICE_FEEDS, POOL_PRICE_SETTLE, SOL_MINT
+from .log_config import RING
+from .mint_metadata import MintMetadataCache
+from .rpc_pool import RpcEndpointPool
+from .subscription_hub import SubscriptionHub
+
+# SPL token account: Pubkey mint, Pubkey owner, u64 amount, ... (165 bytes; Token-2022 appends extensions).
+_TOKEN_ACCOUNT_AMOUNT = struct.Struct("<Q")
+_AMOUNT_OFFSET = 64
+_TOKEN_ACCOUNT_MIN_SIZE = _AMOUNT_OFFSET + _TOKEN_ACCOUNT_AMOUNT.size
+
+_TICK = RING.event("pool_price_tick")
+
+# listener(mint, price, base volume swapped since the previous tick, slot, timestamp)
+PriceListener = Callable[[str, float, float, int, float], None]
+
+
+@dataclass
+class PoolSpec:
+    mint: str
+    base_vault: str
+    quote_vault: str
+    quote_mint: str = SOL_MINT
+
+
+@dataclass
+class VaultState:
+    address: str
+    mint: str
+    amount: int = 0
+    slot: int = 0
+    updates: int = 0
+    rejected: int = 0
+
+
+@dataclass
+class PoolState:
+    spec: PoolSpec
+    base: VaultState
+    quote: VaultState
+    price: Optional[float] = None
+    slot: int = 0
+    ticks: int = 0
+    volume: float = 0.0
+    # Reserves at the previous tick; the deltas since then tell a swap from a liquidity change.
+    last_base: int = 0
+    last_quote: int = 0
+    pending: Optional[asyncio.TimerHandle] = field(default=None, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "price": self.price,
+            "slot": self.slot,
+            "ticks": self.ticks,
+            "volume": self.volume,
+            "base_reserve": self.base.amount,
+            "quote_reserve": self.quote.amount,
+            "vault_updates": self.base.updates + self.quote.updates,
+            "rejected": self.base.rejected + self.quote.rejected,
+        }
+
+
+def parse_pool_specs(entries: Sequence[str]) -> List[PoolSpec]:
+    # "MINT:BASE_VAULT:QUOTE_VAULT[:QUOTE_MINT]"; the quote mint defaults to wrapped SOL.
+    specs = []
+    for entry in entries:
+        parts = entry.split(":")
+        try:
+            if len(parts) not in (3, 4):
+                raise ValueError("expected MINT:BASE_VAULT:QUOTE_VAULT[:QUOTE_MINT]")
+            for address in parts:
+                Pubkey.from_string(address)
+        except ValueError as e:
+            logger.error(f"[PoolPriceFeed] Ignoring malformed pool spec {entry!r}: {e}")
+            continue
+        specs.append(PoolSpec(*parts))
+    return specs
+
+
+class PoolPriceFeed:
+    # Push-based mid-prices from constant-product AMM pools (Raydium/Orca style). Both token vaults
+    # of every configured pool are watched with accountSubscribe through the hub; the reserve is the
+    # u64 amount read in place at offset 64 of the raw token-account bytes. A swap moves both vaults
+    # in one slot, so a price is emitted as soon as both sides report that slot, or after `settle`
+    # seconds if only one side changed. Listeners receive (mint, price in quote units, base volume,
+    # slot, time): reserves that moved in opposite directions since the last tick were a swap of
+    # |delta base| tokens, while same-direction moves are liquidity changes and count no volume.
+    # With an RPC pool, both vaults are read once at startup so quiet pools still have a price.
+    def __init__(
+        self,
+        hub: SubscriptionHub,
+        mint_metadata: MintMetadataCache,
+        rpc_pool: Optional[RpcEndpointPool] = None,
+        pools: Sequence[str] = POOL_PRICE_FEEDS,
+        settle: float = POOL_PRICE_SETTLE,
+        commitment: str = POOL_PRICE_COMMITMENT,
+    ) -> None:
+        self.hub = hub
+        self.mint_metadata = mint_metadata
+        self.rpc_pool = rpc_pool
+        self.settle = settle
+        self.commitment = commitment
+        self.pools: Dict[str, PoolState] = {}
+        for spec in parse_pool_specs(pools):
+            self.pools[spec.mint] = PoolState(
+                spec, VaultState(spec.base_vault, spec.mint), VaultState(spec.quote_vault, spec.quote_mint)
+            )
+        self._mint_bytes = {mint: bytes(Pubkey.from_string(mint)) for pool in self.pools.values() for mint in (pool.base.mint, pool.quote.mint)}
+        self._listeners: List[PriceListener] = []
+        self._run_feed = True
+
+    def add_listener(self, listener: PriceListener) -> None:
+        self._listeners.append(listener)
+
+    def price(self, mint: str) -> Optional[float]:
+        pool = self.pools.get(mint)
+        return pool.price if pool is not None else None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {mint: pool.summary() for mint, pool in self.pools.items()}
+
+    async def run(self) -> None:
+        if not self.pools:
+            logger.warning("[PoolPriceFeed] No POOL_PRICE_FEEDS configured; no prices will be published.")
+            return
+        for pool in self.pools.values():
+            self.mint_metadata.warm(pool.base.mint)
+            self.mint_metadata.warm(pool.quote.mint)
+        watchers = [self._watch(pool, vault) for pool in self.pools.values() for vault in (pool.base, pool.quote)]
+        await asyncio.gather(self._seed(), *watchers)
+
+    def stop(self) -> None:
+        self._run_feed = False
+        for pool in self.pools.values():
+            if pool.pending is not None:
+                pool.pending.cancel()
+        logger.info(f"[PoolPriceFeed] Stopping. Stats: {self.stats()}")
+
+    async def _watch(self, pool: PoolState, vault: VaultState) -> None:
+        side = "base" if vault is pool.base else "quote"
+        # Only the newest balance matters, so a short queue that drops the oldest is enough.
+        subscription = self.hub.subscribe_account(
+            vault.address, commitment=self.commitment, name=f"PoolPriceFeed:{pool.spec.mint[:8]}:{side}", maxsize=16
+        )
+        try:
+            while self._run_feed:
+                notification = await subscription.get()
+                try:
+                    self._apply(pool, vault, notification.result.value.data, notification.result.context.slot)
+                except Exception as e:
+                    logger.exception(f"[PoolPriceFeed] Error processing {side} vault update for {pool.spec.mint}: {e}")
+        finally:
+            await subscription.close()
+
+    async def _seed(self) -> None:
+        if self.rpc_pool is None:
+            return
+        vaults = [(pool, vault) for pool in self.pools.values() for vault in (pool.base, pool.quote)]
+        try:
+            response = await self.rpc_pool.request(
+                "getMultipleAccounts",
+                [[vault.address for _, vault in vaults], {"encoding": "base64", "commitment": self.commitment}],
+                hedge=True,
+            )
+        except Exception as e:
+            logger.error(f"[PoolPriceFeed] Initial vault read failed: {e}")
+            return
+        slot = response["context"]["slot"]
+        for (pool, vault), account in zip(vaults, response["value"]):
+            if account is not None:
+                self._apply(pool, vault, base64.b64decode(account["data"][0]), slot)
+
+    def _apply(self, pool: PoolState, vault: VaultState, data: bytes, slot: int) -> None:
+        view = memoryview(data)
+        if len(view) < _TOKEN_ACCOUNT_MIN_SIZE or view[:32] != self._mint_bytes[vault.mint]:
+            vault.rejected += 1
+            if vault.rejected == 1:
+                logger.error(f"[PoolPriceFeed] {vault.address} is not a {vault.mint} token account; ignoring it.")
+            return
+        if slot < vault.slot:
+            return
+        (vault.amount,) = _TOKEN_ACCOUNT_AMOUNT.unpack_from(view, _AMOUNT_OFFSET)
+        vault.slot = slot
+        vault.updates += 1
+        other = pool.quote if vault is pool.base else pool.base
+        if other.slot >= slot:
+            self._emit(pool)
+        elif pool.pending is None:
+            # The other vault may still report this slot; wait briefly so the price is consistent.
+            pool.pending = asyncio.get_running_loop().call_later(self.settle, self._emit, pool)
+
+    def _emit(self, pool: PoolState) -> None:
+        if pool.pending is not None:
+            pool.pending.cancel()
+            pool.pending = None
+        base, quote = pool.base, pool.quote
+        if not base.slot or not quote.slot or not base.amount:
+            return
+        base_decimals = self.mint_metadata.decimals(base.mint)
+        quote_decimals = self.mint_metadata.decimals(quote.mint)
+        if base_decimals is None or quote_decimals is None:
+            # Queued by decimals(); try again once the metadata cache has had a chance to fetch them.
+            pool.pending = asyncio.get_running_loop().call_later(max(self.settle, 1.0), self._emit, pool)
+            return
+        price = (quote.amount / 10 ** quote_decimals) / (base.amount / 10 ** base_decimals)
+        slot = max(base.slot, quote.slot)
+        if slot == pool.slot and price == pool.price:
+            return
+        base_delta = base.amount - pool.last_base
+        swapped = pool.ticks and base_delta * (quote.amount - pool.last_quote) < 0
+        volume = abs(base_delta) / 10 ** base_decimals if swapped else 0.0
+        pool.last_base = base.amount
+        pool.last_quote = quote.amount
+        pool.price = price
+        pool.slot = slot
+        pool.ticks += 1
+        pool.volume += volume
+        RING.record(_TICK, slot, int(volume))
+        timestamp = time.time()
+        for listener in self._listeners:
+            try:
+                listener(pool.spec.mint, price, volume, slot, timestamp)
+            except Exception as e:
+                logger.exception(f"[PoolPriceFeed] Listener failed for {pool.spec.mint}: {e}")
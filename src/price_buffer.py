@@ -0,0 +1,177 @@
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class PriceHistoryBook:
+    # Fixed-capacity circular price/timestamp history for many mints, one row per mint in a single
+    # 2-D float64 array. Every sample is written twice (at slot and slot + capacity) so the most
+    # recent `n` samples of a row are always one contiguous slice and can be returned as a view.
+    def __init__(self, capacity: int = 1000, initial_symbols: int = 16) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        rows = max(1, initial_symbols)
+        self._prices = np.full((rows, 2 * capacity), np.nan, dtype=np.float64)
+        self._timestamps = np.zeros((rows, 2 * capacity), dtype=np.float64)
+        self._heads = np.zeros(rows, dtype=np.int64)
+        self._counts = np.zeros(rows, dtype=np.int64)
+        self._rows: Dict[str, int] = {}
+        self._free_rows: list[int] = list(range(rows - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        return self._rows
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts
+
+    def row_for(self, mint: str) -> int:
+        row = self._rows.get(mint)
+        if row is None:
+            if not self._free_rows:
+                self._grow()
+            row = self._free_rows.pop()
+            self._reset_row(row)
+            self._rows[mint] = row
+        return row
+
+    def buffer(self, mint: str) -> "PriceRingBuffer":
+        return PriceRingBuffer(book=self, row=self.row_for(mint))
+
+    def remove(self, mint: str) -> None:
+        row = self._rows.pop(mint, None)
+        if row is not None:
+            self._free_rows.append(row)
+
+    def append(self, mint: str, price: float, timestamp: Optional[float] = None) -> None:
+        self.append_row(self.row_for(mint), price, timestamp)
+
+    def append_many(self, rows: np.ndarray, prices: np.ndarray, timestamps: Optional[np.ndarray] = None) -> None:
+        # `rows` must not contain duplicates; one vectorized write per call regardless of how many mints tick.
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size == 0:
+            return
+        if timestamps is None:
+            timestamps = np.full(rows.size, time.time())
+        heads = self._heads[rows]
+        self._prices[rows, heads] = prices
+        self._prices[rows, heads + self.capacity] = prices
+        self._timestamps[rows, heads] = timestamps
+        self._timestamps[rows, heads + self.capacity] = timestamps
+        self._heads[rows] = (heads + 1) % self.capacity
+        self._counts[rows] = np.minimum(self._counts[rows] + 1, self.capacity)
+
+    def count(self, mint: str) -> int:
+        row = self._rows.get(mint)
+        return 0 if row is None else int(self._counts[row])
+
+    def window(self, mint: str, n: Optional[int] = None) -> np.ndarray:
+        return self.row_window(self._rows[mint], n)
+
+    def timestamps(self, mint: str, n: Optional[int] = None) -> np.ndarray:
+        return self.row_timestamps(self._rows[mint], n)
+
+    def latest_matrix(self, n: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        # Gathers the last `n` prices of each requested row into an (len(rows), n) array with a single
+        # copy. Rows holding fewer than `n` samples are left-padded with NaN.
+        if n > self.capacity:
+            raise ValueError(f"cannot return {n} samples from a buffer of capacity {self.capacity}")
+        if rows is None:
+            rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self._heads[rows] + self.capacity - n
+        columns = starts[:, None] + np.arange(n)
+        matrix = self._prices[rows[:, None], columns]
+        missing = n - self._counts[rows]
+        if np.any(missing > 0):
+            matrix[np.arange(n) < missing[:, None]] = np.nan
+        return matrix
+
+    # Row-level access for holders of a row index, such as PriceRingBuffer, skipping the mint lookup.
+    def append_row(self, row: int, price: float, timestamp: Optional[float] = None) -> None:
+        if timestamp is None:
+            timestamp = time.time()
+        head = self._heads[row]
+        mirror = head + self.capacity
+        self._prices[row, head] = price
+        self._prices[row, mirror] = price
+        self._timestamps[row, head] = timestamp
+        self._timestamps[row, mirror] = timestamp
+        self._heads[row] = (head + 1) % self.capacity
+        if self._counts[row] < self.capacity:
+            self._counts[row] += 1
+
+    def row_window(self, row: int, n: Optional[int] = None) -> np.ndarray:
+        return self._window_row(self._prices, row, n)
+
+    def row_timestamps(self, row: int, n: Optional[int] = None) -> np.ndarray:
+        return self._window_row(self._timestamps, row, n)
+
+    def _window_row(self, storage: np.ndarray, row: int, n: Optional[int]) -> np.ndarray:
+        available = int(self._counts[row])
+        n = available if n is None else min(n, available)
+        end = int(self._heads[row]) + self.capacity
+        return storage[row, end - n:end]
+
+    def _reset_row(self, row: int) -> None:
+        self._prices[row].fill(np.nan)
+        self._timestamps[row].fill(0.0)
+        self._heads[row] = 0
+        self._counts[row] = 0
+
+    def _grow(self) -> None:
+        # Doubling keeps the amortized cost of adding a mint constant.
+        old_rows = self._prices.shape[0]
+        new_rows = old_rows * 2
+        self._prices = np.concatenate([self._prices, np.full_like(self._prices, np.nan)])
+        self._timestamps = np.concatenate([self._timestamps, np.zeros_like(self._timestamps)])
+        self._heads = np.concatenate([self._heads, np.zeros(old_rows, dtype=np.int64)])
+        self._counts = np.concatenate([self._counts, np.zeros(old_rows, dtype=np.int64)])
+        self._free_rows.extend(range(new_rows - 1, old_rows - 1, -1))
+
+
+class PriceRingBuffer:
+    # Single-mint view over one PriceHistoryBook row. Constructed without a book it owns a private
+    # one-row book, which is what StrategyManager uses for its single price series.
+    def __init__(self, capacity: int = 1000, book: Optional[PriceHistoryBook] = None, row: int = 0) -> None:
+        if book is None:
+            book = PriceHistoryBook(capacity=capacity, initial_symbols=1)
+            row = book.row_for("")
+        self._book = book
+        self._row = row
+
+    @property
+    def capacity(self) -> int:
+        return self._book.capacity
+
+    def __len__(self) -> int:
+        return int(self._book.counts[self._row])
+
+    def append(self, price: float, timestamp: Optional[float] = None) -> None:
+        self._book.append_row(self._row, price, timestamp)
+
+    def last(self) -> float:
+        if len(self) == 0:
+            raise IndexError("price buffer is empty")
+        return float(self.view(1)[0])
+
+    def view(self, n: Optional[int] = None) -> np.ndarray:
+        return self._book.row_window(self._row, n)
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        return self._book.row_timestamps(self._row, n)
+
+    def items(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.timestamps(n), self.view(n)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .env import QUOTE_PREBUILD_SWAP, QUOTE_PREFETCH_MAX, QUOTE_REFRESH_AHEAD, QUOTE_TTL
+
+# (input_mint, output_mint, amount in smallest units, slippage in bps)
+QuoteKey = Tuple[str, str, int, int]
+QuoteFetcher = Callable[[QuoteKey], Awaitable[Optional[Dict[str, Any]]]]
+SwapBuilder = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def quote_key(input_mint: str, output_mint: str, amount: int, slippage: float) -> QuoteKey:
+    return (input_mint, output_mint, int(amount), int(slippage * 100))
+
+
+class CachedQuote:
+    __slots__ = ("quote", "swap", "fetched_at")
+
+    def __init__(self, quote: Dict[str, Any], swap: Optional[Dict[str, Any]], fetched_at: float) -> None:
+        self.quote = quote
+        self.swap = swap
+        self.fetched_at = fetched_at
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.fetched_at
+
+
+class QuoteCache:
+    # Keeps Jupiter quotes (and optionally the swap transaction built from them) warm for watched
+    # (input, output, amount, slippage) keys, refreshing each entry `refresh_ahead` seconds before it
+    # goes stale so a signal can go straight to signing.
+    def __init__(
+        self,
+        fetch_quote: QuoteFetcher,
+        build_swap: Optional[SwapBuilder] = None,
+        ttl: float = QUOTE_TTL,
+        refresh_ahead: float = QUOTE_REFRESH_AHEAD,
+        max_watched: int = QUOTE_PREFETCH_MAX,
+        prebuild_swap: bool = QUOTE_PREBUILD_SWAP,
+    ) -> None:
+        self.fetch_quote = fetch_quote
+        self.build_swap = build_swap
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl / 2)
+        self.max_watched = max_watched
+        self.prebuild_swap = prebuild_swap and build_swap is not None
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[QuoteKey, CachedQuote] = {}
+        self._watched: "OrderedDict[QuoteKey, None]" = OrderedDict()
+        self._pending: Dict[QuoteKey, asyncio.Task] = {}
+        self._run_refresher = True
+
+    def watch(self, key: QuoteKey) -> None:
+        self._watched[key] = None
+        self._watched.move_to_end(key)
+        while len(self._watched) > self.max_watched:
+            evicted, _ = self._watched.popitem(last=False)
+            self._entries.pop(evicted, None)
+        if key not in self._entries:
+            self._schedule(key)
+
+    def unwatch(self, key: QuoteKey) -> None:
+        self._watched.pop(key, None)
+        self._entries.pop(key, None)
+
+    def get(self, key: QuoteKey) -> Optional[CachedQuote]:
+        entry = self._entries.get(key)
+        if entry is None or entry.age() >= self.ttl:
+            return None
+        return entry
+
+    async def acquire(self, key: QuoteKey) -> Optional[CachedQuote]:
+        # A quote backs exactly one swap, so the entry is consumed; watched keys are re-warmed by
+        # the refresher on its next pass.
+        entry = self.get(key)
+        if entry is None and key in self._pending:
+            entry = await asyncio.shield(self._pending[key])
+        if entry is not None and entry.age() < self.ttl:
+            self.hits += 1
+            self._entries.pop(key, None)
+            return entry
+        self.misses += 1
+        return None
+
+    async def run(self) -> None:
+        interval = max(min(self.refresh_ahead / 2, 0.25), 0.05)
+        while self._run_refresher:
+            try:
+                now = time.monotonic()
+                for key in list(self._watched):
+                    entry = self._entries.get(key)
+                    if key not in self._pending and (entry is None or entry.age(now) >= self.ttl - self.refresh_ahead):
+                        self._schedule(key)
+                await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[QuoteCache] Refresher error: {e}")
+                await asyncio.sleep(interval)
+        for task in self._pending.values():
+            task.cancel()
+
+    def stop(self) -> None:
+        self._run_refresher = False
+        logger.info(f"[QuoteCache] Stopping refresher (hits={self.hits}, misses={self.misses}).")
+
+    def _schedule(self, key: QuoteKey) -> None:
+        if key in self._pending:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh(key))
+        self._pending[key] = task
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+    async def _refresh(self, key: QuoteKey) -> Optional[CachedQuote]:
+        started = time.monotonic()
+        try:
+            quote = await self.fetch_quote(key)
+            if not quote:
+                return None
+            swap = await self.build_swap(quote) if self.prebuild_swap else None
+        except Exception as e:
+            logger.error(f"[QuoteCache] Failed to refresh quote for {key}: {e}")
+            return None
+        entry = CachedQuote(quote, swap, started)
+        if key in self._watched:
+            self._entries[key] = entry
+        logger.debug("[QuoteCache] Refreshed quote for {} in {:.1f}ms.", key, (time.monotonic() - started) * 1000)
+        return entry
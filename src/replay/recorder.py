@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import json
+from typing import Optional, Set
+
+import aiohttp
+import websockets
+from loguru import logger
+
+from ..env import (
+    DEXSCREENER_POLL_INTERVAL,
+    JUPITER_API_KEY,
+    JUPITER_API_URL,
+    ORDER_QUANTITY,
+    SOL_MINT,
+    TRENDING_API_ENDPOINT,
+    WS_URL,
+)
+from ..subscription_hub import TOKEN_PROGRAM_ID
+from .recording import DEXSCREENER, JUPITER_QUOTE, JUPITER_SWAP, WS_FRAME, RecordingWriter
+
+
+class Recorder:
+    # Captures the live feeds the bot consumes: raw Token Program logsSubscribe frames, DexScreener
+    # token-boosts snapshots, and Jupiter quote (and optionally swap) responses for the tokens seen.
+    def __init__(
+        self,
+        path: str,
+        ws_url: str = WS_URL,
+        trending_endpoint: str = TRENDING_API_ENDPOINT,
+        jupiter_api_url: str = JUPITER_API_URL,
+        poll_interval: float = DEXSCREENER_POLL_INTERVAL,
+        quote_amount: float = ORDER_QUANTITY,
+        max_quotes: int = 50,
+        user_public_key: Optional[str] = None,
+    ) -> None:
+        self.writer = RecordingWriter(path)
+        self.ws_url = ws_url
+        self.trending_endpoint = trending_endpoint
+        self.jupiter_api_url = jupiter_api_url.rstrip("/")
+        self.poll_interval = poll_interval
+        self.quote_amount = quote_amount
+        self.max_quotes = max_quotes
+        self.user_public_key = user_public_key
+        self._quoted: Set[str] = set()
+
+    async def run(self, duration: float) -> None:
+        headers = {"X-API-Key": JUPITER_API_KEY} if JUPITER_API_KEY else {}
+        async with aiohttp.ClientSession(headers=headers) as session:
+            tasks = [asyncio.create_task(self._record_ws()), asyncio.create_task(self._record_dexscreener(session))]
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.writer.close()
+        logger.info(f"[Recorder] Wrote {self.writer.records} records to {self.writer.path}.")
+
+    async def _record_ws(self) -> None:
+        request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "logsSubscribe",
+            "params": [{"mentions": [TOKEN_PROGRAM_ID]}, {"commitment": "processed"}],
+        }
+        async with websockets.connect(self.ws_url, max_size=None) as websocket:
+            await websocket.send(json.dumps(request))
+            logger.info(f"[Recorder] Recording logs from {self.ws_url}.")
+            async for frame in websocket:
+                self.writer.write_text(WS_FRAME, frame if isinstance(frame, str) else frame.decode("utf-8"))
+
+    async def _record_dexscreener(self, session: aiohttp.ClientSession) -> None:
+        while True:
+            try:
+                async with session.get(self.trending_endpoint, timeout=10) as response:
+                    body = await response.text()
+                    self.writer.write_exchange(DEXSCREENER, {}, response.status, body)
+                tokens = json.loads(body) if response.status == 200 else []
+                for token_info in tokens if isinstance(tokens, list) else []:
+                    mint = token_info.get("tokenAddress")
+                    if mint and mint not in self._quoted and len(self._quoted) < self.max_quotes:
+                        self._quoted.add(mint)
+                        await self._record_quote(session, mint)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Recorder] DexScreener capture failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _record_quote(self, session: aiohttp.ClientSession, mint: str) -> None:
+        # Same request TradeExecutor.fetch_quote makes for a buy of `quote_amount` SOL (9 decimals).
+        params = {
+            "inputMint": SOL_MINT,
+            "outputMint": mint,
+            "amount": str(int(self.quote_amount * 10 ** 9)),
+            "slippageBps": "100",
+        }
+        async with session.get(f"{self.jupiter_api_url}/quote", params=params, timeout=10) as response:
+            body = await response.text()
+            self.writer.write_exchange(JUPITER_QUOTE, params, response.status, body)
+        if response.status != 200 or not self.user_public_key:
+            return
+        quote = json.loads(body)
+        routes = quote.get("routes") or [quote]
+        payload = {"route": routes[0], "userPublicKey": self.user_public_key, "wrapUnwrapSOL": True, "dynamicSlippage": {"maxBps": 300}}
+        async with session.post(f"{self.jupiter_api_url}/swap", json=payload, timeout=10) as response:
+            self.writer.write_exchange(JUPITER_SWAP, params, response.status, await response.text())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record the WebSocket, DexScreener and Jupiter feeds for offline replay.")
+    parser.add_argument("output", help="recording file to write (gzip-compressed records)")
+    parser.add_argument("--duration", type=float, default=300.0, help="seconds to record")
+    parser.add_argument("--max-quotes", type=int, default=50, help="Jupiter quotes to capture for DexScreener tokens")
+    parser.add_argument("--swap-pubkey", help="also record /swap responses built for this wallet")
+    args = parser.parse_args()
+    recorder = Recorder(args.output, max_quotes=args.max_quotes, user_public_key=args.swap_pubkey)
+    asyncio.run(recorder.run(args.duration))
@@ -0,0 +1,80 @@
+import gzip
+import json
+import struct
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+# Channels of a recording. WebSocket frames are stored verbatim; HTTP exchanges as a small JSON
+# envelope ({"params": ..., "status": ..., "body": ...}).
+WS_FRAME = 1
+DEXSCREENER = 2
+JUPITER_QUOTE = 3
+JUPITER_SWAP = 4
+CHANNEL_NAMES = {WS_FRAME: "ws", DEXSCREENER: "dexscreener", JUPITER_QUOTE: "quote", JUPITER_SWAP: "swap"}
+
+_MAGIC = b"SBREC\x01"
+# channel (u8), offset from the start of the recording in seconds (f64), payload length (u32)
+_HEADER = struct.Struct("<BdI")
+
+
+class Record(NamedTuple):
+    channel: int
+    offset: float
+    payload: bytes
+
+    def text(self) -> str:
+        return self.payload.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.payload)
+
+
+class RecordingWriter:
+    # Append-only, gzip-compressed stream of length-prefixed records.
+    def __init__(self, path: str, compresslevel: int = 6) -> None:
+        self.path = path
+        self.records = 0
+        self._file: BinaryIO = gzip.open(path, "wb", compresslevel=compresslevel)
+        self._file.write(_MAGIC)
+        self._started = time.monotonic()
+
+    def write(self, channel: int, payload: bytes, offset: Optional[float] = None) -> None:
+        if offset is None:
+            offset = time.monotonic() - self._started
+        self._file.write(_HEADER.pack(channel, offset, len(payload)))
+        self._file.write(payload)
+        self.records += 1
+
+    def write_text(self, channel: int, text: str, offset: Optional[float] = None) -> None:
+        self.write(channel, text.encode("utf-8"), offset)
+
+    def write_exchange(self, channel: int, params: Dict[str, Any], status: int, body: str, offset: Optional[float] = None) -> None:
+        self.write(channel, json.dumps({"params": params, "status": status, "body": body}).encode("utf-8"), offset)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "RecordingWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def read_recording(path: str) -> Iterator[Record]:
+    with gzip.open(path, "rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        while True:
+            header = file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            channel, offset, length = _HEADER.unpack(header)
+            yield Record(channel, offset, file.read(length))
+
+
+def load_recording(path: str) -> Dict[int, List[Record]]:
+    channels: Dict[int, List[Record]] = {channel: [] for channel in CHANNEL_NAMES}
+    for record in read_recording(path):
+        channels.setdefault(record.channel, []).append(record)
+    return channels
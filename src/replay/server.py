@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import re
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+from loguru import logger
+from solders.hash import Hash
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.system_program import TransferParams, transfer
+from solders.transaction import VersionedTransaction
+
+from ..log_parser import MINT_MARKER
+from .recording import DEXSCREENER, JUPITER_QUOTE, JUPITER_SWAP, WS_FRAME, Record, load_recording
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+# An initialized SPL mint with 6 decimals and no authorities, served for every getMultipleAccounts key.
+_MINT_ACCOUNT = {
+    "data": [base64.b64encode(struct.pack("<I32sQBBI32s", 0, bytes(32), 10**15, 6, 1, 0, bytes(32))).decode("ascii"), "base64"],
+    "executable": False,
+    "lamports": 1461600,
+    "owner": TOKEN_PROGRAM_ID,
+    "rentEpoch": 0,
+    "space": 82,
+}
+_SUBSCRIPTION_RE = re.compile(r'"subscription":\s*\d+')
+_MINT_RE = re.compile(r"mint=(\w+)")
+
+
+class ReplayServer:
+    # Local stand-in for the Solana WebSocket/RPC endpoints, DexScreener and Jupiter, serving a
+    # recording at `speed` times real time (0 = as fast as possible). Every swap transaction it builds
+    # carries a unique id (as the lamports of a zero-value self-transfer, which survives re-stamping
+    # with another blockhash), so a later sendTransaction can be traced back to the signal (the first
+    # frame or DexScreener snapshot naming the mint) that caused it. Every transaction sent lands at
+    # once, for getSignatureStatuses and signatureSubscribe.
+    def __init__(
+        self,
+        recording: Dict[int, List[Record]],
+        speed: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        self.recording = recording
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.frames_sent = 0
+        self.quotes_served = 0
+        self.swaps_served = 0
+        self.signal_times: Dict[str, float] = {}
+        self.sends: List[Tuple[str, str, float, Optional[float]]] = []
+        self.rebroadcasts = 0
+        self.done = asyncio.Event()
+        self._origin = min((records[0].offset for records in recording.values() if records), default=0.0)
+        self._started = time.perf_counter()
+        self._snapshot = 0
+        self._swap_ids = itertools.count(1)
+        self._swap_orders: Dict[int, Tuple[str, str]] = {}
+        self._landed: Dict[str, int] = {}
+        self._signature_watchers: Dict[str, List[Tuple[web.WebSocketResponse, int]]] = {}
+        self._subscription_ids = itertools.count(1)
+        self._quotes = {
+            (body["params"].get("inputMint"), body["params"].get("outputMint")): body
+            for body in (record.json() for record in recording.get(JUPITER_QUOTE, []))
+            if body["status"] == 200
+        }
+        self._swaps = [record.json() for record in recording.get(JUPITER_SWAP, [])]
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "ReplayServer":
+        return cls(load_recording(path), **kwargs)
+
+    @property
+    def http_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    @property
+    def rpc_url(self) -> str:
+        return f"{self.http_url}/rpc"
+
+    @property
+    def trending_endpoint(self) -> str:
+        return f"{self.http_url}/token-boosts/top/v1"
+
+    @property
+    def jupiter_api_url(self) -> str:
+        return f"{self.http_url}/swap/v1"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/ws", self._websocket)
+        app.router.add_post("/rpc", self._rpc)
+        app.router.add_get("/token-boosts/top/v1", self._trending)
+        app.router.add_get("/swap/v1/quote", self._quote)
+        app.router.add_post("/swap/v1/swap", self._swap)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._started = time.perf_counter()
+        logger.info(f"[ReplayServer] Serving on {self.http_url} at {f'{self.speed}x' if self.speed > 0 else 'max'} speed.")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _mark_signal(self, mint: str) -> None:
+        self.signal_times.setdefault(mint, time.perf_counter())
+
+    async def _pace(self, offset: float, started: float) -> None:
+        if self.speed > 0:
+            delay = started + (offset - self._origin) / self.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse(autoping=True, max_msg_size=0)
+        await websocket.prepare(request)
+        stream: Optional[asyncio.Task] = None
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                body = json.loads(message.data)
+                method = body.get("method", "")
+                if method.endswith("Unsubscribe"):
+                    await websocket.send_str(json.dumps({"jsonrpc": "2.0", "result": True, "id": body["id"]}))
+                    continue
+                subscription_id = next(self._subscription_ids)
+                await websocket.send_str(json.dumps({"jsonrpc": "2.0", "result": subscription_id, "id": body["id"]}))
+                if method == "signatureSubscribe":
+                    signature = body["params"][0]
+                    if signature in self._landed:
+                        await self._notify_signature(websocket, subscription_id, self._landed[signature])
+                    else:
+                        self._signature_watchers.setdefault(signature, []).append((websocket, subscription_id))
+                if method == "logsSubscribe" and stream is None:
+                    stream = asyncio.create_task(self._stream(websocket, subscription_id))
+        finally:
+            if stream is not None:
+                stream.cancel()
+        return websocket
+
+    async def _notify_signature(self, websocket: web.WebSocketResponse, subscription_id: int, slot: int) -> None:
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "signatureNotification",
+            "params": {"result": {"context": {"slot": slot}, "value": {"err": None}}, "subscription": subscription_id},
+        }
+        if not websocket.closed:
+            await websocket.send_str(json.dumps(notification))
+
+    async def _stream(self, websocket: web.WebSocketResponse, subscription_id: int) -> None:
+        replacement = f'"subscription":{subscription_id}'
+        started = time.perf_counter()
+        for record in self.recording.get(WS_FRAME, []):
+            frame = record.text()
+            if '"method"' not in frame:
+                continue
+            await self._pace(record.offset, started)
+            if MINT_MARKER in frame:
+                for mint in _MINT_RE.findall(frame):
+                    self._mark_signal(mint)
+            await websocket.send_str(_SUBSCRIPTION_RE.sub(replacement, frame, count=1))
+            self.frames_sent += 1
+            if self.speed <= 0 and self.frames_sent % 256 == 0:
+                await asyncio.sleep(0)
+        self.done.set()
+        logger.info(f"[ReplayServer] Finished replaying {self.frames_sent} WebSocket frames.")
+
+    async def _trending(self, request: web.Request) -> web.Response:
+        snapshots = self.recording.get(DEXSCREENER, [])
+        if not snapshots:
+            return web.json_response([])
+        if self.speed > 0:
+            elapsed = (time.perf_counter() - self._started) * self.speed + self._origin
+            index = max(sum(1 for record in snapshots if record.offset <= elapsed) - 1, 0)
+        else:
+            index = min(self._snapshot, len(snapshots) - 1)
+            self._snapshot += 1
+        exchange = snapshots[index].json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if exchange["status"] == 200:
+            tokens = json.loads(exchange["body"])
+            for token_info in tokens if isinstance(tokens, list) else []:
+                if token_info.get("tokenAddress"):
+                    self._mark_signal(token_info["tokenAddress"])
+        return web.Response(status=exchange["status"], text=exchange["body"], content_type="application/json")
+
+    async def _quote(self, request: web.Request) -> web.Response:
+        input_mint = request.query.get("inputMint", "")
+        output_mint = request.query.get("outputMint", "")
+        exchange = self._quotes.get((input_mint, output_mint)) or next(iter(self._quotes.values()), None)
+        quote = json.loads(exchange["body"]) if exchange else {"inAmount": request.query.get("amount", "0")}
+        # TradeExecutor expects a "routes" list; recorded quotes are re-targeted at the requested pair.
+        routes = quote.get("routes") or [dict(quote)]
+        routes[0] = dict(routes[0], inputMint=input_mint, outputMint=output_mint)
+        quote.update(inputMint=input_mint, outputMint=output_mint, routes=routes)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.quotes_served += 1
+        return web.json_response(quote)
+
+    async def _swap(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        route = payload.get("route") or payload.get("quoteResponse") or {}
+        input_mint, output_mint = route.get("inputMint", ""), route.get("outputMint", "")
+        side, mint = ("buy", output_mint) if input_mint == SOL_MINT else ("sell", input_mint)
+        payer = Pubkey.from_string(payload["userPublicKey"])
+        # A recorded transaction is signed for the recording wallet, so a signable one is built for
+        # the requesting wallet instead; the unique blockhash identifies it on sendTransaction.
+        swap_id = next(self._swap_ids)
+        message = MessageV0.try_compile(
+            payer, [transfer(TransferParams(from_pubkey=payer, to_pubkey=payer, lamports=swap_id))], [], Hash.new_unique()
+        )
+        transaction = VersionedTransaction.populate(message, [Signature.default()])
+        self._swap_orders[swap_id] = (mint, side)
+        recorded = json.loads(self._swaps[self.swaps_served % len(self._swaps)]["body"]) if self._swaps else {}
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.swaps_served += 1
+        return web.json_response(dict(recorded, swapTransaction=base64.b64encode(bytes(transaction)).decode("ascii")))
+
+    async def _rpc(self, request: web.Request) -> web.Response:
+        received = time.perf_counter()
+        body = await request.json()
+        method = body.get("method")
+        if method == "sendTransaction":
+            transaction = VersionedTransaction.from_bytes(base64.b64decode(body["params"][0]))
+            result: Any = str(transaction.signatures[0])
+            if result in self._landed:
+                self.rebroadcasts += 1
+            else:
+                # System transfer data: u32 instruction index, then u64 lamports (the swap id).
+                (swap_id,) = struct.unpack_from("<Q", bytes(transaction.message.instructions[0].data), 4)
+                mint, side = self._swap_orders.pop(swap_id, ("", ""))
+                self.sends.append((mint, side, received, self.signal_times.get(mint)))
+                self._landed[result] = 1
+                for websocket, subscription_id in self._signature_watchers.pop(result, []):
+                    await self._notify_signature(websocket, subscription_id, 1)
+        elif method == "getSignatureStatuses":
+            result = {
+                "context": {"slot": 1},
+                "value": [
+                    {"slot": self._landed[sig], "confirmations": None, "err": None, "confirmationStatus": "confirmed"}
+                    if sig in self._landed else None
+                    for sig in body["params"][0]
+                ],
+            }
+        elif method == "getRecentPrioritizationFees":
+            result = [{"slot": slot, "prioritizationFee": 0} for slot in range(1, 151)]
+        elif method == "getLatestBlockhash":
+            result = {"context": {"slot": 1}, "value": {"blockhash": str(Hash.new_unique()), "lastValidBlockHeight": 150}}
+        elif method == "getMultipleAccounts":
+            result = {"context": {"slot": 1}, "value": [_MINT_ACCOUNT for _ in body["params"][0]]}
+        elif method == "getSlot":
+            result = 1
+        elif method == "getHealth":
+            result = "ok"
+        else:
+            return web.json_response({"jsonrpc": "2.0", "error": {"code": -32601, "message": f"{method} not replayed"}, "id": body.get("id")})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"jsonrpc": "2.0", "result": result, "id": body.get("id")})
+
+
+async def _serve(path: str, speed: float, port: int, latency: float) -> None:
+    server = ReplayServer.from_file(path, speed=speed, port=port, latency=latency)
+    await server.start()
+    print(f"WS_URL={server.ws_url}")
+    print(f"SOLANA_RPC_URL={server.rpc_url}")
+    print(f"TRENDING_API_ENDPOINT={server.trending_endpoint}")
+    print(f"JUPITER_API_URL={server.jupiter_api_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a recording on local stand-ins for Solana, DexScreener and Jupiter.")
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier; 0 replays as fast as possible")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per HTTP response")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.recording, args.speed, args.port, args.latency_ms / 1000))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,302 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+
+from .env import (
+    RPC_BREAKER_COOLDOWN,
+    RPC_BREAKER_FAILURES,
+    RPC_EWMA_ALPHA,
+    RPC_HEDGE_DELAY,
+    RPC_MAX_SLOT_LAG,
+    RPC_PROBE_INTERVAL,
+    RPC_REQUEST_TIMEOUT,
+    SOLANA_RPC_URLS,
+    WS_URLS,
+)
+from .http_client import HttpClient
+
+# JSON-RPC errors that say something about the node rather than the request: block not available,
+# node unhealthy, minimum context slot not reached, internal error.
+_NODE_ERRORS = {-32004, -32005, -32016, -32603}
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: Optional[int] = None, node: bool = False) -> None:
+        super().__init__(message)
+        self.code = code
+        # True when the endpoint is at fault, so the call is worth retrying elsewhere.
+        self.node = node
+
+
+def derive_ws_url(url: str) -> str:
+    # http -> ws, https -> wss; providers serve both on the same host and path.
+    return "ws" + url[4:] if url.startswith("http") else url
+
+
+@dataclass
+class RpcEndpoint:
+    url: str
+    ws_url: Optional[str] = None
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    slot: int = 0
+    healthy: bool = True
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    requests: int = 0
+    errors: int = 0
+
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.open_until
+
+    def score(self) -> float:
+        # Moving latency in seconds plus the moving error rate, so a 10% error rate costs as much as
+        # 100ms of latency. Endpoints not measured yet score 0 and keep their configured order.
+        return (self.latency or 0.0) + self.error_rate
+
+    def record(self, elapsed: Optional[float], ok: bool, alpha: float) -> None:
+        self.requests += 1
+        if ok:
+            if elapsed is not None:
+                self.latency = elapsed if self.latency is None else self.latency + alpha * (elapsed - self.latency)
+            self.error_rate -= alpha * self.error_rate
+            self.consecutive_failures = 0
+        else:
+            self.errors += 1
+            self.error_rate += alpha * (1.0 - self.error_rate)
+            self.consecutive_failures += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": (self.latency or 0.0) * 1000,
+            "error_rate": self.error_rate,
+            "slot": self.slot,
+            "healthy": self.healthy,
+            "breaker_open": time.monotonic() < self.open_until,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class RpcEndpointPool:
+    # Several RPC providers behind one interface. run() probes every endpoint with getHealth and
+    # getSlot, marking those that fail or fall more than `max_slot_lag` slots behind the best tip as
+    # unhealthy; every call also feeds the endpoint's moving latency and error rate. Requests go to
+    # the best-scoring healthy endpoint and fail over to the runner-up on node errors. A hedged
+    # request also starts the runner-up if the first endpoint has not answered within
+    # max(hedge_delay, twice its moving latency) and takes whichever answers first. After
+    # `breaker_failures` consecutive failures an endpoint is skipped for `breaker_cooldown` seconds.
+    def __init__(
+        self,
+        http_client: HttpClient,
+        urls: Sequence[str] = SOLANA_RPC_URLS,
+        ws_urls: Sequence[str] = WS_URLS,
+        probe_interval: float = RPC_PROBE_INTERVAL,
+        hedge_delay: float = RPC_HEDGE_DELAY,
+        breaker_failures: int = RPC_BREAKER_FAILURES,
+        breaker_cooldown: float = RPC_BREAKER_COOLDOWN,
+        max_slot_lag: int = RPC_MAX_SLOT_LAG,
+        alpha: float = RPC_EWMA_ALPHA,
+        timeout: float = RPC_REQUEST_TIMEOUT,
+    ) -> None:
+        if not urls:
+            raise ValueError("at least one RPC endpoint is required")
+        self.http_client = http_client
+        ws_urls = list(ws_urls)
+        # WS_URLS[i] belongs to urls[i]; endpoints without one use the ws:// form of their HTTP URL.
+        self.endpoints = [
+            RpcEndpoint(url, ws_urls[i] if i < len(ws_urls) else derive_ws_url(url)) for i, url in enumerate(urls)
+        ]
+        self.probe_interval = probe_interval
+        self.hedge_delay = hedge_delay
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.max_slot_lag = max_slot_lag
+        self.alpha = alpha
+        self.timeout = timeout
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.breaker_trips = 0
+        self._by_url = {endpoint.url: endpoint for endpoint in self.endpoints}
+        self._by_ws_url = {endpoint.ws_url: endpoint for endpoint in self.endpoints if endpoint.ws_url}
+        # Endpoints only ever addressed directly (e.g. send-only relays); tracked but never routed to.
+        self._direct: Dict[str, RpcEndpoint] = {}
+        self._clients: Dict[str, AsyncClient] = {}
+        self._ids = itertools.count(1)
+        self._run_prober = True
+
+    def ranked(self) -> List[RpcEndpoint]:
+        # Healthy endpoints with a closed breaker, best first; if none qualify, all of them.
+        now = time.monotonic()
+        available = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+        return sorted(available or self.endpoints, key=RpcEndpoint.score)
+
+    def best(self) -> RpcEndpoint:
+        return self.ranked()[0]
+
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.ranked()]
+
+    def ws_url(self) -> str:
+        return next(endpoint.ws_url for endpoint in self.ranked() + self.endpoints if endpoint.ws_url)
+
+    def client(self) -> AsyncClient:
+        # A typed solana-py client bound to the current best endpoint, for callers that want parsed
+        # responses; its calls are not scored.
+        url = self.best().url
+        client = self._clients.get(url)
+        if client is None:
+            client = self._clients[url] = AsyncClient(url, commitment=Confirmed)
+        return client
+
+    def report(self, url: str, ok: bool, elapsed: Optional[float] = None) -> None:
+        # Outcome of a call made outside the pool, such as a WebSocket connection attempt.
+        endpoint = self._by_url.get(url) or self._by_ws_url.get(url) or self._direct.get(url)
+        if endpoint is not None:
+            self._record(endpoint, elapsed, ok)
+
+    async def request(self, method: str, params: Optional[List[Any]] = None, hedge: bool = False) -> Any:
+        ranked = self.ranked()
+        if hedge and len(ranked) > 1:
+            return await self._hedged(ranked[0], ranked[1], method, params or [])
+        candidates = ranked[:2]
+        for endpoint in candidates:
+            try:
+                return await self._call(endpoint, method, params or [])
+            except Exception as e:
+                if (isinstance(e, RpcError) and not e.node) or endpoint is candidates[-1]:
+                    raise
+            self.failovers += 1
+            logger.warning(f"[RpcEndpointPool] {method} failed on {endpoint.url}; failing over.")
+
+    async def call(self, url: str, method: str, params: Optional[List[Any]] = None) -> Any:
+        # One request to a specific endpoint, still scored.
+        endpoint = self._by_url.get(url)
+        if endpoint is None:
+            endpoint = self._direct.setdefault(url, RpcEndpoint(url))
+        return await self._call(endpoint, method, params or [])
+
+    async def probe(self) -> None:
+        results = await asyncio.gather(*(self._probe(endpoint) for endpoint in self.endpoints))
+        tip = max((endpoint.slot for endpoint, ok in zip(self.endpoints, results) if ok), default=0)
+        for endpoint, ok in zip(self.endpoints, results):
+            healthy = ok and tip - endpoint.slot <= self.max_slot_lag
+            if healthy != endpoint.healthy:
+                if healthy:
+                    logger.info(f"[RpcEndpointPool] {endpoint.url} is healthy again (slot {endpoint.slot}).")
+                else:
+                    logger.warning(f"[RpcEndpointPool] {endpoint.url} marked unhealthy (slot {endpoint.slot}, tip {tip}).")
+            endpoint.healthy = healthy
+
+    async def run(self) -> None:
+        while self._run_prober:
+            try:
+                await self.probe()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[RpcEndpointPool] Probe error: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "breaker_trips": self.breaker_trips,
+            "endpoints": {endpoint.url: endpoint.summary() for endpoint in self.endpoints + list(self._direct.values())},
+        }
+
+    def stop(self) -> None:
+        self._run_prober = False
+        logger.info(f"[RpcEndpointPool] Stopping. Stats: {self.stats()}")
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+
+    async def _probe(self, endpoint: RpcEndpoint) -> bool:
+        try:
+            health, slot = await asyncio.gather(
+                self._call(endpoint, "getHealth", []), self._call(endpoint, "getSlot", [{"commitment": "processed"}])
+            )
+        except Exception as e:
+            logger.debug("[RpcEndpointPool] Probe of {} failed: {}", endpoint.url, e)
+            return False
+        endpoint.slot = int(slot)
+        return health == "ok"
+
+    async def _call(self, endpoint: RpcEndpoint, method: str, params: List[Any]) -> Any:
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        started = time.perf_counter()
+        try:
+            async with self.http_client.session.post(endpoint.url, json=payload, timeout=self.timeout) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise RpcError(f"HTTP {response.status}", response.status, node=True)
+                body = await response.json(content_type=None)
+            error = body.get("error")
+            if error:
+                code = error.get("code")
+                raise RpcError(error.get("message", str(error)), code, node=code in _NODE_ERRORS)
+        except asyncio.CancelledError:
+            # A losing hedge or a cancelled caller says nothing about the endpoint.
+            raise
+        except Exception as e:
+            self._record(endpoint, time.perf_counter() - started, ok=isinstance(e, RpcError) and not e.node)
+            raise
+        self._record(endpoint, time.perf_counter() - started, ok=True)
+        return body.get("result")
+
+    async def _hedged(self, primary: RpcEndpoint, secondary: RpcEndpoint, method: str, params: List[Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        first = loop.create_task(self._call(primary, method, params))
+        pending = {first}
+        hedge: Optional[asyncio.Task] = None
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=max(self.hedge_delay, 2 * (primary.latency or 0.0)))
+            while True:
+                for task in done:
+                    pending.discard(task)
+                    error = task.exception()
+                    if error is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    if isinstance(error, RpcError) and not error.node:
+                        raise error
+                if hedge is None:
+                    # The first endpoint is slow or failed: race the runner-up against it.
+                    self.hedges += 1
+                    hedge = loop.create_task(self._call(secondary, method, params))
+                    pending.add(hedge)
+                if not pending:
+                    raise error
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if first in pending:
+                # The loser is cancelled before it records anything; charge it the time it had taken,
+                # a lower bound, so a slow endpoint loses its rank instead of being hedged forever.
+                self._record(primary, time.perf_counter() - started, ok=True)
+            for task in pending:
+                task.cancel()
+
+    def _record(self, endpoint: RpcEndpoint, elapsed: Optional[float], ok: bool) -> None:
+        endpoint.record(elapsed, ok, self.alpha)
+        now = time.monotonic()
+        if not ok and endpoint.consecutive_failures >= self.breaker_failures and now >= endpoint.open_until:
+            endpoint.open_until = now + self.breaker_cooldown
+            self.breaker_trips += 1
+            logger.warning(
+                f"[RpcEndpointPool] {endpoint.url} failed {endpoint.consecutive_failures} times in a row; "
+                f"skipping it for {self.breaker_cooldown:g}s."
+            )
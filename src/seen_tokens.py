@@ -0,0 +1,151 @@
+import hashlib
+import os
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from loguru import logger
+from solders.pubkey import Pubkey
+
+from .env import SEEN_TOKENS_CAPACITY, SEEN_TOKENS_PATH, SEEN_TOKENS_TTL
+
+_MAGIC = b"SEENTOK1"
+_HEADER = np.dtype([("magic", "S8"), ("capacity", "<u8"), ("cursor", "<u8")])
+_RECORD = np.dtype([("key", "u1", (32,)), ("seen", "<f8")])
+
+
+def mint_key(mint: str) -> bytes:
+    # The 32 raw bytes of the mint address; anything that is not a valid address is hashed instead.
+    try:
+        return bytes(Pubkey.from_string(mint))
+    except ValueError:
+        return hashlib.sha256(mint.encode("utf-8")).digest()
+
+
+class SeenTokenIndex:
+    # Bounded set of mints the bot has already evaluated, kept as 32-byte keys in a ring of
+    # `capacity` fixed-size records. Eviction is CLOCK (second chance), an approximation of LRU: a mint
+    # seen again since the hand last passed it is skipped once. Entries not seen for `ttl` seconds
+    # count as new again. With a `path` the ring is a memory-mapped file, so the index survives
+    # restarts and loading it is a single pass over the live records.
+    def __init__(self, path: Optional[str] = SEEN_TOKENS_PATH, capacity: int = SEEN_TOKENS_CAPACITY, ttl: float = SEEN_TOKENS_TTL) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self._slots: Dict[bytes, int] = {}
+        self._header: Optional[np.memmap] = None
+        self._records: np.ndarray
+        self._referenced = np.zeros(capacity, dtype=bool)
+        self._cursor = 0
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, mint: str) -> bool:
+        slot = self._slots.get(mint_key(mint))
+        return slot is not None and not self._expired(slot, time.time())
+
+    def mark(self, mint: str) -> bool:
+        # Records the mint as seen now. Returns True if it was not already in the index.
+        key = mint_key(mint)
+        now = time.time()
+        slot = self._slots.get(key)
+        if slot is None:
+            self._write(key, now)
+            return True
+        is_new = self._expired(slot, now)
+        self._records["seen"][slot] = now
+        self._referenced[slot] = True
+        return is_new
+
+    def close(self) -> None:
+        if self._header is not None:
+            self._header.flush()
+            self._records.flush()
+            self._header = None
+            logger.info(f"[SeenTokenIndex] Saved {len(self._slots)} seen tokens to {self.path}.")
+
+    def _expired(self, slot: int, now: float) -> bool:
+        return self.ttl > 0 and now - self._records["seen"][slot] > self.ttl
+
+    def _write(self, key: bytes, now: float) -> None:
+        seen = self._records["seen"]
+        slot = self._cursor % self.capacity
+        while seen[slot] > 0 and self._referenced[slot] and not self._expired(slot, now):
+            self._referenced[slot] = False
+            self._cursor += 1
+            slot = self._cursor % self.capacity
+        if seen[slot] > 0:
+            evicted = self._records["key"][slot].tobytes()
+            if self._slots.get(evicted) == slot:
+                del self._slots[evicted]
+        self._records["key"][slot] = np.frombuffer(key, dtype=np.uint8)
+        seen[slot] = now
+        self._referenced[slot] = False
+        self._slots[key] = slot
+        self._cursor += 1
+        if self._header is not None:
+            self._header["cursor"][0] = self._cursor
+
+    def _live_slots(self, records: np.ndarray) -> np.ndarray:
+        # Occupied, unexpired slots ordered from least to most recently seen.
+        seen = records["seen"]
+        live = seen > 0
+        if self.ttl > 0:
+            live &= seen > time.time() - self.ttl
+        slots = np.nonzero(live)[0]
+        return slots[np.argsort(seen[slots], kind="stable")]
+
+    def _open(self) -> None:
+        if not self.path:
+            self._records = np.zeros(self.capacity, dtype=_RECORD)
+            return
+        started = time.perf_counter()
+        header = self._read_header()
+        previous = None
+        if header is None or int(header["capacity"]) != self.capacity:
+            if header is not None:
+                logger.info(f"[SeenTokenIndex] Resizing {self.path} from {int(header['capacity'])} to {self.capacity} records.")
+                previous = np.fromfile(self.path, dtype=_RECORD, count=int(header["capacity"]), offset=_HEADER.itemsize)
+            with open(self.path, "wb") as file:
+                file.truncate(_HEADER.itemsize + _RECORD.itemsize * self.capacity)
+        self._header = np.memmap(self.path, dtype=_HEADER, mode="r+", shape=(1,))
+        self._records = np.memmap(self.path, dtype=_RECORD, mode="r+", offset=_HEADER.itemsize, shape=(self.capacity,))
+
+        if header is not None and previous is None:
+            self._cursor = int(header["cursor"])
+            live = self._live_slots(self._records)
+            # Clear expired records so they are not resurrected on the next load.
+            stale = np.ones(self.capacity, dtype=bool)
+            stale[live] = False
+            self._records["seen"][stale] = 0.0
+            raw = self._records["key"][live].tobytes()
+            self._slots = dict(zip((raw[i:i + 32] for i in range(0, len(raw), 32)), live.tolist()))
+        else:
+            self._header["magic"][0] = _MAGIC
+            self._header["capacity"][0] = self.capacity
+            self._header["cursor"][0] = 0
+            if previous is not None:
+                for slot in self._live_slots(previous)[-self.capacity:].tolist():
+                    self._write(previous["key"][slot].tobytes(), float(previous["seen"][slot]))
+        logger.info(
+            f"[SeenTokenIndex] Loaded {len(self._slots)} seen tokens from {self.path} in {(time.perf_counter() - started) * 1000:.1f}ms."
+        )
+
+    def _read_header(self) -> Optional[np.void]:
+        if not os.path.exists(self.path):
+            return None
+        size = os.path.getsize(self.path)
+        if size < _HEADER.itemsize:
+            return None
+        header = np.fromfile(self.path, dtype=_HEADER, count=1)[0]
+        if header["magic"] != _MAGIC:
+            logger.warning(f"[SeenTokenIndex] {self.path} is not a seen-token index; starting empty.")
+            return None
+        if size < _HEADER.itemsize + _RECORD.itemsize * int(header["capacity"]):
+            logger.warning(f"[SeenTokenIndex] {self.path} is truncated; starting empty.")
+            return None
+        return header
@@ -0,0 +1,565 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import signal
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+from solders.rpc.responses import LogsNotification
+
+from .candle_aggregator import CandleAggregator
+from .db import DatabaseManager
+from .dex_screener_scanner import DexScreenerScanner
+from .env import (
+    LOG_FILE,
+    LOG_RING_DUMP_PATH,
+    METRICS_PORT,
+    MINT_METADATA_PATH,
+    ORDER_QUANTITY,
+    ORDER_SELL_QUANTITY,
+    POOL_PRICE_FEEDS,
+    SHARD_MAX_RESTARTS,
+    SHARD_QUEUE_BYTES,
+    SHARD_WORKERS,
+)
+from .http_client import HttpClient
+from .log_config import RING, configure_logging, shutdown_logging
+from .log_parser import MINT_MARKER, candidate_mint, find_candidates
+from .loop_monitor import LoopLagMonitor
+from .main import connect_strategy, strategy_loop
+from .market_data_streamer import MarketDataStreamer
+from .memcoin_scanner import MemeCoinScanner
+from .metrics import METRICS, MetricsServer
+from .mint_metadata import MintMetadataCache
+from .order_dispatcher import OrderDispatcher
+from .pool_price_feed import PoolPriceFeed, parse_pool_specs
+from .rpc_pool import RpcEndpointPool
+from .shm_ring import RingReader, ShmRing
+from .strategy_manager import PortfolioStrategyManager
+from .subscription_hub import TOKEN_PROGRAM_ID, SubscriptionHub
+from .trade_executor import TradeExecutor
+
+# Ingest -> worker messages are packed structs followed by the UTF-8 mint or log line. Timestamps
+# ending in _ns are perf_counter_ns() readings, which on Linux come from the system-wide monotonic
+# clock and so compare across processes.
+_TICK = struct.Struct("<BdddQq")  # kind, price, volume, timestamp, slot, sent_ns
+_CANDIDATE = struct.Struct("<BQqq")  # kind, slot, received_ns, sent_ns
+_KIND_TICK, _KIND_CANDIDATE, _KIND_ORDER, _KIND_WARM, _KIND_REPLY = range(1, 6)
+
+_QUEUE_WAIT = {
+    queue: METRICS.histogram("shard_queue_seconds", "Time a message waited in a shared-memory queue", queue=queue)
+    for queue in ("ticks", "candidates", "orders")
+}
+
+
+def shard_of(mint: str, shards: int) -> int:
+    # crc32 rather than hash(): str hashes are salted per process, so they would disagree across processes.
+    return zlib.crc32(mint.encode()) % shards
+
+
+def _pack(kind: int, payload: Any) -> bytes:
+    # Orders, mint hints and replies are rare and carry dicts, so they are pickled behind the kind byte.
+    return bytes((kind,)) + pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+
+
+def _unpack(message: bytes) -> Any:
+    return pickle.loads(memoryview(message)[1:])
+
+
+def _role_path(path: str, role: str) -> str:
+    # "trading_bot.log" -> "trading_bot.worker-0.log", so processes never write the same file.
+    if not path:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{role}{extension}"
+
+
+def _metrics_port(offset: int) -> int:
+    # Each process serves its own registry: ingest on METRICS_PORT, the executor on the next port and
+    # worker i on METRICS_PORT + 2 + i. 0 still disables them all.
+    return METRICS_PORT + offset if METRICS_PORT else 0
+
+
+class ShardRouter:
+    # Ingest side of the worker queues. Candidate log lines from the Token Program subscription and
+    # ticks from the pool price feed are pushed onto the queue of the worker that owns their mint.
+    # Only the mint field is read here; parsing and filtering happen in the worker. A full queue
+    # drops the message, since the ingest loop must keep up with the socket.
+    def __init__(self, hub: Optional[SubscriptionHub], queues: List[ShmRing]) -> None:
+        self.hub = hub
+        self.queues = queues
+        self.ticks = 0
+        self.candidates = 0
+        self.dropped = 0
+        self._run_router = True
+
+    def route_tick(self, mint: str, price: float, volume: float, slot: int, timestamp: float) -> None:
+        self.ticks += 1
+        message = _TICK.pack(_KIND_TICK, price, volume, timestamp, slot, time.perf_counter_ns()) + mint.encode()
+        self._send(shard_of(mint, len(self.queues)), message)
+
+    def route_candidate(self, log_msg: str, slot: int, received_ns: int) -> None:
+        self.candidates += 1
+        message = _CANDIDATE.pack(_KIND_CANDIDATE, slot, received_ns, time.perf_counter_ns()) + log_msg.encode()
+        self._send(shard_of(candidate_mint(log_msg), len(self.queues)), message)
+
+    async def run(self) -> None:
+        subscription = self.hub.subscribe_logs(TOKEN_PROGRAM_ID, name="ShardRouter", prefilter=MINT_MARKER)
+        logger.info(f"[ShardRouter] Routing token mint logs and price ticks to {len(self.queues)} shard(s).")
+        try:
+            while self._run_router:
+                try:
+                    notification = await subscription.get()
+                    if not isinstance(notification, LogsNotification):
+                        continue
+                    for log_msg in find_candidates(notification.result.value.logs):
+                        self.route_candidate(log_msg, notification.result.context.slot, subscription.received_ns)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.exception(f"[ShardRouter] Error routing log notification: {e}")
+        finally:
+            await subscription.close()
+
+    def stop(self) -> None:
+        self._run_router = False
+        logger.info(f"[ShardRouter] Stopping. Stats: {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "candidates": self.candidates,
+            "dropped": self.dropped,
+            "per_shard": {str(shard): queue.sent for shard, queue in enumerate(self.queues)},
+        }
+
+    def _send(self, shard: int, message: bytes) -> None:
+        if self.queues[shard].put(message):
+            return
+        self.dropped += 1
+        # 1st, 2nd, 4th, 8th... drop, so a stalled worker does not flood the log.
+        if self.dropped & (self.dropped - 1) == 0:
+            logger.warning(f"[ShardRouter] Queue of shard {shard} is full; {self.dropped} message(s) dropped so far.")
+
+
+class ExecutorClient:
+    # Worker-side stand-in for the OrderDispatcher (and the TradeExecutor's mint_metadata.warm) that
+    # MemeCoinScanner and strategy_loop are written against. submit() ships the order to the executor
+    # process and returns a future that resolves with the trade response the executor sends back.
+    def __init__(self, orders: ShmRing, shard: int) -> None:
+        self.orders = orders
+        self.shard = shard
+        self.submitted = 0
+        self.dropped = 0
+        self.succeeded = 0
+        self.failed = 0
+        # Ids start at the clock so replies meant for a previous incarnation of this worker match nothing.
+        self._ids = itertools.count(time.time_ns())
+        self._awaiting: Dict[int, asyncio.Future] = {}
+
+    @property
+    def mint_metadata(self) -> "ExecutorClient":
+        return self
+
+    def submit(
+        self,
+        mint: str,
+        side: str,
+        amount: float,
+        source: str = "ExecutorClient",
+        trade_details: Optional[Dict[str, Any]] = None,
+        price: Optional[float] = None,
+        received_ns: Optional[int] = None,
+    ) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        future = asyncio.get_running_loop().create_future()
+        order_id = next(self._ids)
+        order = (order_id, mint, side, amount, f"{source}@shard-{self.shard}", trade_details, price, received_ns, time.perf_counter_ns())
+        if not self.orders.put(_pack(_KIND_ORDER, order)):
+            self.dropped += 1
+            logger.error(f"[ExecutorClient] Order queue full; dropped {side.upper()} {mint} from {source}.")
+            future.set_result(None)
+            return future
+        self.submitted += 1
+        self._awaiting[order_id] = future
+        return future
+
+    def warm(self, mint: str) -> None:
+        self.orders.put(_pack(_KIND_WARM, mint))
+
+    def on_reply(self, order_id: int, trade_response: Optional[Dict[str, Any]]) -> None:
+        future = self._awaiting.pop(order_id, None)
+        if future is None:
+            return
+        if trade_response and trade_response.get("result"):
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if not future.done():
+            future.set_result(trade_response)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "awaiting_reply": len(self._awaiting),
+        }
+
+
+class ShardWorker:
+    # Everything per mint for the mints with shard_of(mint) == index: MemeCoinScanner's parse and
+    # filter of candidate log lines, OHLCV bars, indicators and strategy signals. Nothing here
+    # touches the network except through the executor client.
+    def __init__(self, index: int, shards: int, client: ExecutorClient, db_manager: Optional[DatabaseManager] = None) -> None:
+        self.index = index
+        self.shards = shards
+        self.client = client
+        self.scanner = MemeCoinScanner(client, db_manager, hub=None, dispatcher=client)
+        self.candles = CandleAggregator(db_manager)
+        self.strategy_manager = PortfolioStrategyManager()
+        connect_strategy(self.candles, self.strategy_manager)
+        self.prices: Dict[str, float] = {}
+        self.ticks = 0
+        self.candidates = 0
+
+    def handle(self, queue: int, message: bytes) -> None:
+        kind = message[0]
+        if kind == _KIND_TICK:
+            _, price, volume, timestamp, slot, sent_ns = _TICK.unpack_from(message)
+            _QUEUE_WAIT["ticks"].since(sent_ns)
+            mint = message[_TICK.size:].decode()
+            self.prices[mint] = price
+            self.candles.update(mint, price, volume, timestamp)
+            self.ticks += 1
+        elif kind == _KIND_CANDIDATE:
+            _, slot, received_ns, sent_ns = _CANDIDATE.unpack_from(message)
+            _QUEUE_WAIT["candidates"].since(sent_ns)
+            self.candidates += 1
+            self.scanner.process_candidate(message[_CANDIDATE.size:].decode(), slot, received_ns or None)
+        elif kind == _KIND_REPLY:
+            self.client.on_reply(*_unpack(message))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "candidates": self.candidates,
+            "mints": len(self.prices),
+            "orders": self.client.metrics(),
+        }
+
+
+class OrderServer:
+    # Executor side of the order queues: every worker order runs on the one OrderDispatcher (so the
+    # in-flight, rate and wallet limits are global), and its result goes back to the worker that sent it.
+    def __init__(self, dispatcher: OrderDispatcher, trade_executor: TradeExecutor, replies: List[ShmRing]) -> None:
+        self.dispatcher = dispatcher
+        self.trade_executor = trade_executor
+        self.replies = replies
+        self.orders = 0
+        self.dropped_replies = 0
+
+    def handle(self, shard: int, message: bytes) -> None:
+        kind = message[0]
+        if kind == _KIND_ORDER:
+            order_id, mint, side, amount, source, trade_details, price, received_ns, sent_ns = _unpack(message)
+            _QUEUE_WAIT["orders"].since(sent_ns)
+            self.orders += 1
+            order = self.dispatcher.submit(
+                mint, side, amount, source=source, trade_details=trade_details, price=price, received_ns=received_ns
+            )
+            order.add_done_callback(lambda done, shard=shard, order_id=order_id: self._reply(shard, order_id, done))
+        elif kind == _KIND_WARM:
+            self.trade_executor.mint_metadata.warm(_unpack(message))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"orders": self.orders, "dropped_replies": self.dropped_replies}
+
+    def _reply(self, shard: int, order_id: int, done: asyncio.Future) -> None:
+        trade_response = None if done.cancelled() or done.exception() is not None else done.result()
+        if not self.replies[shard].put(_pack(_KIND_REPLY, (order_id, trade_response))):
+            self.dropped_replies += 1
+            logger.error(f"[OrderServer] Reply queue of shard {shard} is full; dropped the result of order {order_id}.")
+
+
+async def _wait_for_stop(stop: Any) -> None:
+    # Returns once the supervisor sets `stop` or this process receives SIGTERM.
+    terminated = asyncio.Event()
+    if os.name != "nt":
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, terminated.set)
+    while not stop.is_set() and not terminated.is_set():
+        await asyncio.sleep(0.2)
+
+
+async def _cancel(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_ingest(worker_queues: List[str], stop: Any) -> None:
+    db_manager = DatabaseManager()
+    await db_manager.connect(ensure_schema=False)
+    http_client = HttpClient()
+    rpc_pool = RpcEndpointPool(http_client)
+    hub = SubscriptionHub(rpc_pool=rpc_pool)
+    mint_metadata = MintMetadataCache(rpc_pool, path=_role_path(MINT_METADATA_PATH, "ingest"))
+    price_feed = PoolPriceFeed(hub, mint_metadata, rpc_pool)
+    router = ShardRouter(hub, [ShmRing(name) for name in worker_queues])
+    price_feed.add_listener(router.route_tick)
+    market_streamer = MarketDataStreamer(db_manager, hub)
+    loop_monitor = LoopLagMonitor()
+
+    METRICS.register_collector("loop_lag", loop_monitor.stats)
+    METRICS.register_collector("db", db_manager.metrics)
+    METRICS.register_collector("rpc", rpc_pool.stats)
+    METRICS.register_collector("ws", hub.metrics)
+    METRICS.register_collector("router", router.stats)
+    metrics_server = MetricsServer(port=_metrics_port(0))
+    await metrics_server.start()
+
+    tasks = [
+        asyncio.create_task(loop_monitor.run()),
+        asyncio.create_task(rpc_pool.run()),
+        asyncio.create_task(hub.run()),
+        asyncio.create_task(mint_metadata.run()),
+        asyncio.create_task(price_feed.run()),
+        asyncio.create_task(market_streamer.stream_data()),
+        asyncio.create_task(router.run()),
+    ]
+    try:
+        await _wait_for_stop(stop)
+    finally:
+        market_streamer.stop()
+        price_feed.stop()
+        router.stop()
+        hub.stop()
+        mint_metadata.stop()
+        loop_monitor.stop()
+        await _cancel(tasks)
+        rpc_pool.stop()
+        await rpc_pool.close()
+        await http_client.close()
+        await db_manager.close()
+        await metrics_server.close()
+        for queue in router.queues:
+            queue.close()
+
+
+async def run_worker(index: int, shards: int, inbound: str, orders: str, replies: str, stop: Any) -> None:
+    db_manager = DatabaseManager()
+    await db_manager.connect(ensure_schema=False)
+    client = ExecutorClient(ShmRing(orders), index)
+    worker = ShardWorker(index, shards, client, db_manager)
+    reader = RingReader([ShmRing(inbound), ShmRing(replies)], worker.handle, name=f"ShardWorker:{index}")
+    loop_monitor = LoopLagMonitor()
+
+    METRICS.register_collector("loop_lag", loop_monitor.stats)
+    METRICS.register_collector("db", db_manager.metrics)
+    METRICS.register_collector("candles", worker.candles.stats)
+    METRICS.register_collector("shard", worker.stats)
+    METRICS.register_collector("queues", reader.stats)
+    metrics_server = MetricsServer(port=_metrics_port(2 + index))
+    await metrics_server.start()
+
+    logger.info(f"[ShardWorker] Shard {index + 1}/{shards} running.")
+    tasks = [
+        asyncio.create_task(loop_monitor.run()),
+        asyncio.create_task(reader.run()),
+        asyncio.create_task(worker.candles.run()),
+        asyncio.create_task(strategy_loop(worker.strategy_manager, client, worker.prices.get)),
+    ]
+    try:
+        await _wait_for_stop(stop)
+    finally:
+        reader.stop()
+        worker.candles.stop()
+        loop_monitor.stop()
+        await _cancel(tasks)
+        await db_manager.close()
+        await metrics_server.close()
+        logger.info(f"[ShardWorker] Shard {index} stopped. Stats: {worker.stats()}")
+        for queue in reader.rings + [client.orders]:
+            queue.close()
+
+
+async def run_executor(order_queues: List[str], reply_queues: List[str], stop: Any) -> None:
+    db_manager = DatabaseManager()
+    await db_manager.connect(ensure_schema=False)
+    http_client = HttpClient()
+    rpc_pool = RpcEndpointPool(http_client)
+    # Only for signature confirmations of the transactions sent from here.
+    hub = SubscriptionHub(rpc_pool=rpc_pool)
+    trade_executor = TradeExecutor(http_client, hub=hub, rpc_pool=rpc_pool)
+    dispatcher = OrderDispatcher(trade_executor, db_manager)
+    # DexScreener is polled a few times a minute, so it lives next to the dispatcher it feeds.
+    dex_scanner = DexScreenerScanner(trade_executor, db_manager, http_client, dispatcher=dispatcher)
+    server = OrderServer(dispatcher, trade_executor, [ShmRing(name) for name in reply_queues])
+    reader = RingReader([ShmRing(name) for name in order_queues], server.handle, name="OrderServer")
+    loop_monitor = LoopLagMonitor()
+
+    METRICS.register_collector("loop_lag", loop_monitor.stats)
+    METRICS.register_collector("orders", dispatcher.metrics)
+    METRICS.register_collector("db", db_manager.metrics)
+    METRICS.register_collector("rpc", rpc_pool.stats)
+    METRICS.register_collector("ws", hub.metrics)
+    METRICS.register_collector("transactions", trade_executor.submitter.stats)
+    METRICS.register_collector("signing", trade_executor.signer.stats)
+    METRICS.register_collector("queues", reader.stats)
+    metrics_server = MetricsServer(port=_metrics_port(1))
+    await metrics_server.start()
+
+    # Priced mints are traded repeatedly in both directions by the workers' strategies.
+    for spec in parse_pool_specs(POOL_PRICE_FEEDS):
+        trade_executor.prefetch_market_order(spec.mint, "buy", ORDER_QUANTITY)
+        trade_executor.prefetch_market_order(spec.mint, "sell", ORDER_SELL_QUANTITY)
+
+    tasks = [
+        asyncio.create_task(loop_monitor.run()),
+        asyncio.create_task(rpc_pool.run()),
+        asyncio.create_task(hub.run()),
+        asyncio.create_task(trade_executor.quote_cache.run()),
+        asyncio.create_task(trade_executor.mint_metadata.run()),
+        asyncio.create_task(trade_executor.submitter.run()),
+        asyncio.create_task(dex_scanner.scan_for_new_coins()),
+        asyncio.create_task(reader.run()),
+    ]
+    try:
+        await _wait_for_stop(stop)
+    finally:
+        reader.stop()
+        dex_scanner.stop()
+        # In-flight orders still need the hub, RPC pool and submitter, so they finish first.
+        await dispatcher.close()
+        hub.stop()
+        loop_monitor.stop()
+        await trade_executor.close()
+        await _cancel(tasks)
+        rpc_pool.stop()
+        await rpc_pool.close()
+        await http_client.close()
+        await db_manager.close()
+        await metrics_server.close()
+        logger.info(f"[OrderServer] Stopped. Stats: {server.stats()}")
+        for queue in reader.rings + server.replies:
+            queue.close()
+
+
+def _process_main(role: str, target: Callable[..., Awaitable[None]], *args: Any) -> None:
+    # Entry point of every child process. Ctrl-C reaches the whole process group; only the
+    # supervisor acts on it, and it tells the children to stop through the shared event.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    RING.dump_path = _role_path(LOG_RING_DUMP_PATH, role)
+    configure_logging(file=_role_path(LOG_FILE, role))
+    try:
+        if sys.platform == "win32":
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(target(*args))
+    except Exception as e:
+        logger.exception(f"[{role}] Process failed: {e}")
+        raise SystemExit(1)
+    finally:
+        shutdown_logging()
+
+
+class ShardSupervisor:
+    # run_bot with SHARD_WORKERS > 0. Splits the bot across 2 + `workers` processes joined by
+    # ShmRing queues, so per-mint work scales with cores instead of sharing one event loop:
+    #   ingest    the WebSocket hub, pool price feed and raw market-data storage; routes each
+    #             candidate log line and price tick to the worker owning its mint.
+    #   worker-i  scanner parsing and filtering, candles, indicators and strategy signals for the
+    #             mints with shard_of(mint) == i; orders go to the executor.
+    #   executor  the keypair, TradeExecutor (quotes, blockhash, signing, sending), OrderDispatcher
+    #             and DexScreener poller; answers each worker order with its trade response.
+    # A process that exits is restarted against the same queues, `max_restarts` times in total.
+    # SIGINT/SIGTERM stop every process and the queues are unlinked.
+    def __init__(
+        self,
+        workers: int = SHARD_WORKERS,
+        queue_bytes: int = SHARD_QUEUE_BYTES,
+        max_restarts: int = SHARD_MAX_RESTARTS,
+        check_interval: float = 1.0,
+    ) -> None:
+        if workers <= 0:
+            raise ValueError("the sharded runtime needs at least one worker")
+        self.workers = workers
+        self.queue_bytes = queue_bytes
+        self.max_restarts = max_restarts
+        self.check_interval = check_interval
+        self.restarts = 0
+        self._stopping = False
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._queues: Dict[str, ShmRing] = {}
+        self._roles: Dict[str, tuple] = {}
+        self._processes: Dict[str, Any] = {}
+
+    def run(self) -> None:
+        configure_logging()
+        logger.info(f"[ShardSupervisor] Starting ingest, {self.workers} shard worker(s) and executor.")
+        # Once here, so the processes do not race each other creating tables.
+        DatabaseManager().ensure_schema()
+        for i in range(self.workers):
+            for kind in ("ticks", "orders", "replies"):
+                self._queues[f"{kind}-{i}"] = ShmRing(capacity=self.queue_bytes)
+        names = {key: queue.name for key, queue in self._queues.items()}
+        shards = range(self.workers)
+        self._roles["executor"] = (run_executor, [names[f"orders-{i}"] for i in shards], [names[f"replies-{i}"] for i in shards], self._stop)
+        for i in shards:
+            self._roles[f"worker-{i}"] = (run_worker, i, self.workers, names[f"ticks-{i}"], names[f"orders-{i}"], names[f"replies-{i}"], self._stop)
+        self._roles["ingest"] = (run_ingest, [names[f"ticks-{i}"] for i in shards], self._stop)
+
+        # The handler only sets a flag: setting the multiprocessing event from a signal handler can
+        # deadlock on the lock the interrupted main thread holds.
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: setattr(self, "_stopping", True))
+        try:
+            for role in self._roles:
+                self._start(role)
+            while not self._stopping:
+                self._supervise()
+                time.sleep(self.check_interval)
+        finally:
+            self._shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        return {key: {"pending_bytes": queue.pending(), "dropped": queue.dropped()} for key, queue in self._queues.items()}
+
+    def _start(self, role: str) -> None:
+        process = self._context.Process(target=_process_main, args=(role, *self._roles[role]), name=role, daemon=False)
+        process.start()
+        self._processes[role] = process
+        logger.info(f"[ShardSupervisor] Started {role} (pid {process.pid}).")
+
+    def _supervise(self) -> None:
+        for role, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            if self.restarts >= self.max_restarts:
+                logger.error(f"[ShardSupervisor] {role} exited with code {process.exitcode} and the restart budget is spent; stopping.")
+                self._stopping = True
+                return
+            self.restarts += 1
+            logger.error(
+                f"[ShardSupervisor] {role} exited with code {process.exitcode}; restarting ({self.restarts}/{self.max_restarts})."
+            )
+            self._start(role)
+
+    def _shutdown(self) -> None:
+        self._stop.set()
+        logger.info("[ShardSupervisor] Stopping all processes.")
+        for role, process in self._processes.items():
+            process.join(timeout=20)
+            if process.is_alive():
+                logger.warning(f"[ShardSupervisor] {role} did not stop in time; killing it.")
+                process.kill()
+                process.join()
+        logger.info(f"[ShardSupervisor] Stopped after {self.restarts} restart(s). Queues: {self.stats()}")
+        for queue in self._queues.values():
+            queue.close()
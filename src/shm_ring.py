@@ -0,0 +1,209 @@
+import asyncio
+import platform
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from .env import SHARD_POLL_INTERVAL, SHARD_QUEUE_BYTES
+
+_COUNTER = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+# Header: the producer's cache line (head, dropped, capacity), then the consumer's (tail).
+_HEAD = 0
+_DROPPED = 8
+_CAPACITY = 16
+_TAIL = 64
+_DATA = 128
+# The ordering argument below holds for x86-64 only. Weakly ordered CPUs (ARM: Graviton, Apple silicon)
+# can make head visible before the message it publishes, and Python has no fence to prevent that.
+_ORDERED_STORES = platform.machine().lower() in ("x86_64", "amd64")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Before Python 3.13 attaching registers the block with the resource tracker, which unlinks it when
+    # the attaching process exits (taking it from its owner and the other processes) and warns of a
+    # leak. Unregistering afterwards is no better: spawned children share the supervisor's tracker, so
+    # it would drop the owner's registration too. The registration is skipped instead, as track=False does.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+
+    def register_unless_shm(resource: str, rtype: str) -> None:
+        if rtype != "shared_memory":
+            register(resource, rtype)
+
+    resource_tracker.register = register_unless_shm
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class ShmRing:
+    # Single-producer single-consumer queue of byte messages in a multiprocessing.shared_memory block,
+    # so handing a message to another process is a memcpy in and a memcpy out, with no pickling and
+    # no syscall. Messages are length-prefixed and wrap around the end of the data area. `head` and
+    # `tail` are byte counts that only grow, each written by one side: the producer writes a message
+    # before publishing head, the consumer reads it before publishing tail, and x86-64 keeps stores
+    # in order with stores and loads with loads, so each side only ever sees whole messages. A full
+    # ring drops the new message (counted in the header) rather than block the producer. Other
+    # architectures are refused.
+    def __init__(self, name: Optional[str] = None, capacity: int = SHARD_QUEUE_BYTES) -> None:
+        if not _ORDERED_STORES:
+            raise RuntimeError(
+                f"ShmRing needs x86-64 memory ordering and this is {platform.machine()!r}; run with SHARD_WORKERS=0."
+            )
+        # Without a name a new ring is created; its creator unlinks it on close(). Only the creator's
+        # block is tracked, so a crashed supervisor still gets it unlinked.
+        self.owner = name is None
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=_DATA + capacity)
+            self._shm.buf[:_DATA] = bytes(_DATA)
+            _COUNTER.pack_into(self._shm.buf, _CAPACITY, capacity)
+        else:
+            self._shm = _attach(name)
+        self.name = self._shm.name
+        self._buf: Optional[memoryview] = self._shm.buf
+        (self.capacity,) = _COUNTER.unpack_from(self._buf, _CAPACITY)
+        # Each side resumes from the shared counters, so a restarted process picks up where its
+        # predecessor stopped.
+        (self._head,) = _COUNTER.unpack_from(self._buf, _HEAD)
+        (self._tail,) = _COUNTER.unpack_from(self._buf, _TAIL)
+        self.sent = 0
+        self.received = 0
+
+    def put(self, message: bytes) -> bool:
+        buf = self._buf
+        size = _LENGTH.size + len(message)
+        (tail,) = _COUNTER.unpack_from(buf, _TAIL)
+        if size > self.capacity - (self._head - tail):
+            (dropped,) = _COUNTER.unpack_from(buf, _DROPPED)
+            _COUNTER.pack_into(buf, _DROPPED, dropped + 1)
+            return False
+        self._write(self._head, _LENGTH.pack(len(message)))
+        self._write(self._head + _LENGTH.size, message)
+        self._head += size
+        _COUNTER.pack_into(buf, _HEAD, self._head)
+        self.sent += 1
+        return True
+
+    def get_many(self, limit: int = 256) -> List[bytes]:
+        # Up to `limit` messages, oldest first; empty if there are none.
+        (head,) = _COUNTER.unpack_from(self._buf, _HEAD)
+        tail = self._tail
+        messages = []
+        while tail < head and len(messages) < limit:
+            (length,) = _LENGTH.unpack(self._read(tail, _LENGTH.size))
+            messages.append(self._read(tail + _LENGTH.size, length))
+            tail += _LENGTH.size + length
+        if messages:
+            self._tail = tail
+            _COUNTER.pack_into(self._buf, _TAIL, tail)
+            self.received += len(messages)
+        return messages
+
+    def pending(self) -> int:
+        # Bytes written but not yet read.
+        (head,) = _COUNTER.unpack_from(self._buf, _HEAD)
+        (tail,) = _COUNTER.unpack_from(self._buf, _TAIL)
+        return head - tail
+
+    def dropped(self) -> int:
+        return _COUNTER.unpack_from(self._buf, _DROPPED)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped(),
+            "pending_bytes": self.pending(),
+            "capacity": self.capacity,
+        }
+
+    def close(self) -> None:
+        if self._buf is None:
+            return
+        # The view must be released before the block can be closed.
+        self._buf.release()
+        self._buf = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def _write(self, position: int, data: bytes) -> None:
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        self._buf[_DATA + offset:_DATA + offset + first] = data[:first]
+        if first < len(data):
+            self._buf[_DATA:_DATA + len(data) - first] = data[first:]
+
+    def _read(self, position: int, size: int) -> bytes:
+        offset = position % self.capacity
+        if offset + size <= self.capacity:
+            return bytes(self._buf[_DATA + offset:_DATA + offset + size])
+        first = self.capacity - offset
+        return bytes(self._buf[_DATA + offset:_DATA + self.capacity]) + bytes(self._buf[_DATA:_DATA + size - first])
+
+
+class RingReader:
+    # Drains one or more rings on the event loop and calls handle(ring index, message) for each
+    # message. While messages keep arriving it only yields to other tasks between batches; once the
+    # rings are empty it sleeps, doubling the pause up to `poll_interval`, which bounds the latency
+    # an idle queue adds without spinning a core.
+    def __init__(
+        self,
+        rings: Sequence[ShmRing],
+        handle: Callable[[int, bytes], None],
+        name: str = "RingReader",
+        poll_interval: float = SHARD_POLL_INTERVAL,
+        batch: int = 256,
+    ) -> None:
+        self.rings = list(rings)
+        self.handle = handle
+        self.name = name
+        self.poll_interval = poll_interval
+        self.batch = batch
+        self.messages = 0
+        self.batches = 0
+        self.idle_polls = 0
+        self.errors = 0
+        self._run_reader = True
+
+    async def run(self) -> None:
+        pause = 0.0
+        while self._run_reader:
+            received = 0
+            for index, ring in enumerate(self.rings):
+                for message in ring.get_many(self.batch):
+                    received += 1
+                    try:
+                        self.handle(index, message)
+                    except Exception as e:
+                        self.errors += 1
+                        logger.exception(f"[{self.name}] Error handling a queued message: {e}")
+            if received:
+                self.messages += received
+                self.batches += 1
+                pause = 0.0
+            else:
+                self.idle_polls += 1
+                pause = min(self.poll_interval, pause * 2 or self.poll_interval / 16)
+            try:
+                await asyncio.sleep(pause)
+            except asyncio.CancelledError:
+                break
+
+    def stop(self) -> None:
+        self._run_reader = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "batches": self.batches,
+            "idle_polls": self.idle_polls,
+            "errors": self.errors,
+            "queues": {str(index): ring.stats() for index, ring in enumerate(self.rings)},
+        }
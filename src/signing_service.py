@@ -0,0 +1,162 @@
+import asyncio
+import base64
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.transaction import VersionedTransaction
+
+from .env import SIGNING_BATCH_WINDOW, SIGNING_EXECUTOR, SIGNING_MAX_BATCH, SIGNING_WORKERS
+from .keypair import SolanaKeypair
+
+# (raw signed transaction, signature, last valid block height or None)
+SignedTransaction = Tuple[bytes, str, Optional[int]]
+# (base64 swap transaction from Jupiter, (blockhash bytes, last valid block height) or None)
+SigningJob = Tuple[str, Optional[Tuple[bytes, int]]]
+
+# Set in each worker process by _init_worker; thread and inline signing pass the keypair instead.
+_worker_keypair: Optional[Keypair] = None
+
+
+def _init_worker(secret_key: bytes) -> None:
+    global _worker_keypair
+    _worker_keypair = Keypair.from_bytes(secret_key)
+
+
+def sign_swap_transaction(swap_transaction: str, blockhash: Optional[Tuple[bytes, int]], keypair: Keypair) -> SignedTransaction:
+    # Decode, move a v0 message onto `blockhash` so its expiry height is known, sign, serialize.
+    txn = VersionedTransaction.from_bytes(base64.b64decode(swap_transaction))
+    message = txn.message
+    last_valid_block_height = None
+    if blockhash is not None and isinstance(message, MessageV0):
+        message = MessageV0(
+            message.header, message.account_keys, Hash(blockhash[0]), message.instructions, message.address_table_lookups
+        )
+        last_valid_block_height = blockhash[1]
+    signed = VersionedTransaction(message, [keypair])
+    return bytes(signed), str(signed.signatures[0]), last_valid_block_height
+
+
+def _sign_batch(jobs: List[SigningJob], keypair: Optional[Keypair] = None) -> Tuple[List[Any], float]:
+    # Errors are returned as strings so the batch survives one bad transaction and pickles cleanly.
+    keypair = keypair or _worker_keypair
+    started = time.perf_counter()
+    results: List[Any] = []
+    for swap_transaction, blockhash in jobs:
+        try:
+            results.append(sign_swap_transaction(swap_transaction, blockhash, keypair))
+        except Exception as e:
+            results.append(f"{type(e).__name__}: {e}")
+    return results, time.perf_counter() - started
+
+
+class SigningService:
+    # Moves the CPU-bound part of a swap (base64 decode, deserialize, restamp, sign, serialize) off the
+    # event loop so WebSocket reads and pollers keep running during order bursts. Requests made in
+    # the same `batch_window` (0 = the same loop iteration) are handed to the pool as one job of up to
+    # `max_batch` transactions. `mode` is "thread" (solders releases the GIL where it can),
+    # "process" (the keypair is loaded once per worker) or "inline" (on the loop, as before).
+    def __init__(
+        self,
+        keypair: SolanaKeypair,
+        workers: int = SIGNING_WORKERS,
+        mode: str = SIGNING_EXECUTOR,
+        batch_window: float = SIGNING_BATCH_WINDOW,
+        max_batch: int = SIGNING_MAX_BATCH,
+    ) -> None:
+        self.keypair = keypair
+        self.mode = mode if workers > 0 else "inline"
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch = max(max_batch, 1)
+        self.signed = 0
+        self.errors = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.work_time = 0.0
+        self._executor: Optional[Executor] = None
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(keypair.secret_key,))
+        elif self.mode == "thread":
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="signer")
+        self._pending: List[Tuple[SigningJob, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        logger.info(f"[SigningService] Signing {'inline' if self._executor is None else f'on {workers} {self.mode} worker(s)'}.")
+
+    async def sign(self, swap_transaction: str, blockhash: Optional[Tuple[bytes, int]] = None) -> SignedTransaction:
+        if self._executor is None:
+            results, elapsed = _sign_batch([(swap_transaction, blockhash)], self.keypair._keypair)
+            self._account(1, elapsed)
+            return self._unwrap(results[0])
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((swap_transaction, blockhash), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return self._unwrap(await future)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "signed": self.signed,
+            "errors": self.errors,
+            "batches": self.batches,
+            "max_batch": self.max_batch_seen,
+            "avg_sign_ms": self.work_time / max(self.signed + self.errors, 1) * 1000,
+        }
+
+    def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"[SigningService] Closed. Stats: {self.stats()}")
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        jobs = [job for job, _ in batch]
+        # Worker processes hold their own copy of the keypair; threads share this one.
+        keypair = None if self.mode == "process" else self.keypair._keypair
+        work = asyncio.get_running_loop().run_in_executor(self._executor, _sign_batch, jobs, keypair)
+        work.add_done_callback(lambda done: self._deliver(batch, done))
+
+    def _deliver(self, batch: List[Tuple[SigningJob, asyncio.Future]], done: asyncio.Future) -> None:
+        if done.cancelled() or done.exception() is not None:
+            error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+            logger.error(f"[SigningService] Signing batch of {len(batch)} failed: {error!r}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        results, elapsed = done.result()
+        self._account(len(results), elapsed)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _account(self, size: int, elapsed: float) -> None:
+        self.batches += 1
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self.work_time += elapsed
+
+    def _unwrap(self, result: Any) -> SignedTransaction:
+        if isinstance(result, str):
+            self.errors += 1
+            raise ValueError(result)
+        self.signed += 1
+        return result
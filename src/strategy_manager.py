@@ -8,11 +8,10 @@ import json
 import random
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 import aiohttp
 import numpy as np
-import talib
 from loguru import logger
 from dotenv import load_dotenv
 
@@ -31,51 +30,39 @@ from peewee import DateTimeField, AutoField
 from playhouse.postgres_ext import JSONField
 from peewee_async import PooledPostgresqlDatabase, AioModel
 
+from .backtester import DEFAULT_SLIPPAGE_BPS, Backtester, BacktestResult
+from .indicators import DEFAULT_PARAMS, BatchIndicatorEngine, IndicatorEngine, StrategyParams, score_indicators
+from .price_buffer import PriceHistoryBook, PriceRingBuffer
 from .system_tuning import optimize_system
 
 class StrategyManager:
-    def __init__(self) -> None:
-        self.prices: list[float] = []
+    def __init__(self, params: StrategyParams = DEFAULT_PARAMS) -> None:
+        self.params = params
+        self.prices = PriceRingBuffer(capacity=1000)
+        self.indicators = IndicatorEngine(**params.engine_kwargs())
 
-    def update_price(self, price: float) -> None:
-        self.prices.append(price)
-        if len(self.prices) > 1000:
-            self.prices.pop(0)
-        logger.debug(f"[StrategyManager] Price updated: {price:.2f}")
+    def update_price(self, price: float, timestamp: Optional[float] = None) -> None:
+        self.prices.append(price, timestamp)
+        self.indicators.update(price)
+        logger.debug("[StrategyManager] Price updated: {:.2f}", price)
 
     def generate_trading_signal(self) -> Optional[str]:
-        if len(self.prices) < 30:
+        params = self.params
+        if len(self.prices) < params.sma_period:
             return None
-        prices_array = np.array(self.prices, dtype=float)
-        sma = talib.SMA(prices_array, timeperiod=30)
-        rsi = talib.RSI(prices_array, timeperiod=14)
-        upperband, middleband, lowerband = talib.BBANDS(prices_array, timeperiod=20, nbdevup=2, nbdevdn=2, matype=0)
-        macd, macd_signal, macd_hist = talib.MACD(prices_array, fastperiod=12, slowperiod=26, signalperiod=9)
-
-        current_price = prices_array[-1]
-        current_sma = sma[-1]
-        current_rsi = rsi[-1]
-        current_upper = upperband[-1]
-        current_lower = lowerband[-1]
-        current_macd_hist = macd_hist[-1]
-
-        score = 0
-        if current_price < current_lower:
-            score += 1
-        elif current_price > current_upper:
-            score -= 1
-        if current_rsi < 30:
-            score += 1
-        elif current_rsi > 70:
-            score -= 1
-        if current_macd_hist > 0:
-            score += 1
-        elif current_macd_hist < 0:
-            score -= 1
-        if current_price > current_sma:
-            score += 1
-        elif current_price < current_sma:
-            score -= 1
+        # Indicators are maintained incrementally in update_price, so reading them is O(1).
+        indicators = self.indicators
+        current_price = indicators.price
+        current_sma = indicators.sma
+        current_rsi = indicators.rsi
+        current_upper = indicators.upper_band
+        current_lower = indicators.lower_band
+        current_macd_hist = indicators.macd_hist
+
+        score = score_indicators(
+            current_price, current_sma, current_rsi, current_upper, current_lower, current_macd_hist,
+            params.rsi_oversold, params.rsi_overbought,
+        )
 
         logger.info(
             f"[StrategyManager] Indicators - Price: {current_price:.2f}, SMA: {current_sma:.2f}, "
@@ -83,12 +70,80 @@ class StrategyManager:
             f"MACD_hist: {current_macd_hist:.2f}. Score: {score}"
         )
 
-        if score >= 2:
+        if score >= params.buy_score:
             return "BUY"
-        elif score <= -2:
+        elif score <= params.sell_score:
             return "SELL"
         return None
 
-    def run_backtest(self) -> int:
-        logger.info("[StrategyManager] run_backtest() called - no real logic implemented.")
-        return 0
\ No newline at end of file
+    def run_backtest(
+        self,
+        prices: Optional[np.ndarray] = None,
+        timestamps: Optional[np.ndarray] = None,
+        slippage_bps: float = DEFAULT_SLIPPAGE_BPS,
+        fee_bps: float = 0.0,
+    ) -> BacktestResult:
+        # Without explicit data, replay the price history currently held in the ring buffer.
+        if prices is None:
+            timestamps, prices = self.prices.items()
+        logger.info(f"[StrategyManager] Running backtest over {len(prices)} prices.")
+        return Backtester(slippage_bps=slippage_bps, fee_bps=fee_bps).run(prices, timestamps, self.params)
+
+
+class PortfolioStrategyManager:
+    # Same strategy as StrategyManager, evaluated for every tracked mint at once: prices live in a
+    # PriceHistoryBook and indicators in a BatchIndicatorEngine whose rows mirror the book's rows.
+    def __init__(self, capacity: int = 1000, initial_symbols: int = 64, params: StrategyParams = DEFAULT_PARAMS) -> None:
+        self.params = params
+        self.prices = PriceHistoryBook(capacity=capacity, initial_symbols=initial_symbols)
+        self.indicators = BatchIndicatorEngine(rows=initial_symbols, **params.engine_kwargs())
+
+    @property
+    def mints(self) -> List[str]:
+        return list(self.prices)
+
+    def track(self, mint: str) -> int:
+        is_new = mint not in self.prices
+        row = self.prices.row_for(mint)
+        if is_new:
+            self.indicators.ensure_rows(row + 1)
+            self.indicators.reset([row])
+        return row
+
+    def untrack(self, mint: str) -> None:
+        self.prices.remove(mint)
+
+    def update_price(self, mint: str, price: float, timestamp: Optional[float] = None) -> None:
+        self.update_prices({mint: price}, timestamp)
+
+    def update_prices(self, prices: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        if not prices:
+            return
+        rows = np.fromiter((self.track(mint) for mint in prices), dtype=np.int64, count=len(prices))
+        values = np.fromiter(prices.values(), dtype=np.float64, count=len(prices))
+        timestamps = None if timestamp is None else np.full(len(prices), timestamp)
+        self.prices.append_many(rows, values, timestamps)
+        self.indicators.update(rows, values)
+        logger.debug("[PortfolioStrategyManager] Prices updated for {} mints.", len(prices))
+
+    def generate_trading_signals(self) -> List[Tuple[str, str, int]]:
+        if not self.prices.rows:
+            return []
+        mints = list(self.prices.rows.keys())
+        rows = np.fromiter(self.prices.rows.values(), dtype=np.int64, count=len(mints))
+        ind = self.indicators
+        params = self.params
+        scores = score_indicators(
+            ind.price[rows], ind.sma[rows], ind.rsi[rows], ind.upper_band[rows], ind.lower_band[rows], ind.macd_hist[rows],
+            params.rsi_oversold, params.rsi_overbought,
+        )
+        scores = np.where(ind.count[rows] >= params.sma_period, scores, 0)
+        # Strongest conviction first, in either direction.
+        candidates = np.flatnonzero((scores >= params.buy_score) | (scores <= params.sell_score))
+        ranked = candidates[np.argsort(-np.abs(scores[candidates]), kind="stable")]
+        signals = [(mints[i], "BUY" if scores[i] > 0 else "SELL", int(scores[i])) for i in ranked]
+        logger.info(
+            f"[PortfolioStrategyManager] Scored {len(mints)} mints: "
+            f"{sum(1 for s in signals if s[1] == 'BUY')} BUY, {sum(1 for s in signals if s[1] == 'SELL')} SELL."
+        )
+        return signals
@@ -0,0 +1,504 @@
+import asyncio
+import itertools
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from loguru import logger
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+from solana.rpc.websocket_api import SolanaWsClientProtocol, SubscriptionError
+from solana.rpc.websocket_api import connect as solana_ws_connect
+from solders.account_decoder import UiAccountEncoding
+from solders.commitment_config import CommitmentLevel
+from solders.pubkey import Pubkey
+from solders.rpc.config import (
+    RpcAccountInfoConfig,
+    RpcSignatureSubscribeConfig,
+    RpcTransactionLogsConfig,
+    RpcTransactionLogsFilter,
+    RpcTransactionLogsFilterMentions,
+)
+from solders.rpc.requests import (
+    AccountSubscribe,
+    AccountUnsubscribe,
+    LogsSubscribe,
+    LogsUnsubscribe,
+    ProgramSubscribe,
+    ProgramUnsubscribe,
+    SignatureSubscribe,
+    SignatureUnsubscribe,
+    SlotSubscribe,
+    SlotUnsubscribe,
+)
+from solders.rpc.responses import (
+    LogsNotification,
+    LogsNotificationResult,
+    RpcLogsResponse,
+    RpcResponseContext,
+    SubscriptionResult,
+    UnsubscribeResult,
+)
+from solders.signature import Signature
+from websockets.legacy.client import WebSocketClientProtocol
+
+from .env import (
+    RECONNECT_DELAY,
+    SOLANA_RPC_URL,
+    WS_BACKFILL_LIMIT,
+    WS_MAX_RECONNECT_DELAY,
+    WS_PING_INTERVAL,
+    WS_PING_TIMEOUT,
+    WS_QUEUE_SIZE,
+    WS_URL,
+)
+from .log_config import LOG, RING
+from .metrics import METRICS, stage
+from .rpc_pool import RpcEndpointPool
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+_COMMITMENTS = {
+    "processed": CommitmentLevel.Processed,
+    "confirmed": CommitmentLevel.Confirmed,
+    "finalized": CommitmentLevel.Finalized,
+}
+_ENCODINGS = {
+    "base64": UiAccountEncoding.Base64,
+    "base58": UiAccountEncoding.Base58,
+    "jsonParsed": UiAccountEncoding.JsonParsed,
+}
+_UNSUBSCRIBE = {
+    LogsSubscribe: LogsUnsubscribe,
+    AccountSubscribe: AccountUnsubscribe,
+    ProgramSubscribe: ProgramUnsubscribe,
+    SignatureSubscribe: SignatureUnsubscribe,
+    SlotSubscribe: SlotUnsubscribe,
+}
+
+RequestFactory = Callable[[int], Any]
+# Signatures remembered per channel to drop notifications seen both live and in a backfill.
+_RECENT_SIGNATURES = 4096
+_BACKFILL_BATCH = 10
+_SUBSCRIPTION_KEY = '"subscription":'
+_SUBSCRIPTION_ID_RE = re.compile(r"\s*(\d+)")
+_SIGNATURE_RE = re.compile(r'"signature":\s*"(\w+)"')
+
+
+_DECODE = stage("ws_decode")
+_FRAME = RING.event("ws_frame")
+
+
+class Subscription:
+    # One consumer's view of a (possibly shared) server subscription. Notifications arrive on a
+    # bounded queue; when the consumer falls behind, the oldest notification is dropped. With a
+    # `prefilter`, only notifications whose raw text contains that substring are delivered.
+    # `received_ns` is the perf_counter_ns() at which the last notification returned by get() was
+    # read off the socket, so consumers can time their own stages from the wire.
+    def __init__(self, hub: "SubscriptionHub", key: str, name: str, maxsize: int, prefilter: Optional[str] = None) -> None:
+        self.hub = hub
+        self.key = key
+        self.name = name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self.prefilter = prefilter
+        self.received_ns = 0
+        self._queue_wait = METRICS.histogram(
+            "ws_queue_seconds", "Time notifications wait in a consumer queue", consumer=name.split(":")[0]
+        )
+
+    async def get(self) -> Any:
+        self.received_ns, notification = await self.queue.get()
+        self._queue_wait.since(self.received_ns)
+        return notification
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+        return await self.get()
+
+    async def close(self) -> None:
+        await self.hub.unsubscribe(self)
+
+    def _deliver(self, notification: Any, received_ns: int) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((received_ns, notification))
+        self.delivered += 1
+
+
+class _Channel:
+    __slots__ = (
+        "key", "factory", "consumers", "request_id", "server_id", "notifications",
+        "backfill_address", "last_signature", "_recent", "_recent_set",
+    )
+
+    def __init__(self, key: str, factory: RequestFactory, backfill_address: Optional[str] = None) -> None:
+        self.key = key
+        self.factory = factory
+        self.consumers: List[Subscription] = []
+        self.request_id: Optional[int] = None
+        self.server_id: Optional[int] = None
+        self.notifications = 0
+        self.backfill_address = backfill_address
+        self.last_signature: Optional[str] = None
+        self._recent: Deque[str] = deque()
+        self._recent_set: Set[str] = set()
+
+    def remember(self, signature: str) -> bool:
+        if signature in self._recent_set:
+            return False
+        self._recent.append(signature)
+        self._recent_set.add(signature)
+        if len(self._recent) > _RECENT_SIGNATURES:
+            self._recent_set.discard(self._recent.popleft())
+        return True
+
+    def deliver(self, notification: Any, text: str, received_ns: int) -> None:
+        self.notifications += 1
+        for consumer in self.consumers:
+            if consumer.prefilter is None or consumer.prefilter in text:
+                consumer._deliver(notification, received_ns)
+
+    def wants(self, text: str) -> bool:
+        for consumer in self.consumers:
+            if consumer.prefilter is None or consumer.prefilter in text:
+                return True
+        return False
+
+
+class SubscriptionHub:
+    # Owns the single Solana WebSocket connection. Identical subscription requests from different
+    # consumers share one server-side subscription, each message is decoded once, and the decoded
+    # notification is fanned out to every consumer's queue. The connection is supervised: silent
+    # links are detected with ping/pong, dropped ones are re-established with jittered exponential
+    # backoff, every subscription is restored, and logs missed during the outage are backfilled
+    # over RPC. With an RPC pool, each (re)connect goes to the best-scoring endpoint's WebSocket,
+    # connection failures count against that endpoint, and backfills read from the best endpoint.
+    def __init__(
+        self,
+        ws_url: str = WS_URL,
+        queue_size: int = WS_QUEUE_SIZE,
+        rpc_url: str = SOLANA_RPC_URL,
+        rpc_pool: Optional[RpcEndpointPool] = None,
+    ) -> None:
+        self.ws_url = ws_url
+        self.queue_size = queue_size
+        self.rpc_url = rpc_url
+        self.rpc_pool = rpc_pool
+        self.reconnects = 0
+        self.gaps: Deque[float] = deque(maxlen=64)
+        self.backfilled = 0
+        self.duplicates = 0
+        self.prefiltered = 0
+        self.last_ping_rtt: Optional[float] = None
+        self._disconnected_at: Optional[float] = None
+        self._rpc_client: Optional[AsyncClient] = None
+        self._backfills: Set[asyncio.Task] = set()
+        self._channels: Dict[str, _Channel] = {}
+        self._by_request: Dict[int, _Channel] = {}
+        self._by_server_id: Dict[int, _Channel] = {}
+        self._request_ids = itertools.count(1)
+        self._websocket: Optional[SolanaWsClientProtocol] = None
+        self._connected = asyncio.Event()
+        self._run_hub = True
+
+    def subscribe_logs(
+        self,
+        mentions: Optional[str] = None,
+        commitment: str = "processed",
+        name: str = "",
+        maxsize: Optional[int] = None,
+        prefilter: Optional[str] = None,
+    ) -> Subscription:
+        filter_ = RpcTransactionLogsFilterMentions(Pubkey.from_string(mentions)) if mentions else RpcTransactionLogsFilter.All
+        config = RpcTransactionLogsConfig(_COMMITMENTS[commitment])
+        return self.subscribe(
+            lambda req_id: LogsSubscribe(filter_, config, req_id), name, maxsize, backfill_address=mentions, prefilter=prefilter
+        )
+
+    def subscribe_account(
+        self, pubkey: str, commitment: str = "processed", encoding: str = "base64", name: str = "", maxsize: Optional[int] = None
+    ) -> Subscription:
+        account = Pubkey.from_string(pubkey)
+        config = RpcAccountInfoConfig(_ENCODINGS[encoding], commitment=_COMMITMENTS[commitment])
+        return self.subscribe(lambda req_id: AccountSubscribe(account, config, req_id), name, maxsize)
+
+    def subscribe_signature(
+        self, signature: str, commitment: str = "confirmed", name: str = "", maxsize: Optional[int] = None
+    ) -> Subscription:
+        sig = Signature.from_string(signature)
+        config = RpcSignatureSubscribeConfig(_COMMITMENTS[commitment])
+        return self.subscribe(lambda req_id: SignatureSubscribe(sig, config, req_id), name, maxsize)
+
+    def subscribe(
+        self,
+        factory: RequestFactory,
+        name: str = "",
+        maxsize: Optional[int] = None,
+        backfill_address: Optional[str] = None,
+        prefilter: Optional[str] = None,
+    ) -> Subscription:
+        # The request serialized with a fixed id identifies the subscription, so two consumers asking
+        # for the same method and params end up on the same channel.
+        key = factory(0).to_json()
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(key, factory, backfill_address)
+            if self._websocket is not None:
+                asyncio.get_running_loop().create_task(self._send_subscribe(channel))
+        subscription = Subscription(self, key, name or key, maxsize or self.queue_size, prefilter)
+        channel.consumers.append(subscription)
+        logger.info(f"[SubscriptionHub] {subscription.name} subscribed ({len(channel.consumers)} consumer(s) on channel).")
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        channel = self._channels.get(subscription.key)
+        if channel is None or subscription not in channel.consumers:
+            return
+        channel.consumers.remove(subscription)
+        logger.info(f"[SubscriptionHub] {subscription.name} unsubscribed.")
+        if channel.consumers:
+            return
+        # A request still awaiting confirmation stays in _by_request; _pump unsubscribes it on arrival.
+        del self._channels[channel.key]
+        if channel.server_id is not None:
+            self._by_server_id.pop(channel.server_id, None)
+            if self._websocket is not None and self._run_hub:
+                request = channel.factory(0)
+                unsubscribe = _UNSUBSCRIBE[type(request)](channel.server_id, next(self._request_ids))
+                try:
+                    await self._websocket.send_data(unsubscribe)
+                except Exception as e:
+                    logger.warning(f"[SubscriptionHub] Failed to send unsubscribe for {channel.server_id}: {e}")
+
+    async def wait_connected(self) -> None:
+        await self._connected.wait()
+
+    async def run(self) -> None:
+        attempt = 0
+        while self._run_hub:
+            if self.rpc_pool is not None:
+                self.ws_url = self.rpc_pool.ws_url()
+            try:
+                # Liveness is checked by _pump's own ping/pong so the timeout tracks recv() idleness.
+                async with solana_ws_connect(self.ws_url, ping_interval=None) as websocket:
+                    if self.rpc_pool is not None:
+                        self.rpc_pool.report(self.ws_url, ok=True)
+                    self._websocket = websocket
+                    self._connected.set()
+                    attempt = 0
+                    gap = None
+                    if self._disconnected_at is not None:
+                        gap = time.monotonic() - self._disconnected_at
+                        self.reconnects += 1
+                        self.gaps.append(gap)
+                        logger.warning(f"[SubscriptionHub] Reconnected to {self.ws_url} after {gap:.2f}s (reconnect #{self.reconnects}).")
+                    else:
+                        logger.info(f"[SubscriptionHub] Connected to {self.ws_url}.")
+                    for channel in list(self._channels.values()):
+                        await self._send_subscribe(channel)
+                    if gap is not None:
+                        for channel in list(self._channels.values()):
+                            if channel.backfill_address and channel.last_signature:
+                                self._start_backfill(channel)
+                    await self._pump(websocket)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if self._run_hub:
+                    logger.error(f"[SubscriptionHub] Connection error: {e}")
+                    if self.rpc_pool is not None:
+                        self.rpc_pool.report(self.ws_url, ok=False)
+            finally:
+                if self._websocket is not None:
+                    self._disconnected_at = time.monotonic()
+                self._websocket = None
+                self._connected.clear()
+                self._by_request.clear()
+                self._by_server_id.clear()
+                for channel in self._channels.values():
+                    channel.request_id = channel.server_id = None
+            if self._run_hub:
+                delay = random.uniform(0, min(WS_MAX_RECONNECT_DELAY, RECONNECT_DELAY * 2 ** attempt))
+                attempt += 1
+                logger.info(f"[SubscriptionHub] Reconnecting in {delay:.2f}s (attempt {attempt}).")
+                await asyncio.sleep(delay)
+        for task in list(self._backfills):
+            task.cancel()
+        if self._rpc_client is not None:
+            await self._rpc_client.close()
+
+    def stop(self) -> None:
+        self._run_hub = False
+        if self._websocket is not None:
+            asyncio.get_running_loop().create_task(self._websocket.close())
+        logger.info(f"[SubscriptionHub] Stopping hub. Metrics: {self.metrics()}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            consumer.name: {
+                "server_id": channel.server_id,
+                "channel_notifications": channel.notifications,
+                "delivered": consumer.delivered,
+                "dropped": consumer.dropped,
+                "queued": consumer.queue.qsize(),
+            }
+            for channel in self._channels.values()
+            for consumer in channel.consumers
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "connected": self._connected.is_set(),
+            "reconnects": self.reconnects,
+            "last_gap": self.gaps[-1] if self.gaps else None,
+            "max_gap": max(self.gaps, default=None),
+            "total_gap": sum(self.gaps),
+            "backfilled": self.backfilled,
+            "duplicates": self.duplicates,
+            "prefiltered": self.prefiltered,
+            "last_ping_rtt": self.last_ping_rtt,
+            "subscriptions": self.stats(),
+        }
+
+    async def _send_subscribe(self, channel: _Channel) -> None:
+        websocket = self._websocket
+        if websocket is None:
+            return
+        request_id = next(self._request_ids)
+        channel.request_id = request_id
+        self._by_request[request_id] = channel
+        await websocket.send_data(channel.factory(request_id))
+
+    async def _heartbeat(self, websocket: SolanaWsClientProtocol) -> None:
+        started = time.perf_counter()
+        pong = await websocket.ping()
+        try:
+            await asyncio.wait_for(pong, WS_PING_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"no pong within {WS_PING_TIMEOUT}s")
+        self.last_ping_rtt = time.perf_counter() - started
+
+    async def _pump(self, websocket: SolanaWsClientProtocol) -> None:
+        while self._run_hub:
+            try:
+                raw = await asyncio.wait_for(WebSocketClientProtocol.recv(websocket), WS_PING_INTERVAL)
+            except asyncio.TimeoutError:
+                await self._heartbeat(websocket)
+                continue
+            received = time.perf_counter_ns()
+            RING.record(_FRAME, len(raw))
+            if self._prefiltered(raw):
+                continue
+            try:
+                messages = websocket._process_rpc_response(raw)
+            except SubscriptionError as e:
+                self._by_request.pop(e.subscription.id, None)
+                logger.error(f"[SubscriptionHub] Subscription rejected: {e}")
+                continue
+            _DECODE.since(received)
+            for message in messages:
+                if isinstance(message, SubscriptionResult):
+                    channel = self._by_request.pop(message.id, None)
+                    if channel is not None and channel.key in self._channels:
+                        channel.server_id = message.result
+                        self._by_server_id[message.result] = channel
+                        logger.debug("[SubscriptionHub] Subscription {} confirmed for request {}.", message.result, message.id)
+                    elif channel is not None:
+                        # Every consumer left before the server confirmed; drop it server-side too.
+                        unsubscribe = _UNSUBSCRIBE[type(channel.factory(0))](message.result, next(self._request_ids))
+                        await websocket.send_data(unsubscribe)
+                    continue
+                if isinstance(message, UnsubscribeResult):
+                    continue
+                channel = self._by_server_id.get(getattr(message, "subscription", None))
+                if channel is None:
+                    if LOG.trace:
+                        logger.trace("[SubscriptionHub] Notification for unknown subscription: {}", message)
+                    continue
+                if isinstance(message, LogsNotification):
+                    signature = str(message.result.value.signature)
+                    if not channel.remember(signature):
+                        self.duplicates += 1
+                        continue
+                    channel.last_signature = signature
+                channel.deliver(message, raw, received)
+
+    def _prefiltered(self, raw: str) -> bool:
+        # Drops a notification before it is decoded when every consumer of its channel has a prefilter
+        # and none of them occurs in the raw frame. Only the signature is pulled out, so a later
+        # backfill still starts from the right place.
+        position = raw.rfind(_SUBSCRIPTION_KEY)
+        if position < 0:
+            return False
+        match = _SUBSCRIPTION_ID_RE.match(raw, position + len(_SUBSCRIPTION_KEY))
+        channel = self._by_server_id.get(int(match.group(1))) if match else None
+        if channel is None or channel.wants(raw):
+            return False
+        signature = _SIGNATURE_RE.search(raw)
+        if signature is not None:
+            channel.last_signature = signature.group(1)
+        self.prefiltered += 1
+        return True
+
+    def _rpc(self) -> AsyncClient:
+        if self.rpc_pool is not None:
+            return self.rpc_pool.client()
+        if self._rpc_client is None:
+            self._rpc_client = AsyncClient(self.rpc_url, commitment=Confirmed)
+        return self._rpc_client
+
+    def _start_backfill(self, channel: _Channel) -> None:
+        task = asyncio.get_running_loop().create_task(self._backfill(channel, channel.last_signature))
+        self._backfills.add(task)
+        task.add_done_callback(self._backfills.discard)
+
+    async def _backfill(self, channel: _Channel, until: str) -> None:
+        # Replays, oldest first, the transactions that mentioned the subscribed address after the last
+        # signature seen live. getSignaturesForAddress only serves confirmed data, so anything still
+        # unconfirmed arrives over the restored subscription instead.
+        started = time.perf_counter()
+        client = self._rpc()
+        try:
+            response = await client.get_signatures_for_address(
+                Pubkey.from_string(channel.backfill_address), until=Signature.from_string(until), limit=WS_BACKFILL_LIMIT
+            )
+            statuses = [status for status in reversed(response.value) if str(status.signature) not in channel._recent_set]
+            if len(response.value) >= WS_BACKFILL_LIMIT:
+                logger.warning(f"[SubscriptionHub] Backfill for {channel.backfill_address} hit the {WS_BACKFILL_LIMIT} signature limit; older gap entries skipped.")
+            replayed = 0
+            for offset in range(0, len(statuses), _BACKFILL_BATCH):
+                batch = statuses[offset:offset + _BACKFILL_BATCH]
+                transactions = await asyncio.gather(
+                    *(client.get_transaction(status.signature, max_supported_transaction_version=0) for status in batch),
+                    return_exceptions=True,
+                )
+                for status, transaction in zip(batch, transactions):
+                    if isinstance(transaction, Exception) or transaction.value is None or channel.key not in self._channels:
+                        continue
+                    if not channel.remember(str(status.signature)):
+                        continue
+                    meta = transaction.value.transaction.meta
+                    logs = RpcLogsResponse(status.signature, meta.err if meta else None, (meta.log_messages if meta else None) or [])
+                    result = LogsNotificationResult(logs, RpcResponseContext(status.slot))
+                    channel.deliver(LogsNotification(result, channel.server_id or 0), "\n".join(logs.logs), time.perf_counter_ns())
+                    replayed += 1
+            self.backfilled += replayed
+            logger.info(
+                f"[SubscriptionHub] Backfilled {replayed} transactions for {channel.backfill_address} "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms."
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[SubscriptionHub] Backfill for {channel.backfill_address} failed: {e}")
@@ -1,50 +1,82 @@
-import base64
-from typing import Optional, Dict, Any
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, Tuple
 
-import aiohttp
 from loguru import logger
 
-# Solana RPC and WebSocket clients
-from solana.rpc.async_api import AsyncClient
-
-# Use solders for transaction and keypair functionality
-from solders.transaction import Transaction as SolanaTransaction
-
+from .http_client import HttpClient
 from .keypair import SolanaKeypair
-from .env import JUPITER_API_KEY, SOL_MINT, SOLANA_RPC_URL
+from .log_config import RING
+from .metrics import stage
+from .mint_metadata import MintMetadataCache
+from .quote_cache import QuoteCache, QuoteKey, quote_key
+from .rpc_pool import RpcEndpointPool
+from .signing_service import SigningService
+from .subscription_hub import SubscriptionHub
+from .transaction_submitter import TransactionSubmitter
+from .env import JUPITER_API_KEY, JUPITER_API_URL, SEND_RPC_URLS, SOL_MINT, SOLANA_RPC_URL, SOLANA_RPC_URLS
+
+_QUOTE = stage("quote")
+_SWAP_BUILD = stage("swap_build")
+_SIGN = stage("sign")
+_SEND = stage("send")
+_SIGNED = RING.event("swap_signed")
+_SENT = RING.event("swap_sent")
 
 class TradeExecutor:
-    def __init__(self) -> None:
-        self.rpc_url = SOLANA_RPC_URL
-        self.client = AsyncClient(self.rpc_url)
+    def __init__(
+        self,
+        http_client: Optional[HttpClient] = None,
+        rpc_url: str = SOLANA_RPC_URL,
+        jupiter_api_url: str = JUPITER_API_URL,
+        mint_metadata: Optional[MintMetadataCache] = None,
+        hub: Optional[SubscriptionHub] = None,
+        send_urls: Optional[List[str]] = None,
+        rpc_pool: Optional[RpcEndpointPool] = None,
+        signer: Optional[SigningService] = None,
+    ) -> None:
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or HttpClient()
+        self.rpc_url = rpc_url
+        # Without a shared pool, a non-default rpc_url (e.g. the replay server) is the only endpoint.
+        self._owns_rpc_pool = rpc_pool is None
+        self.rpc_pool = rpc_pool or RpcEndpointPool(
+            self.http_client, SOLANA_RPC_URLS if rpc_url == SOLANA_RPC_URL else [rpc_url]
+        )
         self.keypair = SolanaKeypair()
+        self.signer = signer or SigningService(self.keypair)
         # New Jupiter API endpoints (v1) as per update
-        self.jupiter_api_quote = "https://api.jup.ag/swap/v1/quote"
-        self.jupiter_api_swap = "https://api.jup.ag/swap/v1/swap"
+        self.jupiter_api_quote = f"{jupiter_api_url.rstrip('/')}/quote"
+        self.jupiter_api_swap = f"{jupiter_api_url.rstrip('/')}/swap"
         self.api_key = JUPITER_API_KEY
+        self.quote_cache = QuoteCache(self.fetch_quote, self.fetch_swap_transaction)
+        self.mint_metadata = mint_metadata or MintMetadataCache(self.rpc_pool)
+        self.submitter = TransactionSubmitter(self.rpc_pool, send_urls or SEND_RPC_URLS, hub)
+        self._pending_prefetch: Dict[Tuple[str, str, float], asyncio.Task] = {}
         pubkey_str = self.keypair.public_key.to_string() if hasattr(self.keypair.public_key, "to_string") else str(self.keypair.public_key)
         logger.info(f"[TradeExecutor] Initialized with public key: {pubkey_str}")
 
-    async def execute_swap(self, input_mint: str, output_mint: str, amount: int, slippage: float = 1) -> Optional[Dict[str, Any]]:
-        logger.info("[TradeExecutor] Initiating swap execution...")
+    def _headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        return headers
+
+    async def fetch_quote(self, key: QuoteKey) -> Optional[Dict[str, Any]]:
+        input_mint, output_mint, amount, slippage_bps = key
         params = {
             "inputMint": input_mint,
             "outputMint": output_mint,
             "amount": str(amount),
-            "slippageBps": str(int(slippage * 100))
+            "slippageBps": str(slippage_bps)
         }
-        headers = {}
-        if self.api_key:
-            headers["X-API-Key"] = self.api_key
-
-        logger.debug(f"[TradeExecutor] Fetching swap quote with params: {params}")
+        logger.debug("[TradeExecutor] Fetching swap quote with params: {}", params)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.jupiter_api_quote, params=params, headers=headers, timeout=10) as response:
-                    if response.status != 200:
-                        logger.error(f"[TradeExecutor] Quote request failed with status {response.status}")
-                        return None
-                    data = await response.json()
+            async with self.http_client.session.get(self.jupiter_api_quote, params=params, headers=self._headers(), timeout=10) as response:
+                if response.status != 200:
+                    logger.error(f"[TradeExecutor] Quote request failed with status {response.status}")
+                    return None
+                data = await response.json()
         except Exception as e:
             logger.error(f"[TradeExecutor] Exception during quote request: {e}")
             return None
@@ -52,22 +84,26 @@ class TradeExecutor:
         if not data or "routes" not in data or not data["routes"]:
             logger.error("[TradeExecutor] No swap routes found.")
             return None
+        return data
 
-        best_route = data["routes"][0]
-        logger.debug(f"[TradeExecutor] Best route selected: {best_route}")
+    async def fetch_swap_transaction(self, quote: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        best_route = quote["routes"][0]
+        logger.debug("[TradeExecutor] Best route selected: {}", best_route)
         payload = {
             "route": best_route,
             "userPublicKey": self.keypair.public_key.to_string() if hasattr(self.keypair.public_key, "to_string") else str(self.keypair.public_key),
             "wrapUnwrapSOL": True,
             "dynamicSlippage": {"maxBps": 300}
         }
+        priority_fee = self.submitter.priority_fee()
+        if priority_fee:
+            payload["computeUnitPriceMicroLamports"] = priority_fee
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.jupiter_api_swap, json=payload, headers=headers, timeout=10) as response:
-                    if response.status != 200:
-                        logger.error(f"[TradeExecutor] Swap request failed with status {response.status}")
-                        return None
-                    swap_data = await response.json()
+            async with self.http_client.session.post(self.jupiter_api_swap, json=payload, headers=self._headers(), timeout=10) as response:
+                if response.status != 200:
+                    logger.error(f"[TradeExecutor] Swap request failed with status {response.status}")
+                    return None
+                swap_data = await response.json()
         except Exception as e:
             logger.error(f"[TradeExecutor] Exception during swap request: {e}")
             return None
@@ -75,40 +111,89 @@ class TradeExecutor:
         if "swapTransaction" not in swap_data:
             logger.error("[TradeExecutor] Swap transaction not received.")
             return None
+        return swap_data
 
-        tx_base64 = swap_data["swapTransaction"]
-        try:
-            raw_tx = base64.b64decode(tx_base64)
-        except Exception as e:
-            logger.error(f"[TradeExecutor] Base64 decoding failed: {e}")
-            return None
+    def _order_mints(self, meme_coin_mint: str, side: str) -> Tuple[str, str]:
+        if side.lower() == "buy":
+            return SOL_MINT, meme_coin_mint
+        return meme_coin_mint, SOL_MINT
 
-        try:
-            txn = SolanaTransaction.from_bytes(raw_tx)
-            logger.debug("[TradeExecutor] Transaction deserialized successfully.")
-        except Exception as e:
-            logger.error(f"[TradeExecutor] Failed to deserialize transaction: {e}")
-            return None
+    def _market_order_key(self, meme_coin_mint: str, side: str, amount: float, decimals: int) -> QuoteKey:
+        # `amount` is in units of the input mint: SOL for buys, the token for sells.
+        input_mint, output_mint = self._order_mints(meme_coin_mint, side)
+        amt_in_smallest = int(amount * (10 ** decimals))
+        return quote_key(input_mint, output_mint, amt_in_smallest, slippage=1)
+
+    def prefetch_market_order(self, meme_coin_mint: str, side: str, amount: float) -> None:
+        # Keeps a quote for this order warm in the background so execution can skip the quote round-trip.
+        input_mint, _ = self._order_mints(meme_coin_mint, side)
+        decimals = self.mint_metadata.decimals(input_mint)
+        if decimals is not None:
+            self.quote_cache.watch(self._market_order_key(meme_coin_mint, side, amount, decimals))
+            return
+        order = (meme_coin_mint, side, amount)
+        if order not in self._pending_prefetch:
+            task = asyncio.get_running_loop().create_task(self._prefetch_when_known(meme_coin_mint, side, amount))
+            self._pending_prefetch[order] = task
+            task.add_done_callback(lambda _: self._pending_prefetch.pop(order, None))
+
+    async def _prefetch_when_known(self, meme_coin_mint: str, side: str, amount: float) -> None:
+        input_mint, _ = self._order_mints(meme_coin_mint, side)
+        metadata = await self.mint_metadata.get(input_mint)
+        if metadata is not None:
+            self.quote_cache.watch(self._market_order_key(meme_coin_mint, side, amount, metadata.decimals))
+
+    def cancel_prefetch_market_order(self, meme_coin_mint: str, side: str, amount: float) -> None:
+        pending = self._pending_prefetch.pop((meme_coin_mint, side, amount), None)
+        if pending is not None:
+            pending.cancel()
+        input_mint, _ = self._order_mints(meme_coin_mint, side)
+        metadata = self.mint_metadata.peek(input_mint)
+        if metadata is not None:
+            self.quote_cache.unwatch(self._market_order_key(meme_coin_mint, side, amount, metadata.decimals))
 
+    async def execute_swap(self, input_mint: str, output_mint: str, amount: int, slippage: float = 1) -> Optional[Dict[str, Any]]:
+        logger.info("[TradeExecutor] Initiating swap execution...")
+        key = quote_key(input_mint, output_mint, amount, slippage)
+        started = time.perf_counter_ns()
+        cached = await self.quote_cache.acquire(key)
+        if cached is not None:
+            logger.debug("[TradeExecutor] Using prefetched quote ({:.0f}ms old).", cached.age() * 1000)
+            data, swap_data = cached.quote, cached.swap
+        else:
+            data, swap_data = await self.fetch_quote(key), None
+            if data is None:
+                return None
+        _QUOTE.since(started)
+
+        if swap_data is None:
+            started = time.perf_counter_ns()
+            swap_data = await self.fetch_swap_transaction(data)
+            if swap_data is None:
+                return None
+            _SWAP_BUILD.since(started)
+
+        # Decode, restamp onto the cached blockhash (so the expiry height is known for re-broadcasting),
+        # sign and serialize on the signing pool rather than the event loop.
+        started = time.perf_counter_ns()
         try:
-            txn.sign([self.keypair._keypair])
-            logger.debug("[TradeExecutor] Transaction signed successfully.")
+            raw_signed_tx, signature, last_valid_block_height = await self.signer.sign(
+                swap_data["swapTransaction"], self.submitter.signing_blockhash()
+            )
         except Exception as e:
             logger.error(f"[TradeExecutor] Failed to sign transaction: {e}")
             return None
-
-        try:
-            raw_signed_tx = txn.serialize()
-        except Exception as e:
-            logger.error(f"[TradeExecutor] Transaction serialization failed: {e}")
-            return None
-
-        logger.info("[TradeExecutor] Sending raw transaction to RPC client.")
-        try:
-            response = await self.client.send_raw_transaction(raw_signed_tx)
-        except Exception as e:
-            logger.error(f"[TradeExecutor] Failed to send raw transaction: {e}")
-            return None
+        _SIGN.since(started)
+        RING.record(_SIGNED, len(raw_signed_tx), time.perf_counter_ns() - started)
+        logger.debug("[TradeExecutor] Transaction signed successfully.")
+        if last_valid_block_height is None:
+            last_valid_block_height = swap_data.get("lastValidBlockHeight")
+
+        logger.info(f"[TradeExecutor] Sending raw transaction to {len(self.submitter.targets())} RPC endpoint(s).")
+        started = time.perf_counter_ns()
+        response = await self.submitter.submit(raw_signed_tx, signature, last_valid_block_height)
+        _SEND.since(started)
+        RING.record(_SENT, bool(response.get("result")), time.perf_counter_ns() - started)
 
         if response.get("result"):
             logger.success(f"[TradeExecutor] Swap executed successfully. Tx signature: {response.get('result')}")
@@ -117,17 +202,29 @@ class TradeExecutor:
         return response
 
     async def execute_market_order(self, meme_coin_mint: str, side: str, amount: float) -> Optional[Dict[str, Any]]:
-        decimals = 6  # Assume token decimals = 6; in production, fetch dynamically.
-        amt_in_smallest = int(amount * (10 ** decimals))
-        if side.lower() == "buy":
-            input_mint = SOL_MINT
-            output_mint = meme_coin_mint
-        else:
-            input_mint = meme_coin_mint
-            output_mint = SOL_MINT
+        input_mint, output_mint = self._order_mints(meme_coin_mint, side)
+        decimals = self.mint_metadata.decimals(input_mint)
+        if decimals is None:
+            # Only reached for a mint no scanner warmed; costs one getMultipleAccounts round-trip.
+            metadata = await self.mint_metadata.get(input_mint)
+            if metadata is None:
+                logger.error(f"[TradeExecutor] Unknown decimals for {input_mint}; cannot size order.")
+                return None
+            decimals = metadata.decimals
+        _, _, amt_in_smallest, slippage_bps = self._market_order_key(meme_coin_mint, side, amount, decimals)
         logger.info(f"[TradeExecutor] Executing market order: side={side.upper()}, amount={amount}, input_mint={input_mint}, output_mint={output_mint}")
-        return await self.execute_swap(input_mint, output_mint, amt_in_smallest, slippage=1)
+        return await self.execute_swap(input_mint, output_mint, amt_in_smallest, slippage=slippage_bps / 100)
 
     async def close(self) -> None:
-        await self.client.close()
+        self.quote_cache.stop()
+        self.mint_metadata.stop()
+        self.submitter.stop()
+        self.signer.close()
+        for task in self._pending_prefetch.values():
+            task.cancel()
+        if self._owns_rpc_pool:
+            self.rpc_pool.stop()
+            await self.rpc_pool.close()
+        if self._owns_http_client:
+            await self.http_client.close()
         logger.info("[TradeExecutor] RPC client closed.")
\ No newline at end of file
@@ -0,0 +1,308 @@
+import asyncio
+import base64
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from loguru import logger
+from solders.hash import Hash
+
+from .env import (
+    BLOCKHASH_REFRESH_INTERVAL,
+    PRIORITY_FEE_MAX,
+    PRIORITY_FEE_PERCENTILE,
+    PRIORITY_FEE_REFRESH_INTERVAL,
+    SEND_CONFIRM_POLL_INTERVAL,
+    SEND_CONFIRM_TIMEOUT,
+    SEND_REBROADCAST_INTERVAL,
+    SEND_RPC_URLS,
+    SEND_SKIP_PREFLIGHT,
+)
+from .rpc_pool import RpcEndpointPool
+from .subscription_hub import SubscriptionHub
+
+# A blockhash is valid for 150 blocks after the one it was taken from; blocks are ~400ms apart.
+MAX_PROCESSING_AGE = 150
+SLOT_SECONDS = 0.4
+
+
+@dataclass
+class SendEndpointStats:
+    sends: int = 0
+    accepted: int = 0
+    errors: int = 0
+    landed: int = 0
+    accept_time: float = 0.0
+    land_time: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "sends": self.sends,
+            "accepted": self.accepted,
+            "errors": self.errors,
+            "landed": self.landed,
+            "avg_accept_ms": self.accept_time / max(self.accepted, 1) * 1000,
+            "avg_land_ms": self.land_time / max(self.landed, 1) * 1000,
+        }
+
+
+class TransactionSubmitter:
+    # Send path for signed swaps. run() keeps a recent blockhash and the recent prioritization fees
+    # warm; submit() broadcasts a transaction to every SEND_RPC_URLS endpoint (or, without any, every
+    # healthy endpoint of the RPC pool) at once and returns as soon as one accepts it, then keeps
+    # re-broadcasting in the background until the transaction is confirmed (signatureSubscribe
+    # through the hub, with hedged getSignatureStatuses polling as a fallback) or its blockhash
+    # expires. JSON-RPC goes through the pool so every send and read feeds the endpoint scores.
+    def __init__(
+        self,
+        rpc_pool: RpcEndpointPool,
+        send_urls: Sequence[str] = SEND_RPC_URLS,
+        hub: Optional[SubscriptionHub] = None,
+        skip_preflight: bool = SEND_SKIP_PREFLIGHT,
+        rebroadcast_interval: float = SEND_REBROADCAST_INTERVAL,
+        confirm_timeout: float = SEND_CONFIRM_TIMEOUT,
+        confirm_poll_interval: float = SEND_CONFIRM_POLL_INTERVAL,
+        blockhash_refresh_interval: float = BLOCKHASH_REFRESH_INTERVAL,
+        fee_refresh_interval: float = PRIORITY_FEE_REFRESH_INTERVAL,
+        fee_percentile: float = PRIORITY_FEE_PERCENTILE,
+        max_fee: int = PRIORITY_FEE_MAX,
+    ) -> None:
+        self.rpc_pool = rpc_pool
+        self.send_urls = list(send_urls)
+        self.hub = hub
+        self.skip_preflight = skip_preflight
+        self.rebroadcast_interval = rebroadcast_interval
+        self.confirm_timeout = confirm_timeout
+        self.confirm_poll_interval = confirm_poll_interval
+        self.blockhash_refresh_interval = blockhash_refresh_interval
+        self.fee_refresh_interval = fee_refresh_interval
+        self.fee_percentile = fee_percentile
+        self.max_fee = max_fee
+        self.endpoints: Dict[str, SendEndpointStats] = {}
+        self.confirmed = 0
+        self.failed = 0
+        self.expired = 0
+        self.rebroadcasts = 0
+        self._blockhash: Optional[Tuple[Hash, int, float]] = None
+        self._priority_fee = 0
+        self._tracking: Dict[str, asyncio.Task] = {}
+        self._sends: Set[asyncio.Task] = set()
+        self._run_refresher = True
+
+    def priority_fee(self) -> int:
+        # Compute-unit price (micro-lamports) at the configured percentile of recent fees.
+        return self._priority_fee
+
+    def block_height(self) -> Optional[int]:
+        # Estimated from the cached blockhash, so expiry checks cost no RPC.
+        if self._blockhash is None:
+            return None
+        _, last_valid, fetched_at = self._blockhash
+        return last_valid - MAX_PROCESSING_AGE + int((time.monotonic() - fetched_at) / SLOT_SECONDS)
+
+    def signing_blockhash(self) -> Optional[Tuple[bytes, int]]:
+        # The cached blockhash and its last valid block height for restamping a transaction before it is
+        # signed, or None if the cache is older than two refresh intervals.
+        if self._blockhash is None:
+            return None
+        blockhash, last_valid, fetched_at = self._blockhash
+        if time.monotonic() - fetched_at > 2 * self.blockhash_refresh_interval:
+            return None
+        return bytes(blockhash), last_valid
+
+    def targets(self) -> List[str]:
+        return self.send_urls or self.rpc_pool.urls()
+
+    def confirmation(self, signature: str) -> Optional[asyncio.Task]:
+        return self._tracking.get(signature)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "rebroadcasts": self.rebroadcasts,
+            "priority_fee": self._priority_fee,
+            "endpoints": {url: endpoint.summary() for url, endpoint in self.endpoints.items()},
+        }
+
+    async def submit(self, raw_tx: bytes, signature: str, last_valid_block_height: Optional[int] = None) -> Dict[str, Any]:
+        encoded = base64.b64encode(raw_tx).decode("ascii")
+        accepted_at: Dict[str, float] = {}
+        errors = await self._broadcast(encoded, accepted_at)
+        if not accepted_at:
+            logger.error(f"[TransactionSubmitter] No endpoint accepted {signature}: {errors}")
+            return {"result": None, "errors": errors}
+        if self.confirm_timeout > 0:
+            task = asyncio.get_running_loop().create_task(
+                self._track(encoded, signature, last_valid_block_height, accepted_at)
+            )
+            self._tracking[signature] = task
+            task.add_done_callback(lambda _: self._tracking.pop(signature, None))
+        return {"result": signature, "endpoints": len(accepted_at)}
+
+    async def run(self) -> None:
+        await asyncio.gather(self._refresh_blockhash(), self._refresh_fees())
+
+    def stop(self) -> None:
+        self._run_refresher = False
+        for task in list(self._tracking.values()) + list(self._sends):
+            task.cancel()
+        logger.info(f"[TransactionSubmitter] Stopping. Stats: {self.stats()}")
+
+    async def _broadcast(self, encoded: str, accepted_at: Dict[str, float]) -> Dict[str, str]:
+        # Returns as soon as one endpoint accepts the transaction (or every one has failed), with the
+        # errors seen so far; the slower sends keep running and still record their acceptance.
+        pending = self._send_all(encoded, accepted_at)
+        errors: Dict[str, str] = {}
+        while pending and not accepted_at:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url, error = task.result()
+                if error:
+                    errors[url] = error
+        return errors
+
+    def _send_all(self, encoded: str, accepted_at: Dict[str, float]) -> Set[asyncio.Task]:
+        # One background task per target, kept in _sends until it finishes so stop() can cancel it.
+        config = {"encoding": "base64", "skipPreflight": self.skip_preflight, "preflightCommitment": "confirmed", "maxRetries": 0}
+
+        async def send(url: str) -> Tuple[str, Optional[str]]:
+            endpoint = self.endpoints.get(url)
+            if endpoint is None:
+                endpoint = self.endpoints[url] = SendEndpointStats()
+            endpoint.sends += 1
+            started = time.monotonic()
+            try:
+                await self.rpc_pool.call(url, "sendTransaction", [encoded, config])
+            except Exception as e:
+                endpoint.errors += 1
+                return url, str(e) or type(e).__name__
+            if url not in accepted_at:
+                accepted_at[url] = time.monotonic()
+                endpoint.accepted += 1
+                endpoint.accept_time += accepted_at[url] - started
+            return url, None
+
+        loop = asyncio.get_running_loop()
+        tasks = {loop.create_task(send(url)) for url in self.targets()}
+        for task in tasks:
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+        return tasks
+
+    async def _track(
+        self, encoded: str, signature: str, last_valid_block_height: Optional[int], accepted_at: Dict[str, float]
+    ) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + self.confirm_timeout
+        confirm = asyncio.get_running_loop().create_task(self._confirm(signature))
+        try:
+            while True:
+                done, _ = await asyncio.wait({confirm}, timeout=self.rebroadcast_interval)
+                if done:
+                    break
+                height = self.block_height()
+                if time.monotonic() > deadline or (
+                    last_valid_block_height is not None and height is not None and height > last_valid_block_height
+                ):
+                    self.expired += 1
+                    logger.warning(f"[TransactionSubmitter] {signature} expired without landing.")
+                    return None
+                self.rebroadcasts += 1
+                self._send_all(encoded, accepted_at)
+        finally:
+            if not confirm.done():
+                confirm.cancel()
+
+        try:
+            status = confirm.result()
+        except Exception as e:
+            self.expired += 1
+            logger.warning(f"[TransactionSubmitter] Could not confirm {signature}: {e}")
+            return None
+        landed_at = time.monotonic()
+        for url, accepted in accepted_at.items():
+            self.endpoints[url].landed += 1
+            self.endpoints[url].land_time += landed_at - accepted
+        if status.get("err") is not None:
+            self.failed += 1
+            logger.error(f"[TransactionSubmitter] {signature} landed in slot {status.get('slot')} with error {status['err']}.")
+        else:
+            self.confirmed += 1
+            first = min(accepted_at.values())
+            logger.success(
+                f"[TransactionSubmitter] {signature} confirmed in slot {status.get('slot')} "
+                f"{(landed_at - first) * 1000:.0f}ms after it was accepted."
+            )
+        return status
+
+    async def _confirm(self, signature: str) -> Dict[str, Any]:
+        # Whichever answers first: the hub's signature notification or status polling. A waiter that
+        # fails (e.g. the hub stopped) leaves the other one running; only if both fail is the last
+        # error raised.
+        waiters = {asyncio.get_running_loop().create_task(self._poll_status(signature))}
+        if self.hub is not None:
+            waiters.add(asyncio.get_running_loop().create_task(self._await_notification(signature)))
+        pending = set(waiters)
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    if waiter.exception() is None:
+                        return waiter.result()
+                error = next(iter(done)).exception()
+                if not pending:
+                    raise error
+                logger.debug("[TransactionSubmitter] Confirmation waiter for {} failed: {}", signature, error)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _await_notification(self, signature: str) -> Dict[str, Any]:
+        subscription = self.hub.subscribe_signature(signature, name=f"TransactionSubmitter:{signature[:8]}", maxsize=1)
+        try:
+            notification = await subscription.get()
+            err = notification.result.value.err
+            return {"slot": notification.result.context.slot, "err": str(err) if err is not None else None}
+        finally:
+            await subscription.close()
+
+    async def _poll_status(self, signature: str) -> Dict[str, Any]:
+        while True:
+            await asyncio.sleep(self.confirm_poll_interval)
+            try:
+                result = await self.rpc_pool.request("getSignatureStatuses", [[signature]], hedge=True)
+            except Exception as e:
+                logger.debug("[TransactionSubmitter] Status poll for {} failed: {}", signature, e)
+                continue
+            status = (result.get("value") or [None])[0]
+            if status and status.get("confirmationStatus") in ("confirmed", "finalized"):
+                return {"slot": status.get("slot"), "err": status.get("err")}
+
+    async def _refresh_blockhash(self) -> None:
+        while self._run_refresher:
+            try:
+                result = await self.rpc_pool.request("getLatestBlockhash", [{"commitment": "confirmed"}], hedge=True)
+                value = result["value"]
+                self._blockhash = (Hash.from_string(value["blockhash"]), int(value["lastValidBlockHeight"]), time.monotonic())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[TransactionSubmitter] Blockhash refresh failed: {e}")
+            await asyncio.sleep(self.blockhash_refresh_interval)
+
+    async def _refresh_fees(self) -> None:
+        while self._run_refresher:
+            try:
+                fees = await self.rpc_pool.request("getRecentPrioritizationFees", [])
+                values = [entry["prioritizationFee"] for entry in fees]
+                if values:
+                    fee = int(np.percentile(values, self.fee_percentile))
+                    self._priority_fee = min(fee, self.max_fee)
+                    logger.debug("[TransactionSubmitter] Priority fee p{:g}: {} micro-lamports/CU.", self.fee_percentile, fee)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[TransactionSubmitter] Priority fee refresh failed: {e}")
+            await asyncio.sleep(self.fee_refresh_interval)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.backtester import Backtester
+
+
+class FixedSignals(Backtester):
+    # Replays a given BUY (1) / SELL (-1) / hold (0) path, so run() can be checked by hand.
+    def __init__(self, signals, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fixed = np.asarray(signals, dtype=np.int8)
+
+    def signals(self, prices, params=None, cache=None) -> np.ndarray:
+        return self.fixed
+
+
+def test_run_hand_computed() -> None:
+    prices = np.array([100.0, 110.0, 99.0, 120.0, 120.0])
+    result = FixedSignals([1, 0, -1, 1, 0], slippage_bps=100, fee_bps=0).run(prices, timestamps=np.arange(5.0))
+
+    # Long on bars 0-1 and 3-4: buy at 100, +10%, -10% (110 -> 99) while selling, flat, buy at 120.
+    # Equity after each bar: 0.99, 1.089, 0.970299, 0.96059601, 0.96059601.
+    assert (result.trades, result.buys, result.sells) == (3, 2, 1)
+    assert result.exposure == pytest.approx(0.8)
+    # Three 1% trade costs and the 1.1 * 0.9 price path.
+    assert result.total_return == pytest.approx(0.99**3 * 1.1 * 0.9 - 1)
+    assert result.pnl == pytest.approx(0.96059601 - 1)
+    # Peak 1.089 after bar 1, trough 0.96059601 at the end.
+    assert result.max_drawdown == pytest.approx(1 - 0.99**4 / 1.089)
+    # 1% of the equity at each trade: 1.0, 0.9801 and 0.970299.
+    assert result.slippage_paid == pytest.approx(0.01 * (1.0 + 0.9801 + 0.970299))
+    assert result.fees_paid == 0.0
+    assert (result.start, result.end) == (0.0, 4.0)
+
+
+def test_run_splits_costs_between_slippage_and_fees() -> None:
+    prices = np.array([100.0, 110.0, 99.0, 120.0, 120.0])
+    result = FixedSignals([1, 0, -1, 1, 0], slippage_bps=100, fee_bps=50).run(prices)
+
+    assert result.total_return == pytest.approx(0.985**3 * 1.1 * 0.9 - 1)
+    total = 0.015 * (1.0 + 0.985 * 1.1 * 0.9 + 0.985**2 * 1.1 * 0.9)
+    assert result.slippage_paid + result.fees_paid == pytest.approx(total)
+    assert result.slippage_paid == pytest.approx(2 * result.fees_paid)
+
+
+def test_run_without_signals_stays_flat() -> None:
+    result = FixedSignals([0, 0, 0], slippage_bps=100).run(np.array([1.0, 2.0, 0.5]))
+    assert (result.trades, result.total_return, result.max_drawdown, result.exposure) == (0, 0.0, 0.0, 0.0)
@@ -0,0 +1,35 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.candle_aggregator import CandleAggregator
+from src.main import connect_strategy
+
+MINT_A = "A1111111111111111111111111111111111111111111"
+MINT_B = "B1111111111111111111111111111111111111111111"
+
+
+class RecordingStrategy:
+    def __init__(self) -> None:
+        self.calls: List[Tuple[Dict[str, float], Optional[float]]] = []
+
+    def update_prices(self, prices: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        self.calls.append((prices, timestamp))
+
+
+def test_multi_bar_batch_feeds_every_bar_in_order() -> None:
+    candles = CandleAggregator(timeframes=["1s"], history=16)
+    strategy = RecordingStrategy()
+    connect_strategy(candles, strategy)
+
+    # Ticks in later buckets close A's first two bars before the flush, so one batch holds three A bars.
+    candles.update(MINT_A, 1.0, timestamp=100.2)
+    candles.update(MINT_B, 10.0, timestamp=100.5)
+    candles.update(MINT_A, 2.0, timestamp=101.3)
+    candles.update(MINT_A, 3.0, timestamp=102.4)
+    batches = candles.flush(now=103.0)
+
+    assert len(batches) == 1 and len(batches[0][1]) == 4
+    assert strategy.calls == [
+        ({MINT_A: 1.0, MINT_B: 10.0}, 101.0),
+        ({MINT_A: 2.0}, 102.0),
+        ({MINT_A: 3.0}, 103.0),
+    ]
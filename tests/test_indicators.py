@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import talib
+
+from src.indicators import BatchIndicatorEngine, IndicatorEngine, StrategyParams
+
+FIELDS = ("sma", "rsi", "upper_band", "middle_band", "lower_band", "macd", "macd_signal", "macd_hist")
+PARAMS = [
+    StrategyParams(),
+    StrategyParams(sma_period=5, rsi_period=3, bb_period=7, bb_nbdev=1.5, macd_fast=4, macd_slow=9, macd_signal=3),
+]
+
+
+# Memecoin prices in SOL are often far below 1e-4, so parity is checked at that scale too.
+SCALES = [1.0, 1e-7]
+
+
+def random_walk(seed: int, scale: float, n: int = 1500) -> np.ndarray:
+    # Geometric walk with a flat stretch, which exercises the zero-variance and no-change RSI paths.
+    rng = np.random.default_rng(seed)
+    prices = scale * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    prices[600:660] = prices[600]
+    return prices
+
+
+def talib_reference(prices: np.ndarray, params: StrategyParams) -> dict:
+    upper, middle, lower = talib.BBANDS(prices, timeperiod=params.bb_period, nbdevup=params.bb_nbdev, nbdevdn=params.bb_nbdev)
+    macd, signal, hist = talib.MACD(
+        prices, fastperiod=params.macd_fast, slowperiod=params.macd_slow, signalperiod=params.macd_signal
+    )
+    return {
+        "sma": talib.SMA(prices, timeperiod=params.sma_period),
+        "rsi": talib.RSI(prices, timeperiod=params.rsi_period),
+        "upper_band": upper,
+        "middle_band": middle,
+        "lower_band": lower,
+        "macd": macd,
+        "macd_signal": signal,
+        "macd_hist": hist,
+    }
+
+
+def assert_parity(actual: np.ndarray, expected: np.ndarray, field: str) -> None:
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected), err_msg=f"{field}: NaN (warm-up) ranges differ")
+    valid = ~np.isnan(expected)
+    scale = np.abs(expected[valid]).max()
+    assert np.allclose(actual[valid], expected[valid], rtol=1e-7, atol=1e-9 * scale), f"{field} differs from TA-Lib"
+
+
+@pytest.mark.parametrize("scale", SCALES)
+@pytest.mark.parametrize("params", PARAMS)
+def test_indicator_engine_matches_talib(params: StrategyParams, scale: float) -> None:
+    prices = random_walk(7, scale)
+    engine = IndicatorEngine(**params.engine_kwargs())
+    streamed = {field: np.empty(len(prices)) for field in FIELDS}
+    for i, price in enumerate(prices):
+        engine.update(float(price))
+        for field in FIELDS:
+            streamed[field][i] = getattr(engine, field)
+
+    expected = talib_reference(prices, params)
+    for field in FIELDS:
+        assert_parity(streamed[field], expected[field], field)
+
+
+@pytest.mark.parametrize("scale", SCALES)
+@pytest.mark.parametrize("params", PARAMS)
+def test_batch_indicator_engine_matches_talib(params: StrategyParams, scale: float) -> None:
+    # Each row is its own walk, and row 1 starts later than the others so rows warm up at different times.
+    walks = [random_walk(seed, scale) for seed in (11, 12, 13)]
+    starts = [0, 300, 0]
+    engine = BatchIndicatorEngine(rows=2, **params.engine_kwargs())
+    engine.ensure_rows(len(walks))
+    streamed = [{field: np.full(len(walk), np.nan) for field in FIELDS} for walk in walks]
+    for step in range(len(walks[0])):
+        rows = np.array([row for row, start in enumerate(starts) if step >= start])
+        prices = np.array([walks[row][step - starts[row]] for row in rows])
+        engine.update(rows, prices)
+        for row in rows:
+            for field in FIELDS:
+                streamed[row][field][step - starts[row]] = getattr(engine, field)[row]
+
+    for row, walk in enumerate(walks):
+        received = len(walk) - starts[row]
+        expected = talib_reference(walk[:received], params)
+        for field in FIELDS:
+            assert_parity(streamed[row][field][:received], expected[field], f"row {row} {field}")
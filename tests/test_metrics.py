@@ -0,0 +1,33 @@
+import random
+
+from src.metrics import _BUCKETS, _MAX_BITS, LatencyHistogram, _bucket_floor
+
+
+def test_record_lands_in_the_bucket_covering_the_value() -> None:
+    rng = random.Random(7)
+    values = [0, 1, 31, 32, 33, 63, 64, 1000, 2**_MAX_BITS - 1] + [rng.getrandbits(rng.randint(1, _MAX_BITS)) for _ in range(5000)]
+    for value in values:
+        histogram = LatencyHistogram()
+        histogram.record(value)
+        index = histogram.counts.index(1)
+        assert _bucket_floor(index) <= value < _bucket_floor(index + 1)
+
+
+def test_out_of_range_values() -> None:
+    histogram = LatencyHistogram()
+    histogram.record(-5)
+    histogram.record(2**_MAX_BITS)
+    histogram.record(2**63)
+    assert histogram.counts[_BUCKETS - 1] == 2
+    assert histogram.count == 2
+    assert histogram.max == 2**63
+
+
+def test_summary_counts_spans() -> None:
+    histogram = LatencyHistogram()
+    for value in (1000, 2000, 3000):
+        histogram.record(value)
+    histogram.since(0)
+    summary = histogram.summary()
+    assert summary["count"] == 4
+    assert histogram.quantile(0.5) // 1000 == 2
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from src.order_dispatcher import OrderDispatcher, TokenBucket
+
+
+def test_token_bucket_refills_at_rate_up_to_burst() -> None:
+    async def run() -> None:
+        bucket = TokenBucket(rate=10, burst=3)
+        for _ in range(3):
+            await bucket.acquire()
+        assert bucket.tokens < 1
+
+        # 0.25s at 10/s is 2.5 tokens; one is taken.
+        bucket._updated -= 0.25
+        await bucket.acquire()
+        assert 1.4 < bucket.tokens < 1.6
+
+        # A long idle period refills to the burst, not beyond.
+        bucket._updated -= 100
+        await bucket.acquire()
+        assert 1.9 < bucket.tokens <= 2.0
+
+    asyncio.run(run())
+
+
+def test_token_bucket_waits_for_the_next_token() -> None:
+    async def run() -> float:
+        bucket = TokenBucket(rate=20, burst=1)
+        await bucket.acquire()
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.04
+
+
+def test_token_bucket_rate_zero_is_unlimited() -> None:
+    async def run() -> None:
+        bucket = TokenBucket(rate=0, burst=1)
+        for _ in range(100):
+            await bucket.acquire()
+
+    asyncio.run(asyncio.wait_for(run(), 1))
+
+
+class BlockingExecutor:
+    def __init__(self) -> None:
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def execute_market_order(self, mint: str, side: str, amount: float):
+        self.calls.append((mint, side, amount))
+        await self.release.wait()
+        return {"result": f"sig-{len(self.calls)}"}
+
+
+def test_dispatcher_joins_an_order_already_in_flight_for_the_same_mint_and_side() -> None:
+    async def run() -> None:
+        executor = BlockingExecutor()
+        dispatcher = OrderDispatcher(executor, max_in_flight=4, rate=0)
+        first = dispatcher.submit("MINT", "buy", 0.1)
+        again = dispatcher.submit("MINT", "BUY", 0.1, source="other")
+        sell = dispatcher.submit("MINT", "sell", 100)
+        other = dispatcher.submit("OTHER", "buy", 0.1)
+
+        assert again is first
+        assert len({id(first), id(sell), id(other)}) == 3
+        assert dispatcher.in_flight() == 3
+        await asyncio.sleep(0)
+        executor.release.set()
+        await asyncio.gather(first, sell, other)
+
+        assert len(executor.calls) == 3
+        assert await again == await first
+        metrics = dispatcher.metrics()
+        assert (metrics["submitted"], metrics["deduplicated"], metrics["succeeded"], metrics["in_flight"]) == (3, 1, 3, 0)
+
+        # Once the first order finished, the same (mint, side) runs again.
+        assert dispatcher.submit("MINT", "buy", 0.1) is not first
+        await dispatcher.close()
+        assert len(executor.calls) == 4
+
+    asyncio.run(run())
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from src.param_sweep import ParameterSweep
+
+
+def test_save_falls_back_to_csv_without_parquet_engine(tmp_path, monkeypatch) -> None:
+    def to_parquet(*args, **kwargs):
+        raise ImportError("Unable to find a usable engine")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", to_parquet)
+    table = pd.DataFrame({"sma_period": [20, 10], "total_return": [0.5, 0.25]})
+
+    written = ParameterSweep.save(table, str(tmp_path / "results.parquet"))
+
+    assert written == str(tmp_path / "results.csv")
+    pd.testing.assert_frame_equal(pd.read_csv(written), table)
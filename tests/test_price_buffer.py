@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.price_buffer import PriceHistoryBook, PriceRingBuffer
+
+
+def test_ring_wraps_around_keeping_the_latest_samples_in_order() -> None:
+    ring = PriceRingBuffer(capacity=4)
+    for i in range(11):
+        ring.append(float(i), timestamp=100.0 + i)
+
+    assert len(ring) == 4
+    np.testing.assert_array_equal(ring.view(), [7.0, 8.0, 9.0, 10.0])
+    np.testing.assert_array_equal(ring.timestamps(), [107.0, 108.0, 109.0, 110.0])
+    np.testing.assert_array_equal(ring.view(2), [9.0, 10.0])
+    assert ring.last() == 10.0
+
+
+def test_window_equal_to_capacity_at_every_head_position() -> None:
+    book = PriceHistoryBook(capacity=5, initial_symbols=1)
+    for i in range(13):
+        book.append("mint", float(i), timestamp=float(i))
+        expected = np.arange(max(0, i - 4), i + 1, dtype=np.float64)
+        window = book.window("mint", 5)
+        np.testing.assert_array_equal(window, expected)
+        np.testing.assert_array_equal(book.latest_matrix(5)[0, 5 - len(expected):], expected)
+        # A view over the mirrored storage, not a copy.
+        assert window.base is not None
+
+
+def test_ring_shares_the_book_row() -> None:
+    book = PriceHistoryBook(capacity=3, initial_symbols=1)
+    ring = book.buffer("mint")
+    for price in (1.0, 2.0, 3.0, 4.0):
+        ring.append(price)
+    book.append("mint", 5.0)
+
+    np.testing.assert_array_equal(book.window("mint"), [3.0, 4.0, 5.0])
+    np.testing.assert_array_equal(ring.view(3), book.row_window(book.row_for("mint"), 3))
+    assert book.count("mint") == len(ring) == 3
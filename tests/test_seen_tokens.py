@@ -0,0 +1,66 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src import seen_tokens
+from src.seen_tokens import SeenTokenIndex
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(seen_tokens, "time", SimpleNamespace(time=lambda: now.value, perf_counter=time.perf_counter))
+    return now
+
+
+def test_clock_gives_a_recently_seen_mint_a_second_chance(clock) -> None:
+    index = SeenTokenIndex(path=None, capacity=3, ttl=0)
+    for mint in ("a", "b", "c"):
+        clock.value += 1
+        assert index.mark(mint)
+    clock.value += 1
+    assert not index.mark("a")
+
+    # The hand is back at "a", which was seen again, so it moves on and evicts "b".
+    assert index.mark("d")
+    assert [mint in index for mint in ("a", "b", "c", "d")] == [True, False, True, True]
+    assert len(index) == 3
+    # The hand continues with "c"; "a" lost its reference bit on the way past, so it goes after that.
+    assert index.mark("e")
+    assert [mint in index for mint in ("a", "c", "d", "e")] == [True, False, True, True]
+    assert index.mark("f")
+    assert [mint in index for mint in ("a", "d", "e", "f")] == [False, True, True, True]
+
+
+def test_entries_expire_after_ttl(clock) -> None:
+    index = SeenTokenIndex(path=None, capacity=4, ttl=10)
+    assert index.mark("a")
+    clock.value += 5
+    assert not index.mark("a")
+    clock.value += 10.5
+    assert "a" not in index
+    assert index.mark("a")
+    assert "a" in index
+
+
+def test_reopening_with_a_new_capacity_keeps_the_most_recent(clock, tmp_path) -> None:
+    path = str(tmp_path / "seen_tokens.bin")
+    index = SeenTokenIndex(path=path, capacity=4, ttl=0)
+    for mint in ("a", "b", "c", "d"):
+        clock.value += 1
+        index.mark(mint)
+    index.close()
+
+    same = SeenTokenIndex(path=path, capacity=4, ttl=0)
+    assert len(same) == 4 and all(mint in same for mint in "abcd")
+    same.close()
+
+    shrunk = SeenTokenIndex(path=path, capacity=2, ttl=0)
+    assert [mint in shrunk for mint in "abcd"] == [False, False, True, True]
+    shrunk.close()
+
+    grown = SeenTokenIndex(path=path, capacity=8, ttl=0)
+    assert [mint in grown for mint in "abcd"] == [False, False, True, True]
+    assert grown.mark("e") and len(grown) == 3
+    grown.close()
@@ -0,0 +1,55 @@
+import asyncio
+import random
+import string
+
+from src.sharded_runtime import ExecutorClient, OrderServer, ShardWorker, shard_of
+from src.shm_ring import ShmRing
+
+
+def test_shard_of_is_stable_and_spread() -> None:
+    # crc32 of the mint: the same in every process and on every run, unlike the salted hash().
+    assert shard_of("So11111111111111111111111111111111111111112", 4) == 0
+    assert shard_of("EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v", 4) == 3
+    rng = random.Random(3)
+    mints = ["".join(rng.choices(string.ascii_letters + string.digits, k=44)) for _ in range(4000)]
+    per_shard = [0] * 4
+    for mint in mints:
+        shard = shard_of(mint, 4)
+        assert shard == shard_of(mint, 4)
+        per_shard[shard] += 1
+    assert min(per_shard) > 800
+
+
+class FakeDispatcher:
+    def __init__(self) -> None:
+        self.orders = []
+
+    def submit(self, mint, side, amount, source="", trade_details=None, price=None, received_ns=None) -> asyncio.Future:
+        self.orders.append((mint, side, amount, source))
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({"result": f"sig-{mint}-{side}"})
+        return future
+
+
+def test_order_reply_round_trip() -> None:
+    async def run() -> None:
+        orders, replies = ShmRing(capacity=4096), ShmRing(capacity=4096)
+        dispatcher = FakeDispatcher()
+        server = OrderServer(dispatcher, trade_executor=None, replies=[replies])
+        worker = ShardWorker(0, 1, ExecutorClient(orders, 0))
+        try:
+            pending = worker.client.submit("MINT", "buy", 0.1, source="strategy_loop")
+            for message in orders.get_many():
+                server.handle(0, message)
+            await asyncio.sleep(0)  # the dispatcher future's done callback sends the reply
+            for message in replies.get_many():
+                worker.handle(1, message)
+
+            assert dispatcher.orders == [("MINT", "buy", 0.1, "strategy_loop@shard-0")]
+            assert await asyncio.wait_for(pending, 1) == {"result": "sig-MINT-buy"}
+            assert worker.client.metrics()["succeeded"] == 1 and worker.client.metrics()["awaiting_reply"] == 0
+        finally:
+            orders.close()
+            replies.close()
+
+    asyncio.run(run())
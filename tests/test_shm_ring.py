@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from src.shm_ring import ShmRing
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRing(capacity=256)
+    yield ring
+    ring.close()
+
+
+def test_randomized_put_get_many_wraps_around(ring) -> None:
+    rng = random.Random(25)
+    expected = []
+    received = []
+    for i in range(5000):
+        if rng.random() < 0.6:
+            message = rng.randbytes(rng.randint(0, 60))
+            if ring.put(message):
+                expected.append(message)
+        else:
+            received.extend(ring.get_many(rng.randint(1, 8)))
+    received.extend(ring.get_many(10_000))
+
+    assert received == expected
+    assert ring.pending() == 0
+    # The byte counters ran many times around the 256-byte data area.
+    assert ring.stats()["received"] == len(expected) and sum(len(m) + 4 for m in expected) > 50 * 256
+
+
+def test_full_ring_drops_the_new_message(ring) -> None:
+    message = bytes(60)
+    accepted = 0
+    while ring.put(message):
+        accepted += 1
+
+    assert accepted == 256 // 64
+    assert not ring.put(b"x" * 253)
+    assert ring.dropped() == 2
+    # Room frees up as the consumer reads.
+    assert ring.get_many(1) == [message]
+    assert ring.put(b"new")
+    assert ring.get_many() == [message] * (accepted - 1) + [b"new"]
+
+
+def test_reattached_sides_resume_from_the_shared_counters(ring) -> None:
+    for i in range(10):
+        ring.put(b"message-%d" % i)
+    consumer = ShmRing(ring.name)
+    assert consumer.get_many(4) == [b"message-%d" % i for i in range(4)]
+    consumer.close()
+
+    # A restarted consumer continues after the last message its predecessor took, and a restarted
+    # producer appends after the last one published.
+    restarted = ShmRing(ring.name)
+    producer = ShmRing(ring.name)
+    producer.put(b"after-restart")
+    assert restarted.get_many() == [b"message-%d" % i for i in range(4, 10)] + [b"after-restart"]
+    restarted.close()
+    producer.close()
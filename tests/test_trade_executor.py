@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, List, Tuple
+
+from src.env import ORDER_QUANTITY, SOL_MINT
+from src.log_parser import DEFAULT_TRADE_AMOUNT, TRADE_AMOUNT_SOL
+from src.mint_metadata import MintMetadata, MintMetadataCache
+from src.trade_executor import TradeExecutor
+
+MEME_MINT = "Ez2zVjw85tZan1ycnJ5PywNNxR6Gm4jbXQtZKyQNu3Lv"
+
+
+async def sent_swaps(orders: List[Tuple[str, float]]) -> List[Tuple[str, str, int]]:
+    # (input mint, output mint, amount in the input mint's smallest unit) handed to execute_swap.
+    mint_metadata = MintMetadataCache(None, path=None)
+    mint_metadata._entries[MEME_MINT] = MintMetadata(MEME_MINT, 6, fetched_at=float("inf"))
+    executor = TradeExecutor(mint_metadata=mint_metadata)
+    swaps = []
+
+    async def execute_swap(input_mint: str, output_mint: str, amount: int, slippage: float = 1) -> Any:
+        swaps.append((input_mint, output_mint, amount))
+        return {"result": "signature"}
+
+    executor.execute_swap = execute_swap
+    try:
+        for side, amount in orders:
+            await executor.execute_market_order(MEME_MINT, side, amount)
+    finally:
+        await executor.close()
+    return swaps
+
+
+def test_default_buy_spends_a_tenth_of_a_sol() -> None:
+    # The default order size the bot trades with: 0.1 SOL, i.e. 10^8 lamports, as before the decimals lookup.
+    swaps = asyncio.run(sent_swaps([("buy", ORDER_QUANTITY)]))
+    assert swaps == [(SOL_MINT, MEME_MINT, 100_000_000)]
+
+
+def test_scanner_default_trade_amount_buys_one_sol() -> None:
+    swaps = asyncio.run(sent_swaps([("buy", DEFAULT_TRADE_AMOUNT * TRADE_AMOUNT_SOL)]))
+    assert swaps == [(SOL_MINT, MEME_MINT, 1_000_000_000)]
+
+
+def test_sell_uses_the_token_decimals() -> None:
+    swaps = asyncio.run(sent_swaps([("sell", 100)]))
+    assert swaps == [(MEME_MINT, SOL_MINT, 100_000_000)]